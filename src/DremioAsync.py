@@ -0,0 +1,250 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import aiohttp
+import asyncio
+import json
+import logging
+import threading
+import time
+
+
+###
+# Asyncio counterpart of the Dremio API wrappers for catalog, collaboration and reflection calls.
+# Wraps a synchronous Dremio, DremioCloud or DremioCloudV2 object and shares its endpoint, URL layout and
+# authentication: requests use the current token of the synchronous object and an expired token is renewed once
+# for all pending requests by calling its _authenticate(). Methods are coroutines with the same names and
+# arguments as their synchronous counterparts and the same results: JSON document, None or not found result.
+# The number of requests in flight is limited by max_in_flight and their rate by the DremioRateLimiter of the transport
+# of the synchronous object, if any. Sources that time out are recorded in its _timed_out_sources list and are not
+# requested again unless retry_timedout_source is set, the same way as by the synchronous object. Synchronous code can run coroutines with
+# submit(), which returns a concurrent.futures.Future, on the event loop of a background thread started by start().
+# Requires the aiohttp library.
+###
+class AsyncDremio:
+
+	def __init__(self, dremio, max_in_flight=100, retry_policy=None):
+		self._dremio = dremio
+		self._max_in_flight = max_in_flight
+		self._retry_policy = retry_policy
+		self._rate_limiter = getattr(getattr(dremio, '_transport', None), '_rate_limiter', None)
+		# Dremio Cloud URLs are prefixed with the project
+		self._url_prefix = getattr(dremio, '_url_prefix', '') + getattr(dremio, '_project_id', '')
+		self._loop = None
+		self._thread = None
+		self._session = None
+		self._semaphore = None
+		self._auth_lock = None
+
+	def start(self):
+		self._loop = asyncio.new_event_loop()
+		self._thread = threading.Thread(target=self._loop.run_forever, name="AsyncDremio", daemon=True)
+		self._thread.start()
+		self.run(self._open())
+
+	def close(self):
+		if self._loop is None:
+			return
+		self.run(self._session.close())
+		self._loop.call_soon_threadsafe(self._loop.stop)
+		self._thread.join()
+		self._loop.close()
+		self._loop = None
+
+	def submit(self, coroutine):
+		return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+	def run(self, coroutine):
+		return self.submit(coroutine).result()
+
+	async def _open(self):
+		connector = aiohttp.TCPConnector(limit=self._max_in_flight, ssl=None if self._dremio._verify_ssl else False)
+		self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self._dremio._api_timeout))
+		self._semaphore = asyncio.Semaphore(self._max_in_flight)
+		self._auth_lock = asyncio.Lock()
+
+	async def get_catalog_entity_by_path(self, path, report_error=True):
+		if path[0] == '/':
+			path = path[1:]
+		if '#' in path:
+			path = path.replace("#", "%23")
+		return await self._api_get_json(self._url_prefix + self._dremio._catalog_url_by_path + path, source="get_catalog_entity_by_path", report_error=report_error)
+
+	async def get_catalog_entity_by_id(self, entity_id):
+		if entity_id[:7] == 'dremio:':
+			return await self.get_catalog_entity_by_path(entity_id[8:])
+		return await self._api_get_json(self._url_prefix + self._dremio._catalog_url + entity_id, source="get_catalog_entity_by_id")
+
+	async def get_catalog_entity_graph_by_id(self, entity_id, report_error=True):
+		return await self._api_get_json(self._url_prefix + self._dremio._catalog_url + entity_id + '/' + self._dremio._graph_url_postfix, source="get_catalog_entity_graph", report_error=report_error)
+
+	async def get_catalog_tags(self, entity_id):
+		return await self._api_get_json(self._url_prefix + self._dremio._catalog_url + entity_id + "/collaboration/tag", source="get_catalog_tags", report_error=False)
+
+	async def get_catalog_wiki(self, entity_id):
+		return await self._api_get_json(self._url_prefix + self._dremio._catalog_url + entity_id + "/collaboration/wiki", source="get_catalog_wiki", report_error=False)
+
+	async def get_reflection(self, reflection_id):
+		return await self._api_get_json(self._url_prefix + self._dremio._reflections_url + reflection_id, source="get_reflection")
+
+	async def create_catalog_entity(self, entity, dry_run=True):
+		if dry_run:
+			logging.warning("create_catalog_entity: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("POST", self._url_prefix + self._dremio._catalog_url, "create_catalog_entity", entity)
+
+	async def update_catalog_entity(self, entity_id, entity, dry_run=True, report_error=True):
+		if dry_run:
+			logging.warning("update_catalog_entity: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("PUT", self._url_prefix + self._dremio._catalog_url + entity_id, "update_catalog_entity", entity, report_error)
+
+	async def create_reflection(self, reflection, dry_run=True):
+		if dry_run:
+			logging.warning("create_reflection: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("POST", self._url_prefix + self._dremio._reflections_url, "create_reflection", reflection)
+
+	async def update_reflection(self, reflection_id, reflection, dry_run=True):
+		if dry_run:
+			logging.warning("update_reflection: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("PUT", self._url_prefix + self._dremio._reflections_url + reflection_id, "update_reflection", reflection)
+
+	async def update_wiki(self, catalog_id, wiki, dry_run=True):
+		if dry_run:
+			logging.warning("update_wiki: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("POST", self._url_prefix + self._dremio._catalog_url + catalog_id + "/collaboration/wiki", "update_wiki", wiki)
+
+	async def update_tag(self, catalog_id, tag, dry_run=True):
+		if dry_run:
+			logging.warning("update_tag: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("POST", self._url_prefix + self._dremio._catalog_url + catalog_id + "/collaboration/tag", "update_tag", tag)
+
+	async def delete_catalog_entity(self, entity_id, dry_run=True, report_error=True):
+		if dry_run:
+			logging.warning("delete_catalog_entity: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("DELETE", self._url_prefix + self._dremio._catalog_url + entity_id, "delete_catalog_entity", report_error=report_error)
+
+	async def delete_reflection(self, reflection_id, dry_run=True, report_error=True):
+		if dry_run:
+			logging.warning("delete_reflection: Dry Run. Not submitting changes to API.")
+			return None
+		return await self._api_call("DELETE", self._url_prefix + self._dremio._reflections_url + reflection_id, "delete_reflection", report_error=report_error)
+
+	async def _api_get_json(self, url, source="", report_error=True, not_found_result=None):
+		return await self._api_call("GET", url, source, report_error=report_error, not_found_result=not_found_result)
+
+	# Returns JSON if success, not_found_result for HTTP 404 or None
+	async def _api_call(self, method, url, source, json_data=None, report_error=True, not_found_result=None):
+		source_name = self._get_source_name(url) if method == "GET" else None
+		if source_name in self._dremio._timed_out_sources and not self._dremio._retry_timedout_source:
+			return None
+		attempt = 0
+		reauthenticated = False
+		while True:
+			headers = self._dremio._headers
+			try:
+				async with self._semaphore:
+					if self._rate_limiter is not None:
+						wait = self._rate_limiter.reserve()
+						if wait > 0:
+							await asyncio.sleep(wait)
+					start = time.monotonic()
+					try:
+						async with self._session.request(method, self._dremio._endpoint + url, json=json_data, headers=headers) as response:
+							status = response.status
+							text = await response.text()
+							retry_after = response.headers.get('Retry-After')
+					except (aiohttp.ClientError, asyncio.TimeoutError):
+						if self._rate_limiter is not None:
+							self._rate_limiter.on_response(time.monotonic() - start, True)
+						raise
+					if self._rate_limiter is not None:
+						self._rate_limiter.on_response(time.monotonic() - start, status in (429, 503))
+			except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+				if self._retry_policy is not None and attempt < self._retry_policy.max_retries and self._retry_policy.is_retryable_error(method):
+					await asyncio.sleep(self._retry_policy.get_delay(attempt))
+					attempt = attempt + 1
+					continue
+				if isinstance(e, asyncio.TimeoutError) and source_name is not None:
+					# Same as Dremio._api_get_json, report the first time-out of a source only
+					if source_name not in self._dremio._timed_out_sources:
+						self._error(report_error, source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
+						self._dremio._timed_out_sources.append(source_name)
+					return None
+				self._error(report_error, source + ": HTTP Request failed: " + type(e).__name__ + " <" + str(url) + ">")
+				return None
+			if status == 200:
+				return None if text == '' else json.loads(text)
+			if status == 204:
+				return None
+			if status == 404:
+				if report_error:
+					logging.info(source + ": received HTTP Response Code 404 for : <" + str(url) + ">" + self._get_error_message(text))
+				return not_found_result
+			if (status == 401 or status == 403) and not reauthenticated:
+				# The token might have expired, renew it once unless another request already did
+				await self._reauthenticate(headers)
+				reauthenticated = True
+				continue
+			if self._retry_policy is not None and attempt < self._retry_policy.max_retries and self._retry_policy.is_retryable_status(method, status):
+				await asyncio.sleep(self._retry_policy.get_delay(attempt, retry_after))
+				attempt = attempt + 1
+				continue
+			if status == 400 and method == "GET":
+				if report_error:
+					logging.info(source + ": received HTTP Response Code 400 for : <" + str(url) + ">" + self._get_error_message(text))
+				return None
+			self._error(report_error, source + ": received HTTP Response Code " + str(status) + " for : <" + str(url) + ">" + self._get_error_message(text))
+			return None
+
+	async def _reauthenticate(self, expired_headers):
+		async with self._auth_lock:
+			if self._dremio._headers is expired_headers:
+				await asyncio.get_running_loop().run_in_executor(None, self._dremio._authenticate)
+
+	def _error(self, report_error, message):
+		if report_error:
+			logging.error(message)
+			self._dremio._count_error()
+		else:
+			logging.debug(message)
+
+	# Source name of a catalog URL as extracted by Dremio._api_get_json
+	def _get_source_name(self, url):
+		for catalog_url in [self._dremio._catalog_url_by_path, self._dremio._catalog_url]:
+			pos = url.find(catalog_url)
+			if pos >= 0:
+				source_name = url[pos + 23:]
+				return source_name[0:source_name.find("/")]
+		return None
+
+	def _get_error_message(self, text):
+		try:
+			error = json.loads(text)
+		except ValueError:
+			return " content: " + text
+		message = ""
+		if isinstance(error, dict):
+			if 'errorMessage' in error:
+				message = message + " errorMessage: " + str(error['errorMessage'])
+			if 'moreInfo' in error:
+				message = message + " moreInfo: " + str(error['moreInfo'])
+		return message
@@ -74,6 +74,33 @@ class DremioClonerConfig():
 	# Options
 	max_errors = 9999
 	http_timeout = 10 # seconds
+	http_pool_size = 10						# Number of hosts to keep persistent connections for
+	http_max_connections_per_host = 0		# Persistent connections per host, 0 means the larger of 10, read.concurrency and write.concurrency
+	http_keep_alive = True					# Reuse connections across API calls
+	http_gzip = False						# Compress request bodies with gzip
+	http_retry_max_retries = 3				# Retries of API calls failed with 429/502/503/504, connection errors or time-outs
+	http_retry_backoff_ms = 500				# Base delay of the exponential backoff between retries
+	http_retry_backoff_max_ms = 30000		# Maximum delay between retries, also caps Retry-After
+	http_rate_limit = 0						# Maximum API calls per second, 0 means unlimited
+	http_rate_limit_target_latency_ms = 0	# Slow down API calls while their average latency exceeds this, 0 means only on throttling
+	read_concurrency = 1					# Number of concurrent catalog API calls during 'get', 1 means serial processing
+	read_concurrency_backend = 'threads'	# threads or asyncio, the latter requires aiohttp
+	read_prune_excluded_folders = False		# Do not read Space folders when no folder or VDS below them can match the filters
+	read_incremental = False				# Reuse unchanged datasets from the previous export in the target file or directory during 'get'
+	read_incremental_reuse_collaboration = False	# Also reuse wikis, tags and ACL principals of unchanged datasets, they may be stale
+	write_concurrency = 1					# Number of concurrent VDS writes per hierarchy level during 'put', 1 means serial processing
+	write_metadata_concurrency = 1			# Number of concurrent reflection, wiki, tag and UDF writes during 'put', 1 means serial processing
+	write_metadata_reflection_concurrency = 0	# Maximum concurrent reflection writes, 0 means write.metadata.concurrency
+	write_metadata_wiki_concurrency = 0		# Maximum concurrent wiki writes, 0 means write.metadata.concurrency
+	write_metadata_tag_concurrency = 0		# Maximum concurrent tag writes, 0 means write.metadata.concurrency
+	write_metadata_udf_concurrency = 1		# Maximum concurrent UDF writes, 1 keeps UDFs referencing each other in order
+	file_concurrency = 1					# Number of files written or read concurrently for directory exports, 1 means serial processing
+	write_journal = None					# Journal file of completed writes, allows to resume an interrupted 'put'
+	write_prefetch_target = False			# Read the target Spaces once before 'put' instead of looking up every entity
+	write_plan_mode = 'off'					# off, plan (report create/update/delete/noop actions only), apply (report and skip noop updates)
+	sql_dependency_cache_filename = None	# File to keep tables referenced by VDS SQL across runs
+	sql_dependency_cache_size = 10000		# Number of SQL statements kept in the in-memory dependency cache
+	sql_parse_processes = 1					# Number of processes parsing VDS SQL to derive dependencies, 1 means parsing in the main process
 	# Logging options
 	logging_level = logging.INFO
 	logging_format = "%(levelname)s:%(asctime)s:%(message)s"
@@ -211,6 +238,9 @@ class DremioClonerConfig():
 			logging.basicConfig(handlers=handlers, format=self.logging_format, level=self.logging_level)
 		self._logger = DremioClonerLogger(self.max_errors, self.logging_verbose)
 		self._validate_configuration()
+		# A plan is computed against the target environment without changing it
+		if self.write_plan_mode == 'plan':
+			self.dry_run = True
 
 	def _process_command(self, json_conf):
 		self.command = json_conf['command']
@@ -299,6 +329,60 @@ class DremioClonerConfig():
 				self.logging_verbose  = self._bool(item, 'logging.verbose')
 			elif 'http_timeout' in item:
 				self.http_timeout = self._int(item, 'http_timeout')
+			elif 'http.pool_size' in item:
+				self.http_pool_size = self._int(item, 'http.pool_size')
+			elif 'http.max_connections_per_host' in item:
+				self.http_max_connections_per_host = self._int(item, 'http.max_connections_per_host')
+			elif 'http.keep_alive' in item:
+				self.http_keep_alive = self._bool(item, 'http.keep_alive')
+			elif 'http.gzip' in item:
+				self.http_gzip = self._bool(item, 'http.gzip')
+			elif 'http.retry.max_retries' in item:
+				self.http_retry_max_retries = self._int(item, 'http.retry.max_retries')
+			elif 'http.retry.backoff_ms' in item:
+				self.http_retry_backoff_ms = self._int(item, 'http.retry.backoff_ms')
+			elif 'http.retry.backoff_max_ms' in item:
+				self.http_retry_backoff_max_ms = self._int(item, 'http.retry.backoff_max_ms')
+			elif 'http.rate_limit.target_latency_ms' in item:
+				self.http_rate_limit_target_latency_ms = self._int(item, 'http.rate_limit.target_latency_ms')
+			elif 'http.rate_limit' in item:
+				self.http_rate_limit = self._int(item, 'http.rate_limit')
+			elif 'read.concurrency' in item:
+				self.read_concurrency = self._int(item, 'read.concurrency')
+			elif 'read.prune_excluded_folders' in item:
+				self.read_prune_excluded_folders = self._bool(item, 'read.prune_excluded_folders')
+			elif 'read.concurrency.backend' in item:
+				self.read_concurrency_backend = self._str(item, 'read.concurrency.backend')
+			elif 'read.incremental' in item:
+				self.read_incremental = self._bool(item, 'read.incremental')
+			elif 'read.incremental.reuse_collaboration' in item:
+				self.read_incremental_reuse_collaboration = self._bool(item, 'read.incremental.reuse_collaboration')
+			elif 'write.concurrency' in item:
+				self.write_concurrency = self._int(item, 'write.concurrency')
+			elif 'write.metadata.concurrency' in item:
+				self.write_metadata_concurrency = self._int(item, 'write.metadata.concurrency')
+			elif 'write.metadata.reflection_concurrency' in item:
+				self.write_metadata_reflection_concurrency = self._int(item, 'write.metadata.reflection_concurrency')
+			elif 'write.metadata.wiki_concurrency' in item:
+				self.write_metadata_wiki_concurrency = self._int(item, 'write.metadata.wiki_concurrency')
+			elif 'write.metadata.tag_concurrency' in item:
+				self.write_metadata_tag_concurrency = self._int(item, 'write.metadata.tag_concurrency')
+			elif 'write.metadata.udf_concurrency' in item:
+				self.write_metadata_udf_concurrency = self._int(item, 'write.metadata.udf_concurrency')
+			elif 'file.concurrency' in item:
+				self.file_concurrency = self._int(item, 'file.concurrency')
+			elif 'write.journal' in item:
+				self.write_journal = self._str(item, 'write.journal')
+			elif 'write.prefetch_target' in item:
+				self.write_prefetch_target = self._bool(item, 'write.prefetch_target')
+			elif 'write.plan_mode' in item:
+				self.write_plan_mode = self._str(item, 'write.plan_mode')
+			elif 'sql.dependency_cache.filename' in item:
+				self.sql_dependency_cache_filename = self._str(item, 'sql.dependency_cache.filename')
+			elif 'sql.dependency_cache.size' in item:
+				self.sql_dependency_cache_size = self._int(item, 'sql.dependency_cache.size')
+			elif 'sql.parse.processes' in item:
+				self.sql_parse_processes = self._int(item, 'sql.parse.processes')
 			elif 'user.process_mode' in item:
 				self.user_process_mode = self._str(item, 'user.process_mode')
 			elif 'group.process_mode' in item:
@@ -468,7 +552,13 @@ class DremioClonerConfig():
 			     	self.vds_process_mode != 'create_only' and self.vds_process_mode != 'create_overwrite' and
 				 	self.vds_process_mode != 'create_overwrite_delete' ))):
 			self._logger.fatal("Invalid configuration for vds.process_mode.")
+		if (self.command == self.CMD_GET and self.read_concurrency_backend not in ['threads', 'asyncio']):
+			self._logger.fatal("Invalid configuration for read.concurrency.backend.")
+		if (self.command == self.CMD_PUT and self.write_plan_mode not in ['off', 'plan', 'apply']):
+			self._logger.fatal("Invalid configuration for write.plan_mode.")
 		# Make sure we do not overwrite JSON environment file
+		if (self.command == self.CMD_GET and self.read_incremental and not self.target_file_or_dir_overwrite):
+			self._logger.fatal("Option read.incremental requires target overwrite to be set to True.")
 		if (self.command == self.CMD_GET and self.target_filename is not None and not self.target_file_or_dir_overwrite and os.path.isfile(self.target_filename)):
 			self._logger.fatal("File " + str(self.target_filename) + " already exists. Cannot overwrite.")
 		if (self.command == self.CMD_GET and self.target_directory is not None and not self.target_file_or_dir_overwrite and os.path.isdir(self.target_directory)):
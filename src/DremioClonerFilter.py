@@ -14,20 +14,65 @@
 # limitations under the License.
 ########
 
-import fnmatch, re
+import collections, fnmatch, re, threading
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
 
 class DremioClonerFilter():
 
+	# Decisions of get_space_folder_decision
+	FOLDER_INCLUDE = 'include'
+	FOLDER_DESCEND_ONLY = 'descend_only'
+	FOLDER_EXCLUDE_SUBTREE = 'exclude_subtree'
+
 	_config = None
 	_utils = None
 	_logger = None
 
+	# Verdicts of _match_prefixes keyed by (pattern, first prefix end, folder path), least recently used first.
+	# Filters are also called from write threads, _prefix_verdicts_lock guards the cache.
+	_prefix_verdicts = None
+	_prefix_verdicts_lock = None
+	_prefix_verdicts_size = 10000
+
 	def __init__(self, config):
 		self._config = config
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
+		self._prefix_verdicts = collections.OrderedDict()
+		self._prefix_verdicts_lock = threading.Lock()
+		# Lists of path patterns are compiled once into a single regex each
+		self._space_folder_filter_paths_re = self._compile_patterns(self._config.space_folder_filter_paths)
+		self._space_folder_exclude_filter_paths_re = self._compile_patterns(self._config.space_folder_exclude_filter_paths)
+		self._source_folder_filter_paths_re = self._compile_patterns(self._config.source_folder_filter_paths)
+		self._vds_exclude_filter_paths_re = self._compile_patterns(self._config.vds_exclude_filter_paths)
+
+	def _compile_patterns(self, patterns):
+		if patterns is None or patterns == []:
+			return None
+		return re.compile("|".join(["(?:" + fnmatch.translate(pattern) + ")" for pattern in patterns]))
+
+	# Returns True if regex matches the folder part of the path, path[1:end], for any end from first_end to len(path).
+	# The verdict for a path is the verdict for its parent or the match of the path itself. Verdicts are memoized by
+	# folder path, so that entities of a folder reuse the verdict of the folder and only match their own path.
+	# Only the _prefix_verdicts_size most recently used verdicts are kept.
+	def _match_prefixes(self, regex, path, first_end=1, end=None):
+		if end is None:
+			end = len(path)
+		if end < first_end:
+			return False
+		key = (regex.pattern, first_end, tuple(path[1:end]))
+		with self._prefix_verdicts_lock:
+			verdict = self._prefix_verdicts.get(key)
+			if verdict is not None:
+				self._prefix_verdicts.move_to_end(key)
+				return verdict
+		verdict = self._match_prefixes(regex, path, first_end, end - 1) or regex.match("/".join(path[1:end])) is not None
+		with self._prefix_verdicts_lock:
+			self._prefix_verdicts[key] = verdict
+			while len(self._prefix_verdicts) > self._prefix_verdicts_size:
+				self._prefix_verdicts.popitem(last=False)
+		return verdict
 
 	def is_pds_in_scope(self):
 		return self._config._source_filter_re is not None and \
@@ -54,38 +99,18 @@ class DremioClonerFilter():
 		return False
 
 	def _match_listed_space_folder_filter_paths(self, container):
-		if self._config.space_folder_filter_paths != []:
+		if self._space_folder_filter_paths_re is not None:
 			if 'path' not in container:
 				return False
-			path = container['path']
-			folder_matched = False
-			for space_folder_filter in self._config.space_folder_filter_paths:
-				if not folder_matched:
-					space_folder_filter_re = self._config._compile_pattern(space_folder_filter)
-					for i in range(len(path)):
-						if space_folder_filter_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_matched = True
-							break
-			if not folder_matched:
+			if not self._match_prefixes(self._space_folder_filter_paths_re, container['path']):
 				return False
 		return True
 
 	def _match_listed_space_folder_exclude_filter_paths(self, container):
-		if self._config.space_folder_exclude_filter_paths != []:
+		if self._space_folder_exclude_filter_paths_re is not None:
 			if 'path' not in container:
 				return False
-			path = container['path']
-			folder_matched = False
-			for space_folder_exclude_filter in self._config.space_folder_exclude_filter_paths:
-				if not folder_matched:
-					space_folder_filter_re = self._config._compile_pattern(space_folder_exclude_filter)
-					for i in range(len(path)):
-						if space_folder_filter_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_matched = True
-							break
-			if not folder_matched:
-				return False
-			return True
+			return self._match_prefixes(self._space_folder_exclude_filter_paths_re, container['path'])
 		else:
 			return False
 
@@ -103,6 +128,50 @@ class DremioClonerFilter():
 			self._logger.debug("match_space_folder_filter: skipping SPACE FOLDER " + container['path'][0] if 'path' in container else container['name'] + " as per job configuration")
 		return False
 
+	# Returns the decision for a space folder based on its path only, so that it can be taken before reading the folder:
+	# - FOLDER_INCLUDE: the folder matches the space folder filters
+	# - FOLDER_DESCEND_ONLY: the folder does not match, but folders or VDSs below it might
+	# - FOLDER_EXCLUDE_SUBTREE: neither the folder nor any folder or VDS below it can match
+	def get_space_folder_decision(self, folder, loginfo = True):
+		if self.match_space_folder_filter(folder, loginfo):
+			return self.FOLDER_INCLUDE
+		if self._is_space_folder_subtree_excluded(folder):
+			return self.FOLDER_EXCLUDE_SUBTREE
+		return self.FOLDER_DESCEND_ONLY
+
+	def _is_space_folder_subtree_excluded(self, folder):
+		if 'path' not in folder or not self._match_listed_space_names(folder):
+			return True
+		path = folder['path']
+		if self._config._space_filter_re is None or self._config._space_filter_re.match(path[0]) is None:
+			return True
+		if self._config._space_exclude_filter_re is not None and self._config._space_exclude_filter_re.match(path[0]) is not None:
+			return True
+		# Folder paths of descendants start with the folder path, exclusions matching a prefix of it apply to all of them
+		if self._space_folder_exclude_filter_paths_re is not None and self._match_prefixes(self._space_folder_exclude_filter_paths_re, path):
+			return True
+		if self._config._space_folder_exclude_filter_re is not None and self._match_prefixes(self._config._space_folder_exclude_filter_re, path):
+			return True
+		# Inclusions have to be satisfied by some descendant
+		if self._config._space_folder_filter_re is not None and not self._match_descendant_prefixes(self._config._space_folder_filter_re, [self._config.space_folder_filter], path):
+			return True
+		if self._space_folder_filter_paths_re is not None and not self._match_descendant_prefixes(self._space_folder_filter_paths_re, self._config.space_folder_filter_paths, path):
+			return True
+		return False
+
+	# Returns False if neither a prefix of the folder path nor the path of any descendant can match regex, compiled from patterns.
+	# A descendant path can only match a pattern if one of the descendant path and the literal beginning of the pattern
+	# (up to its first wildcard) starts with the other.
+	def _match_descendant_prefixes(self, regex, patterns, path):
+		if self._match_prefixes(regex, path):
+			return True
+		descendant_path = "/".join(path[1:]) + "/"
+		for pattern in patterns:
+			literal = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+			if literal.startswith(descendant_path) or descendant_path.startswith(literal):
+				return True
+		return False
+
 	def match_source_filter(self, container, loginfo = True):
 		# First filter by source types
 		if container['type'] != 'CONTAINER' and self._config.source_filter_types != [] and (container['entityType'] != 'source' or container['type'] not in self._config.source_filter_types):
@@ -118,26 +187,21 @@ class DremioClonerFilter():
 		return False
 
 	def _match_listed_source_folder_paths(self, container):
-		if self._config.source_folder_filter_paths != []:
+		if self._source_folder_filter_paths_re is not None:
 			if 'path' not in container:
 				return False
 			path = container['path']
-			folder_matched = False
-			for source_folder_filter in self._config.source_folder_filter_paths:
-				if not folder_matched:
-					source_folder_filter_re = self._config._compile_pattern(source_folder_filter)
-					for i in range(len(path[1:])):
-						normalized_path = self._utils.normalize_path(path[1:len(path) - i])
-						if source_folder_filter_re.match(normalized_path) is not None:
-							folder_matched = True
-							break
-						# check if the full normalized path is a substring of the source_folder_filter (assumes no wildcards)
-						# only really applicable when pds.list.useapi is True (which should be never due to inefficiencies) and hence we are traversing a folder structure
-						if i == 0 and source_folder_filter.find(normalized_path) >= 0:
-							folder_matched = True
-							break
-			if not folder_matched:
-				return False
+			# Source folder paths are matched without the empty path of the source itself
+			if self._match_prefixes(self._source_folder_filter_paths_re, path, 2):
+				return True
+			# check if the full normalized path is a substring of the source_folder_filter (assumes no wildcards)
+			# only really applicable when pds.list.useapi is True (which should be never due to inefficiencies) and hence we are traversing a folder structure
+			if len(path) > 1:
+				normalized_path = self._utils.normalize_path(path[1:])
+				for source_folder_filter in self._config.source_folder_filter_paths:
+					if source_folder_filter.find(normalized_path) >= 0:
+						return True
+			return False
 		return True
 
 	def match_source_folder_filter(self, container, loginfo = True):
@@ -171,12 +235,9 @@ class DremioClonerFilter():
 		return True
 
 	def _match_listed_vds_exclude_filter_paths(self, vds):
-		if self._config.vds_exclude_filter_paths != [] and 'path' in vds:
-			path = vds['path']
-			for vds_exclude_filter in self._config.vds_exclude_filter_paths:
-				vds_exclude_filter_re = self._config._compile_pattern(vds_exclude_filter)
-				if vds_exclude_filter_re.match(self._utils.normalize_path(path[1:len(path)])):
-					return True
+		if self._vds_exclude_filter_paths_re is not None and 'path' in vds:
+			if self._vds_exclude_filter_paths_re.match(self._utils.normalize_path(vds['path'][1:])):
+				return True
 		return False
 
 	def match_vds_filter(self, vds, tags=None, loginfo = True):
@@ -237,21 +298,10 @@ class DremioClonerFilter():
 		if folder_re is None:
 			return False
 		else:
-			folder_matched = False
-			for i in range(len(hierarchy_path)):
-				if folder_re.match(self._utils.normalize_path(hierarchy_path[1:len(hierarchy_path) - i])) is not None:
-					folder_matched = True
-					break
-			if not folder_matched:
+			if not self._match_prefixes(folder_re, hierarchy_path):
+				return False
+			if folder_exclusion_re is not None and self._match_prefixes(folder_exclusion_re, hierarchy_path):
 				return False
-			if folder_exclusion_re is not None:
-				folder_exclusion_matched = False
-				for i in range(len(hierarchy_path)):
-					if folder_exclusion_re.match(self._utils.normalize_path(hierarchy_path[1:len(hierarchy_path) - i])) is not None:
-						folder_exclusion_matched = True
-						break
-				if folder_exclusion_matched:
-					return False
 		return True
 
 	def _match_path(self, root_re, root_exclusion_re, folder_re, folder_exclusion_re, object_re, object_exclusion_re, entity):
@@ -301,21 +351,10 @@ class DremioClonerFilter():
 					# Do not include dataset name in folder filtering logic
 					path = path[:-1]
 				if folder_re is not None:  # Avoids potential NoneType Error
-					folder_matched = False
-					for i in range(len(path)):
-						normalized_folder_path = self._utils.normalize_path(path[1:len(path) - i])
-						if folder_re.match(normalized_folder_path) is not None:
-							folder_matched = True
-							break
-					if not folder_matched:
+					if not self._match_prefixes(folder_re, path):
 						return False
 				if folder_exclusion_re is not None:
-					folder_exclusion_matched = False
-					for i in range(len(path)):
-						if folder_exclusion_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_exclusion_matched = True
-							break
-					if folder_exclusion_matched:
+					if self._match_prefixes(folder_exclusion_re, path):
 						return False
 		return True
 
@@ -0,0 +1,85 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+
+###
+# Append-only journal of write operations completed by 'put'.
+# Every line of the journal file is a JSON document. The first line identifies the configuration the journal
+# was created with, every following line records an object written to the target environment by its key
+# (object type and path) and a hash of its content. A journal created with a different configuration is discarded.
+###
+class DremioClonerJournal:
+
+	def __init__(self, filename, config_json):
+		self._filename = filename
+		self._lock = threading.Lock()
+		self._completed = set()
+		config_hash = self.get_hash(config_json)
+		if os.path.isfile(filename):
+			f = open(filename, "r", encoding="utf-8")
+			lines = f.read().splitlines()
+			f.close()
+			if len(lines) > 0 and json.loads(lines[0]).get('config') == config_hash:
+				for line in lines[1:]:
+					try:
+						item = json.loads(line)
+					except ValueError:
+						# The last line might be incomplete if the previous run has been killed while writing it
+						logging.warning("DremioClonerJournal: ignoring incomplete journal entry " + line)
+						continue
+					self._completed.add((item['key'], item['hash']))
+				logging.info("DremioClonerJournal: resuming from journal " + filename + " with " + str(len(self._completed)) + " completed write(s).")
+				self._file = open(filename, "a", encoding="utf-8")
+				return
+			logging.info("DremioClonerJournal: journal " + filename + " was created with a different configuration, starting a new journal.")
+		self._file = open(filename, "w", encoding="utf-8")
+		self._append({'config': config_hash})
+
+	def get_hash(self, data):
+		return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+	def get_key(self, object_type, data):
+		if 'path' in data:
+			return object_type + ":" + "/".join(data['path'])
+		return object_type + ":" + str(data.get('name'))
+
+	def contains(self, key, content_hash):
+		with self._lock:
+			return (key, content_hash) in self._completed
+
+	def record(self, key, content_hash):
+		with self._lock:
+			if (key, content_hash) in self._completed:
+				return
+			self._completed.add((key, content_hash))
+			self._append({'key': key, 'hash': content_hash})
+
+	def close(self, remove=False):
+		with self._lock:
+			self._file.close()
+			if remove:
+				os.remove(self._filename)
+				logging.info("DremioClonerJournal: all writes completed, removed journal " + self._filename)
+
+	def _append(self, item):
+		self._file.write(json.dumps(item, sort_keys=True) + "\n")
+		self._file.flush()
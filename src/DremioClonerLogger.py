@@ -16,6 +16,7 @@
 
 
 import logging
+import threading
 
 
 class DremioClonerLogger:
@@ -26,10 +27,12 @@ class DremioClonerLogger:
 
 	# Error counter
 	errors_encountered = 0
+	_errors_lock = None
 
 	def __init__(self, max_errors = 9999, is_verbose = False):
 		self._max_errors = max_errors
 		self._verbose = is_verbose
+		self._errors_lock = threading.Lock()
 
 	def fatal(self, error):
 		return self.error(error, True)
@@ -40,8 +43,11 @@ class DremioClonerLogger:
 			raise RuntimeError("Critical error: " + str(error))
 		else:
 			logging.error(error)
-			self.errors_encountered = self.errors_encountered + 1
-			if self.errors_encountered > self._max_errors:
+			# Errors may be reported from worker threads when concurrent processing is enabled
+			with self._errors_lock:
+				self.errors_encountered = self.errors_encountered + 1
+				errors_encountered = self.errors_encountered
+			if errors_encountered > self._max_errors:
 				logging.critical("Exceeded max number of errors: " + str(self._max_errors))
 				raise RuntimeError("Exceeded max number of errors: " + str(self._max_errors))
 
@@ -19,7 +19,11 @@ import logging
 import json
 import time
 import sys
+import threading
 import urllib
+from DremioPrincipalCache import DremioPrincipalCache
+from DremioTransport import DremioTransport
+from DremioJobResultPager import DremioJobResultPager
 
 ###
 # Dremio Cloud API wrapper.
@@ -56,11 +60,19 @@ class DremioCloud:
 	_api_timeout = None 			# Default 10 seconds
 	_retry_timedout_source = None 	# Do not retry SOURCE that has timed out in previous API calls. Default False
 	errors_encountered = 0
+	_errors_lock = None
 	# Misc
 	_timed_out_sources = []
-
-	def __init__(self, endpoint, username, password, org_id, project_id, api_timeout=10, retry_timedout_source=False, verify_ssl=True):
-		self._session = requests.Session()
+	_job_result_page_size = 500		# Max number of rows per job results page accepted by the API
+	_job_poll_max_interval = 5		# Max seconds between job status checks
+	_principal_cache = None
+
+	def __init__(self, endpoint, username, password, org_id, project_id, api_timeout=10, retry_timedout_source=False, verify_ssl=True, transport=None):
+		# Shared by all threads calling the API, see DremioTransport
+		self._transport = transport if transport is not None else DremioTransport()
+		self._principal_cache = DremioPrincipalCache()
+		# Errors are counted from worker threads and from the event loop of AsyncDremio
+		self._errors_lock = threading.Lock()
 		if not verify_ssl:
 			logging.warn("Unverified HTTPS requests will be made as per configuration.")
 			requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
@@ -83,7 +95,7 @@ class DremioCloud:
 			payload = '{"username": "' + self._username + '","password": "' + self._password + '","orgId": "' + self._org_id + '"}'
 			payload = payload.encode(encoding='utf-8')
 			try:
-				response = self._session.request("POST", self._login_endpoint + self._login_url, data=payload, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._transport.request("POST", self._login_endpoint + self._login_url, data=payload, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			except Exception as e:
 				print(e)
 			if response.status_code != 200:
@@ -121,19 +133,22 @@ class DremioCloud:
 
 	def get_user(self, user_id):
 		url = "ui"+ self._user_url + user_id
-		return self._api_get_json(url, source="get_user")
+		return self._principal_cache.get_by_id('user', user_id, lambda: self._api_get_json(url, source="get_user", not_found_result=DremioPrincipalCache.NOT_FOUND))
 
 	def get_user_by_name(self, username):
 		url = "ui" + self._user_by_name_url + username
-		return self._api_get_json(url, source="get_user_by_name")
+		return self._principal_cache.get_by_name('user', username, lambda: self._api_get_json(url, source="get_user_by_name", not_found_result=DremioPrincipalCache.NOT_FOUND))
 
 	def get_role(self, role_id):
 		url = self._url_prefix + self._project_id + self._role_url + role_id
-		return self._api_get_json(url, source="get_role")
+		return self._principal_cache.get_by_id('role', role_id, lambda: self._api_get_json(url, source="get_role", not_found_result=DremioPrincipalCache.NOT_FOUND))
 
 	def get_role_by_name(self, rolename):
 		url = self._url_prefix + self._project_id + self._role_by_name_url + rolename
-		return self._api_get_json(url, source="get_role_by_name")
+		return self._principal_cache.get_by_name('role', rolename, lambda: self._api_get_json(url, source="get_role_by_name", not_found_result=DremioPrincipalCache.NOT_FOUND))
+
+	def get_principal_cache_stats(self):
+		return self._principal_cache.get_stats()
 
 	def get_catalog_tags(self, entity_id):
 		url = self._url_prefix + self._project_id + self._catalog_url + entity_id + "/collaboration/tag"
@@ -162,7 +177,7 @@ class DremioCloud:
 	# This method has to be refactored when DX-16597 is resolved
 	def list_pds(self, sources,
 				 source_folder_filter=None, source_folder_filter_paths=None, source_folder_exclude_filter=None,
-				 pds_filter=None, pds_exclude_filter=None, pds_error_list=None):
+				 pds_filter=None, pds_exclude_filter=None, pds_error_list=None, concurrency=1):
 		pds_list = []
 		# Check filters for complete PDS suppression
 		if not sources:
@@ -192,42 +207,54 @@ class DremioCloud:
 			sql = sql + " and TABLE_NAME not like '" + pds_exclude_filter + "' "
 
 		jobid = self.submit_sql(sql)
-		# Wait for the job to complete. Should only take a moment
+		if jobid is None:
+			logging.critical("list_pds: unexpected error, cannot submit SQL query. Cannot get a list of PDS.")
+			raise RuntimeError("Unexpected error, cannot submit SQL query. Cannot get a list of PDS.")
+		self._wait_for_job(jobid)
+		# Retrieve list of PDS
+		page_size = self._job_result_page_size
+		job_result = self.get_job_result(jobid, 0, page_size)
+		if job_result is None:
+			logging.critical("list_pds: unexpected error, cannot read job result for jobId: " + jobid)
+			raise RuntimeError("Unexpected error, cannot read job result. Cannot get a list of PDS.")
+		num_rows = int(job_result['rowCount'])
+		if num_rows == 0:
+			logging.warn("list_pds: no PDS found as per filter criteria.")
+			return pds_list
+		logging.info("list_pds: processing " + str(num_rows) + " PDSs in batches of " + str(page_size) + ".")
+		# Pages are fetched a few at a time ahead of processing, while rows of each page are resolved into
+		# catalog entities by a pool of `concurrency` workers. Results are collected in the original row order.
+		pager = DremioJobResultPager(self, page_size, concurrency)
+		for row, (normalized_path, entity) in pager.get_resolved_rows(jobid, job_result, num_rows, self._resolve_pds_row):
+			if entity is None:
+				if pds_error_list is not None:
+					pds_error_list.append({"name": row['TABLE_NAME'], "path": normalized_path})
+				logging.error("list_pds: error reading entity for: " + normalized_path + row['TABLE_NAME'] + " The SOURCE is likely not available at the moment. See DEBUG logging for more information.")
+			else:
+				pds_list.append(entity)
+		return pds_list
+
+	# Wait for the job to complete polling its status with exponential backoff
+	def _wait_for_job(self, jobid):
+		poll_interval = 0.1
 		while True:
 			job_info = self.get_job_info(jobid)
-			logging.info("list_pds: waiting for SQL query to finish. Job status: " + job_info["jobState"])
 			if job_info is None:
 				logging.critical("list_pds: unexpected error. Cannot get a list of PDS.")
 				raise RuntimeError("Unexpected error. Cannot get a list of PDS.")
+			logging.info("list_pds: waiting for SQL query to finish. Job status: " + job_info["jobState"])
 			if job_info["jobState"] in ['CANCELED', 'FAILED']:
 				logging.critical("list_pds: unexpected error, SQL job failed. Cannot get a list of PDS.")
 				raise RuntimeError("Unexpected error, SQL job failed. Cannot get a list of PDS.")
 			if job_info["jobState"] == 'COMPLETED':
-				break
-			time.sleep(1)
-		# Retrieve list of PDS
-		job_result = self.get_job_result(jobid)
-		num_rows = int(job_result['rowCount'])
-		if num_rows == 0:
-			logging.warn("list_pds: no PDS found as per filter criteria.")
-			return pds_list
-		logging.info("list_pds: processing " + str(num_rows) + " PDSs in batches of 100.")
-		# Page through the results, 100 rows per page
-		limit = 100
-		for i in range(0, int(num_rows / limit) + 1):
-			logging.info("list_pds: processing batch " + str(i + 1))
-			job_result = self.get_job_result(jobid, limit * i, limit)
-			for row in job_result['rows']:
-				# The schema (path) is denormalized: instead of abc/ab.c/abc it has abc.ab.c.abc, we need to recover it
-				normalized_path = self._normalize_schema(row['TABLE_SCHEMA'])
-				entity = self.get_catalog_entity_by_path(normalized_path + row['TABLE_NAME'])
-				if entity is None:
-					if pds_error_list is not None:
-						pds_error_list.append({"name": row['TABLE_NAME'], "path": normalized_path})
-					logging.error("list_pds: error reading entity for: " + normalized_path + row['TABLE_NAME'] + " The SOURCE is likely not available at the moment. See DEBUG logging for more information.")
-				else:
-					pds_list.append(entity)
-		return pds_list
+				return
+			time.sleep(poll_interval)
+			poll_interval = min(poll_interval * 2, self._job_poll_max_interval)
+
+	def _resolve_pds_row(self, row):
+		# The schema (path) is denormalized: instead of abc/ab.c/abc it has abc.ab.c.abc, we need to recover it
+		normalized_path = self._normalize_schema(row['TABLE_SCHEMA'])
+		return normalized_path, self.get_catalog_entity_by_path(normalized_path + row['TABLE_NAME'])
 
 	_cached_schemas = {}
 	def _normalize_schema(self, schema):
@@ -348,7 +375,7 @@ class DremioCloud:
 		return self._api_delete(url, source="delete_catalog_entity", report_error = report_error)
 
 	# Returns JSON if success or None
-	def _api_get_json(self, url, source="", report_error=True, reauthenticate=False):
+	def _api_get_json(self, url, source="", report_error=True, reauthenticate=False, not_found_result=None):
 		if reauthenticate:
 			self._detect_api_version()
 			self._authenticate()
@@ -369,13 +396,13 @@ class DremioCloud:
 				raise requests.exceptions.Timeout()
 			endpoint = self._login_endpoint if source is not None and (source == "get_user" or source == "get_user_by_name") else self._endpoint
 			attempts = 0
-			response = self._session.request("GET", endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._transport.request("GET", endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			status = response.status_code
 			while attempts < 3 and status == 400:
 				attempts = attempts + 1
 				logging.debug("Received 400 - Letting API breathe for 5 seconds, then trying previous request again")
 				time.sleep(5)
-				response = self._session.request("GET", endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._transport.request("GET", endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 				status = response.status_code
 
 			if response.status_code == 200:
@@ -388,10 +415,11 @@ class DremioCloud:
 				if report_error:
 					logging.info(source + ": received HTTP Response Code " + str(response.status_code) +
 									" for : <" + str(url) + ">" + self._get_error_message(response))
+				return not_found_result
 			elif response.status_code == 401 or response.status_code == 403:
 				# Try to reauthenticate since the token might expire
 				if not reauthenticate:
-					return self._api_get_json(url, source, report_error, True)
+					return self._api_get_json(url, source, report_error, True, not_found_result)
 				logging.critical(source + ": received HTTP Response Code " + str(response.status_code) +
 								 " for : <" + str(url) + ">" + self._get_error_message(response))
 				return None
@@ -401,14 +429,14 @@ class DremioCloud:
 				if report_error:
 					logging.error(source + ": received HTTP Response Code " + str(response.status_code) +
 								" for : <" + str(url) + ">" + self._get_error_message(response))
-					self.errors_encountered = self.errors_encountered + 1
+					self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			if source_name is None or source_name not in self._timed_out_sources:
 				# This situation might happen when an underlying object (file system eg) is not responding
 				if report_error:
 					logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-					self.errors_encountered = self.errors_encountered + 1
+					self._count_error()
 				else:
 					logging.info(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
 			if source_name is not None and source_name not in self._timed_out_sources:
@@ -422,11 +450,11 @@ class DremioCloud:
 			self._authenticate()
 		try:
 			if json_data is None:
-				response = self._session.request("POST", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._transport.request("POST", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			elif as_json:
-				response = self._session.request("POST", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._transport.request("POST", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			else:
-				response = self._session.request("POST", self._endpoint + url, data=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._transport.request("POST", self._endpoint + url, data=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				return response.json()
 			# Success, but no response
@@ -452,12 +480,12 @@ class DremioCloud:
 			else:
 				logging.error(source + ": received HTTP Response Code " + str(response.status_code) +
 							  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
 	# Returns JSON if success or None
@@ -466,7 +494,7 @@ class DremioCloud:
 			self._detect_api_version()
 			self._authenticate()
 		try:
-			response = self._session.request("PUT", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._transport.request("PUT", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				return response.json()
 			elif response.status_code == 400:  # The supplied CatalogEntity object is invalid.
@@ -501,12 +529,12 @@ class DremioCloud:
 				else:
 					logging.debug(source + ": received HTTP Response Code " + str(response.status_code) +
 								  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
 	# Returns JSON if success or None
@@ -515,7 +543,7 @@ class DremioCloud:
 			self._detect_api_version()
 			self._authenticate()
 		try:
-			response = self._session.request("DELETE", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._transport.request("DELETE", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				return response.json()
 			elif response.status_code == 204:
@@ -552,14 +580,18 @@ class DremioCloud:
 				else:
 					logging.debug(source + ": received HTTP Response Code " + str(response.status_code) +
 								  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
+	def _count_error(self):
+		with self._errors_lock:
+			self.errors_encountered = self.errors_encountered + 1
+
 	def _get_error_message(self, response):
 		message = ""
 		try:
@@ -59,7 +59,7 @@ class DremioCloudV2(DremioCloud):
 		)
 	"""
 
-	def __init__(self, endpoint, username, password, org_id, project_id, api_timeout=10, retry_timedout_source=False, verify_ssl=True):
+	def __init__(self, endpoint, username, password, org_id, project_id, api_timeout=10, retry_timedout_source=False, verify_ssl=True, transport=None):
 		"""
 		Initialize DremioCloudV2 instance.
 		
@@ -72,9 +72,10 @@ class DremioCloudV2(DremioCloud):
 			api_timeout: API request timeout in seconds (default: 10)
 			retry_timedout_source: Whether to retry timed-out sources (default: False)
 			verify_ssl: Whether to verify SSL certificates (default: True)
+			transport: HTTP transport to use, see DremioTransport (default: a new DremioTransport)
 		"""
 		# Call parent constructor
-		super().__init__(endpoint, username, password, org_id, project_id, api_timeout, retry_timedout_source, verify_ssl)
+		super().__init__(endpoint, username, password, org_id, project_id, api_timeout, retry_timedout_source, verify_ssl, transport)
 		
 		# Set serverless mode based on detected API version
 		if self._api_version == "v2":
@@ -37,3 +37,111 @@ class DremioData():
 	dremio_get_config = []
 
 	pds_error_list = []
+
+	# Attribute identifying an entity within a collection, 'id' unless specified here
+	_id_attributes = {'tags': 'entity_id', 'wikis': 'entity_id'}
+
+	# Lookup indexes by collection name: [list, list length, entities by id, entities by normalized path]
+	_indexes = None
+
+	def __init__(self):
+		self.containers = []
+		self.homes = []
+		self.sources = []
+		self.spaces = []
+		self.folders = []
+		self.pds_list = []
+		self.vds_list = []
+		self.reflections = []
+		self.queues = []
+		self.rules = []
+		self.tags = []
+		self.wikis = []
+		self.udfs = []
+		self.referenced_users = []
+		self.referenced_roles = []
+		self.files = []
+		self.vds_parents = []
+		self.dremio_get_config = []
+		self.pds_error_list = []
+		self._indexes = {}
+
+	# Append entity to the collection unless it is there already, see contains. With first=True the entity is
+	# inserted at the beginning of the collection instead. Returns True if added.
+	def add(self, collection, entity, first=False):
+		if self.contains(collection, entity):
+			return False
+		index = self._get_index(collection)
+		if first:
+			index[0].insert(0, entity)
+		else:
+			index[0].append(entity)
+		self._index_entity(collection, index, entity, first)
+		return True
+
+	def remove(self, collection, entity):
+		index = self._get_index(collection)
+		index[0].remove(entity)
+		for key, entities_by_key in zip(self._get_keys(collection, entity), index[1:]):
+			if key is not None:
+				bucket = entities_by_key[key]
+				bucket.remove(entity)
+				if len(bucket) == 0:
+					del entities_by_key[key]
+
+	# An entity with an id (entity_id for tags and wikis) is in the collection if an entity with the same id is.
+	# An entity without an id is in the collection if an equal entity is.
+	def contains(self, collection, entity):
+		id_attribute = self._id_attributes.get(collection, 'id')
+		if id_attribute in entity:
+			return entity[id_attribute] in self._get_index(collection)[1]
+		return entity in getattr(self, collection)
+
+	def get_by_id(self, collection, entity_id):
+		bucket = self._get_index(collection)[1].get(entity_id)
+		return bucket[0] if bucket is not None else None
+
+	# Path may be a list or a path normalized with '/'
+	def get_by_path(self, collection, path):
+		if type(path) != str:
+			path = "/".join(path)
+		bucket = self._get_index(collection)[2].get(path)
+		return bucket[0] if bucket is not None else None
+
+	# Indexes do not see entities changed in place. Call after changing the path, name or id of entities
+	# of the collection, e.g. when mapping source names or moving spaces into a catalog.
+	def reindex(self, collection):
+		self._indexes.pop(collection, None)
+
+	# Collections are public and may be replaced as a whole, e.g. when loaded from a file, the index is then rebuilt.
+	# Once a collection has been looked up, entities must be added and removed with add and remove only.
+	# Index: [list, entities by id, entities by path], entities are kept in lists in collection order
+	def _get_index(self, collection):
+		entities = getattr(self, collection)
+		index = self._indexes.get(collection)
+		if index is None or index[0] is not entities:
+			index = [entities, {}, {}]
+			for entity in entities:
+				self._index_entity(collection, index, entity)
+			self._indexes[collection] = index
+		return index
+
+	def _index_entity(self, collection, index, entity, first=False):
+		for key, entities_by_key in zip(self._get_keys(collection, entity), index[1:]):
+			if key is not None:
+				if first:
+					entities_by_key.setdefault(key, []).insert(0, entity)
+				else:
+					entities_by_key.setdefault(key, []).append(entity)
+
+	# Returns the id and the path of the entity, None if the entity has no such key
+	def _get_keys(self, collection, entity):
+		id_attribute = self._id_attributes.get(collection, 'id')
+		entity_id = entity[id_attribute] if id_attribute in entity else None
+		if 'path' in entity:
+			path = entity['path'] if type(entity['path']) == str else "/".join(entity['path'])
+		elif 'name' in entity:
+			path = entity['name']
+		else:
+			path = None
+		return entity_id, path
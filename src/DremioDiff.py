@@ -0,0 +1,108 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import threading
+
+
+###
+# Compares catalog entities of the source Dremio Data with the entities existing in the target environment
+# and collects the resulting plan of create/update/delete/noop actions, see write.plan_mode.
+###
+class DremioDiff:
+
+	CREATE = 'create'
+	UPDATE = 'update'
+	DELETE = 'delete'
+	NOOP = 'noop'
+	ACTIONS = [CREATE, UPDATE, DELETE, NOOP]
+
+	# Attributes maintained by the target environment, they are not part of the entity definition
+	_ignored_attributes = ['id', 'tag', 'createdAt', 'children', 'fields', 'owner', 'permissions']
+	_acl_principal_types = ['users', 'groups', 'roles']
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		# List of (action, object type, object description)
+		self._plan = []
+
+	# Returns True if updating existing_entity with entity would not change anything in the target environment.
+	# Attributes of both entities are compared, an attribute missing on one side only is a difference.
+	def is_entity_equal(self, entity, existing_entity):
+		normalized_entity = self.normalize_entity(entity)
+		normalized_existing_entity = self.normalize_entity(existing_entity)
+		for key in set(normalized_entity) | set(normalized_existing_entity):
+			if normalized_entity.get(key) != normalized_existing_entity.get(key):
+				return False
+		return True
+
+	def normalize_entity(self, entity):
+		normalized_entity = {}
+		for key in entity:
+			if key in self._ignored_attributes:
+				continue
+			if key == 'accessControlList':
+				acl = self._normalize_acl(entity[key])
+				# An empty ACL is the same as no ACL
+				if len(acl) > 0:
+					normalized_entity[key] = acl
+			elif key == 'sqlContext':
+				# An empty context is the same as no context
+				if entity[key] is not None and len(entity[key]) > 0:
+					normalized_entity[key] = entity[key]
+			else:
+				normalized_entity[key] = entity[key]
+		return normalized_entity
+
+	def _normalize_acl(self, acl):
+		# Principal and permission order is irrelevant, version is maintained by the target environment
+		normalized_acl = {}
+		for principal_type in self._acl_principal_types:
+			if principal_type in acl and len(acl[principal_type]) > 0:
+				normalized_acl[principal_type] = sorted([(principal.get('id'), tuple(sorted(principal.get('permissions', [])))) for principal in acl[principal_type]])
+		return normalized_acl
+
+	def get_object_type(self, entity):
+		if entity.get('entityType') == 'dataset':
+			return 'vds' if entity.get('type') == 'VIRTUAL_DATASET' else 'pds'
+		return str(entity.get('entityType'))
+
+	def add(self, action, object_type, desc):
+		with self._lock:
+			self._plan.append((action, object_type, desc))
+
+	def get_plan(self):
+		with self._lock:
+			return list(self._plan)
+
+	# Returns counts keyed by object type and then by action
+	def get_counts(self):
+		counts = {}
+		for action, object_type, desc in self.get_plan():
+			if object_type not in counts:
+				counts[object_type] = dict.fromkeys(self.ACTIONS, 0)
+			counts[object_type][action] = counts[object_type][action] + 1
+		return counts
+
+	def get_summary(self):
+		counts = self.get_counts()
+		lines = ["%-12s %8s %8s %8s %8s" % tuple(["object"] + self.ACTIONS)]
+		totals = dict.fromkeys(self.ACTIONS, 0)
+		for object_type in sorted(counts):
+			lines.append("%-12s %8d %8d %8d %8d" % tuple([object_type] + [counts[object_type][action] for action in self.ACTIONS]))
+			for action in self.ACTIONS:
+				totals[action] = totals[action] + counts[object_type][action]
+		lines.append("%-12s %8d %8d %8d %8d" % tuple(["total"] + [totals[action] for action in self.ACTIONS]))
+		return lines
@@ -15,20 +15,26 @@
 ########
 
 from DremioData import DremioData
+from DremioFileStream import DremioFileStream
 from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
 from datetime import datetime
 import json
 import logging
 import os, errno
-from shutil import rmtree
 import pathlib
 import copy
+import concurrent.futures
 
 class DremioFile():
 
 	_config = None
 	_utils = None
+	# Directories and files of a directory export, see save_dremio_environment_as_directory
+	_directories = None
+	_files = None
+	# Incremental read manifest is saved next to the target file or directory with this suffix
+	_manifest_suffix = ".manifest.json"
 
 	def __init__(self, config):
 		self._config = config
@@ -51,6 +57,37 @@ class DremioFile():
 		else:
 			raise Exception('Source filename or directory must be specified.')
 
+	# Returns DremioData and manifest of the previous export to the target file or directory, or (None, None) if unavailable
+	def read_previous_dremio_environment(self):
+		manifest_filename = self._get_manifest_filename()
+		if not os.path.isfile(manifest_filename):
+			logging.info("read_previous_dremio_environment: manifest " + manifest_filename + " not found, reading full environment.")
+			return None, None
+		if self._config.target_filename is not None and os.path.isfile(self._config.target_filename):
+			dremio_data = self.read_dremio_environment_from_json_file(self._config.target_filename)
+		elif self._config.target_directory is not None and os.path.isdir(self._config.target_directory):
+			dremio_data = self.read_dremio_environment_from_directory(self._config.target_directory)
+		else:
+			logging.info("read_previous_dremio_environment: previous export not found, reading full environment.")
+			return None, None
+		f = open(manifest_filename, "r", encoding="utf-8")
+		manifest = json.load(f)
+		f.close()
+		return dremio_data, manifest
+
+	def save_manifest(self, manifest):
+		f = open(self._get_manifest_filename(), "w", encoding="utf-8")
+		json.dump(manifest, f, indent=4, sort_keys=True)
+		f.close()
+
+	def _get_manifest_filename(self):
+		if self._config.target_filename is not None:
+			return self._config.target_filename + self._manifest_suffix
+		elif self._config.target_directory is not None:
+			return self._config.target_directory.rstrip('/\\') + self._manifest_suffix
+		else:
+			raise Exception('Target filename or directory must be specified.')
+
 	def save_dremio_environment_as_json_file(self, dremio_data):
 		filename = self._config.target_filename
 		if os.path.isfile(filename):
@@ -121,10 +158,10 @@ class DremioFile():
 
 	def read_dremio_environment_from_json_file(self, filename):
 		f = open(filename, "r", encoding="utf-8")
-		data = json.load(f)['data']
-		f.close()
 		dremio_data = DremioData()
-		for item in data:
+		# Read sections one by one, multi-GB files are never loaded into memory as a whole
+		for name, value in DremioFileStream(f).read_sections():
+			item = {name: value}
 			if ('dremio_environment' in item):
 				logging.info("read_dremio_environment: processing environment " + str(item))
 			elif ('containers' in item):
@@ -165,43 +202,42 @@ class DremioFile():
 				dremio_data.dremio_get_config = item['dremio_get_config']
 			else:
 				logging.warn("read_dremio_environment: unexpected data in the source file " + str(item))
+		f.close()
 		return dremio_data
 
 
 	def save_dremio_environment_as_directory(self, dremio_data):
 		target_directory = self._config.target_directory
+		# Collect directories and files first, then write them all at once, see _save_directory
+		self._directories = set()
+		self._files = {}
 		try:
 			# create directory structure as needed
-			if os.path.isdir(target_directory):
-				rmtree(target_directory)
-			os.makedirs(target_directory)
+			self._add_directory(target_directory)
 			if self._config.home_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'homes').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'homes'))
 			if self._config.source_process_mode == 'process' or self._config.pds_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'sources').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'sources'))
 			if self._config.space_process_mode == 'process' or self._config.vds_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'spaces').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'spaces'))
 			if self._config.reflection_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'reflections').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'reflections'))
 			if self._config.user_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'referenced_users').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'referenced_users'))
 			if self._config.group_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'referenced_roles').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'referenced_roles'))
 			if self._config.wlm_queue_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'queues').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'queues'))
 			if self._config.wlm_rule_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'rules').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'rules'))
 			if self._config.tag_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'tags').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'tags'))
 			if self._config.wiki_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'wikis').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'wikis'))
 			if self._config.udf_process_mode == 'process':
-				os.makedirs(os.path.join(target_directory, 'udf').encode(encoding='utf-8', errors='strict'))
+				self._add_directory(os.path.join(target_directory, 'udf'))
 			if self._config.source_graph_support and self._config.vds_dependencies_process_mode == 'get':
-				os.makedirs(os.path.join(target_directory, 'vds_parents').encode(encoding='utf-8', errors='strict'))
-		except OSError as e:
-			raise Exception("Error processing directory structure. OS Error: " + e.strerror)
-		try:
+				self._add_directory(os.path.join(target_directory, 'vds_parents'))
 			# Save configuration
 			# Remove password if present
 			for config_item in self._config.cloner_conf_json:
@@ -210,28 +246,23 @@ class DremioFile():
 						if 'password' in source_item:
 							source_item['password'] = ''
 							break
-			f = open(os.path.join(target_directory, self._config.dremio_conf_filename), "w", encoding="utf-8")
-			json.dump({'dremio_get_config':self._config.cloner_conf_json}, f, indent=4, sort_keys=True)
-			f.close()
+			self._add_file(os.path.join(target_directory, self._config.dremio_conf_filename), {'dremio_get_config':self._config.cloner_conf_json})
 			# Process all entities
 			if self._config.home_process_mode == 'process':
 				for home in dremio_data.homes:
-					os.makedirs(os.path.join(target_directory, "homes", self._replace_special_characters(home['name'])).encode(encoding='utf-8', errors='strict'))
+					self._add_directory(os.path.join(target_directory, "homes", self._replace_special_characters(home['name'])))
 					self._write_container_json_file(os.path.join(target_directory, "homes"), home)
 			if self._config.space_process_mode == 'process':
 				for space in dremio_data.spaces:
-					os.makedirs(os.path.join(target_directory, "spaces", self._replace_special_characters(space['name'])).encode(encoding='utf-8', errors='strict'))
+					self._add_directory(os.path.join(target_directory, "spaces", self._replace_special_characters(space['name'])))
 					self._write_container_json_file(os.path.join(target_directory, "spaces"), space)
 			if self._config.source_process_mode == 'process':
 				for source in dremio_data.sources:
-					os.makedirs(os.path.join(target_directory, "sources", self._replace_special_characters(source['name'])).encode(encoding='utf-8', errors='strict'))
+					self._add_directory(os.path.join(target_directory, "sources", self._replace_special_characters(source['name'])))
 					self._write_container_json_file(os.path.join(target_directory, "sources"), source)
 			if self._config.folder_process_mode == 'process' or self._config.vds_process_mode == 'process':
 				for folder in dremio_data.folders:
-					# ignore directory exists error, we might have created it prior
-					dirpath = os.path.join(target_directory, "spaces", self._get_fs_path(folder['path'])).encode(encoding='utf-8',errors='strict')
-					if not os.path.isdir(dirpath):
-						os.makedirs(dirpath)
+					self._add_directory(os.path.join(target_directory, "spaces", self._get_fs_path(folder['path'])))
 					if self._config.folder_process_mode == 'process':
 						self._write_folder_json_file(os.path.join(target_directory, "spaces"), folder)
 			if self._config.vds_process_mode == 'process':
@@ -267,13 +298,78 @@ class DremioFile():
 					self._write_wiki_json_file(os.path.join(target_directory, "udf"), udf)
 			for vds_parent in dremio_data.vds_parents:
 				self._write_object_json_file(os.path.join(target_directory, "vds_parents"), vds_parent)
+			self._save_directory(target_directory)
 		except OSError as e:
 			raise Exception("Error writing file. OS Error: " + e.strerror)
 
 
-	def read_dremio_environment_from_directory(self):
+	def _add_directory(self, directory):
+		self._directories.add(os.path.normpath(directory))
+
+
+	# Registers a file to be written by _save_directory. Content is either a string or an object to save as JSON
+	def _add_file(self, filepath, content):
+		self._files[os.path.normpath(filepath)] = content
+
+
+	def _save_directory(self, target_directory):
+		# Create every directory once, parents sort before their children
+		for directory in sorted(self._directories):
+			os.makedirs(directory, exist_ok=True)
+		files = list(self._files.items())
+		if self._config.file_concurrency > 1:
+			with concurrent.futures.ThreadPoolExecutor(max_workers=self._config.file_concurrency) as executor:
+				written = sum(executor.map(self._save_file, files))
+		else:
+			written = sum(map(self._save_file, files))
+		# Replaces removal of the whole target directory, only export files that are no longer exported get deleted.
+		# Hidden entries, e.g. .git, and files of other types are left untouched.
+		removed = 0
+		for (dirpath, dirnames, filenames) in os.walk(target_directory):
+			dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith('.')]
+			for filename in filenames:
+				filepath = os.path.normpath(os.path.join(dirpath, filename))
+				if filepath not in self._files and self._is_export_file(filename):
+					os.remove(filepath)
+					removed = removed + 1
+		for (dirpath, dirnames, filenames) in os.walk(target_directory, topdown=False):
+			if os.path.normpath(dirpath) not in self._directories and self._is_export_directory(target_directory, dirpath) and len(os.listdir(dirpath)) == 0:
+				os.rmdir(dirpath)
+		logging.info("save_dremio_environment_as_directory: " + str(written) + " file(s) written, " + str(len(files) - written) +
+					 " file(s) unchanged, " + str(removed) + " file(s) removed.")
+
+
+	# Files of the types written by save_dremio_environment_as_directory, see _save_directory
+	def _is_export_file(self, filename):
+		return not filename.startswith('.') and (filename.endswith('.json') or filename.endswith('.sql'))
+
+
+	def _is_export_directory(self, target_directory, dirpath):
+		relpath = os.path.relpath(dirpath, target_directory)
+		return relpath != '.' and not any(part.startswith('.') for part in relpath.split(os.sep))
+
+
+	# Returns True if the file has been written, False if the existing file has identical content
+	def _save_file(self, file):
+		filepath, content = file
+		if not isinstance(content, str):
+			content = json.dumps(content, indent=4, sort_keys=True)
+		if os.path.isfile(filepath):
+			f = open(filepath, "r", encoding="utf-8")
+			existing_content = f.read()
+			f.close()
+			if existing_content == content:
+				return False
+		f = open(filepath, "w", encoding="utf-8")
+		f.write(content)
+		f.close()
+		return True
+
+
+	def read_dremio_environment_from_directory(self, source_directory=None):
 		try:
-			source_directory = self._config.source_directory
+			if source_directory is None:
+				source_directory = self._config.source_directory
 			dremio_data = DremioData()
 			f = open(os.path.join(source_directory, self._config.dremio_conf_filename), "r", encoding="utf-8")
 			dremio_data.dremio_get_config = json.load(f)
@@ -299,76 +395,80 @@ class DremioFile():
 
 
 	def _collect_directory(self, directory, container_list, folder_list, object_list):
+		# Walk in sorted order so that entities are collected in the same order on every platform
+		json_files = []
+		# SQL files keyed by the JSON file of the same entity in the same directory
+		sql_files = {}
 		for (dirpath, dirnames, filenames) in os.walk(directory):
-			for filename in filenames:
+			dirnames.sort()
+			for filename in sorted(filenames):
 				if filename.endswith('.json'):
-					f = open(os.path.join(dirpath, filename), "r", encoding="utf-8")
-					data = json.load(f)
-					f.close()
-					if self._config.container_filename == filename:
-						# First level of dirpath is a container if container_list passed
-						if container_list is None or ('/' in dirpath[len(directory)+1:] or '\\' in dirpath[len(directory)+1:]):
-							if folder_list is not None:
-								folder_list.append(data)
-						else:
-							container_list.append(data)
-					else:
-						object_list.append(data)
+					json_files.append(os.path.join(dirpath, filename))
 				elif filename.endswith('.sql'): # only has effect if target_separate_sql_and_metadata_files is True
-					try:
-						entity_data = next(filter(lambda x: x['path'][-1] == filename.replace('.sql', ''), object_list))
-						with open(os.path.join(dirpath, filename), 'r') as f:
-							entity_data['sql'] = f.read()
-					except StopIteration as e: 
-						raise Exception(f"The entity data was not found for {filename.replace('.sql', '')}, does the {filename.replace('.sql', '.json')} exist?")
-						
+					sql_files[os.path.join(dirpath, filename[:-len('.sql')] + '.json')] = os.path.join(dirpath, filename)
+		for sql_file in sql_files:
+			if not os.path.isfile(sql_file):
+				filename = os.path.basename(sql_file)
+				raise Exception(f"The entity data was not found for {filename.replace('.json', '')}, does the {filename} exist?")
+		files = [(json_file, sql_files.get(json_file)) for json_file in json_files]
+		if self._config.file_concurrency > 1:
+			with concurrent.futures.ThreadPoolExecutor(max_workers=self._config.file_concurrency) as executor:
+				file_data = list(executor.map(self._load_entity_files, files))
+		else:
+			file_data = list(map(self._load_entity_files, files))
+		for json_file, data in zip(json_files, file_data):
+			dirpath, filename = os.path.split(json_file)
+			if self._config.container_filename == filename:
+				# First level of dirpath is a container if container_list passed
+				if container_list is None or ('/' in dirpath[len(directory)+1:] or '\\' in dirpath[len(directory)+1:]):
+					if folder_list is not None:
+						folder_list.append(data)
+				else:
+					container_list.append(data)
+			else:
+				object_list.append(data)
 
 
-	def _write_container_json_file(self, root_dir, container):
-		filepath = os.path.join(root_dir, container['name'], self._config.container_filename).encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(container, f, indent=4, sort_keys=True)
+	def _load_entity_files(self, files):
+		json_file, sql_file = files
+		f = open(json_file, "r", encoding="utf-8")
+		data = json.load(f)
 		f.close()
+		if sql_file is not None:
+			f = open(sql_file, "r", encoding="utf-8")
+			data['sql'] = f.read()
+			f.close()
+		return data
+
+
+	def _write_container_json_file(self, root_dir, container):
+		self._add_directory(os.path.join(root_dir, container['name']))
+		self._add_file(os.path.join(root_dir, container['name'], self._config.container_filename), container)
 
 
 	def _write_wiki_json_file(self, root_dir, wiki):
 		if wiki['entity_id'].startswith('{'):
 			wiki['entity_id'] = "".join(wiki['path'])
-		filepath = os.path.join(root_dir, wiki['entity_id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(wiki, f, indent=4, sort_keys=True)
-		f.close()
+		self._add_file(os.path.join(root_dir, wiki['entity_id'] + ".json"), wiki)
 
 
 	def _write_tag_json_file(self, root_dir, tag):
 		if tag['entity_id'].startswith('{'):
 			tag['entity_id'] = "".join(tag['path'])
-		filepath = os.path.join(root_dir, tag['entity_id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(tag, f, indent=4, sort_keys=True)
-		f.close()
+		self._add_file(os.path.join(root_dir, tag['entity_id'] + ".json"), tag)
 
 	def _write_rules_json_file(self, root_dir, rules):
-		filepath = os.path.join(root_dir, "rules.json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(rules, f, indent=4, sort_keys=True)
-		f.close()
+		self._add_file(os.path.join(root_dir, "rules.json"), rules)
 
 
 	def _write_object_json_file(self, root_dir, object):
 		if object['id'].startswith('{'):
 			object['id'] = "".join(object['path'])
-		filepath = os.path.join(root_dir, object['id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(object, f, indent=4, sort_keys=True)
-		f.close()
+		self._add_file(os.path.join(root_dir, object['id'] + ".json"), object)
 
 
 	def _write_folder_json_file(self, root_dir, folder):
-		filepath = os.path.join(root_dir, self._get_fs_path(folder['path']), self._config.container_filename).encode(encoding='utf-8',errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(folder, f, indent=4, sort_keys=True)
-		f.close()
+		self._add_file(os.path.join(root_dir, self._get_fs_path(folder['path']), self._config.container_filename), folder)
 
 
 	def _build_path(self, root_dir, path_parts, file_extension):
@@ -386,17 +486,15 @@ class DremioFile():
 		# check if any folder needs to be created
 		path_parts = entity['path']
 		filepath = self._build_path(root_dir=root_dir, path_parts=path_parts, file_extension=".sql")
-		filepath.parent.mkdir(parents=True, exist_ok=True)
-
-		with filepath.open('w', encoding="utf-8") as f:
-			f.write(entity['sql'])
+		self._add_directory(filepath.parent)
+		self._add_file(filepath, entity['sql'])
 
 
 	def _write_entity_json_file(self, root_dir, entity):
 		# check if any folder needs to be created
 		path_parts = entity['path']
 		filepath = self._build_path(root_dir=root_dir, path_parts=path_parts, file_extension=".json")
-		filepath.parent.mkdir(parents=True, exist_ok=True)
+		self._add_directory(filepath.parent)
 		
 		entity_data = copy.copy(entity)
 		if self._config.target_separate_sql_and_metadata_files is True:
@@ -404,8 +502,7 @@ class DremioFile():
 			if 'sql' in entity_data:
 				del entity_data['sql']
 
-		with filepath.open('w', encoding="utf-8") as f:
-			json.dump(entity_data, f, indent=4, sort_keys=True)
+		self._add_file(filepath, entity_data)
 			
 
 
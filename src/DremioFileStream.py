@@ -0,0 +1,129 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import json
+
+
+###
+# Incremental reader of a Dremio Cloner JSON file: { "data": [ { "section": value }, ... ] }
+# Sections are returned one at a time and lists are decoded item by item, so that the text held in memory
+# is bounded by the largest single object rather than by the size of the file.
+###
+class DremioFileStream:
+
+	_chunk_size = 1024 * 1024
+	_whitespace = ' \t\r\n'
+	_number_characters = '0123456789.eE+-'
+
+	def __init__(self, f):
+		self._f = f
+		self._decoder = json.JSONDecoder()
+		self._buffer = ''
+		self._pos = 0
+		# Position of the buffer in the file
+		self._offset = 0
+		self._eof = False
+
+	# Yields (section name, section value) pairs of the "data" list
+	def read_sections(self):
+		self._expect('{')
+		if self._decode() != 'data':
+			raise ValueError("DremioFileStream: 'data' expected at position " + str(self._offset + self._pos))
+		self._expect(':')
+		self._expect('[')
+		if self._peek() == ']':
+			return
+		while True:
+			self._expect('{')
+			if self._peek() != '}':
+				while True:
+					name = self._decode()
+					self._expect(':')
+					yield name, self._read_value()
+					c = self._next()
+					if c == '}':
+						break
+					if c != ',':
+						self._unexpected(',')
+			else:
+				self._next()
+			c = self._next()
+			if c == ']':
+				return
+			if c != ',':
+				self._unexpected(',')
+
+	def _read_value(self):
+		if self._peek() != '[':
+			return self._decode()
+		self._next()
+		items = []
+		if self._peek() == ']':
+			self._next()
+			return items
+		while True:
+			items.append(self._decode())
+			c = self._next()
+			if c == ']':
+				return items
+			if c != ',':
+				self._unexpected(',')
+
+	def _decode(self):
+		self._peek()
+		while True:
+			try:
+				value, end = self._decoder.raw_decode(self._buffer, self._pos)
+				# A number is complete only when followed by a character that cannot continue it
+				if self._eof or not isinstance(value, (int, float)) or (end < len(self._buffer) and self._buffer[end] not in self._number_characters):
+					self._pos = end
+					return value
+			except json.JSONDecodeError:
+				if self._eof:
+					raise
+			self._read_chunk()
+
+	def _peek(self):
+		while True:
+			while self._pos < len(self._buffer) and self._buffer[self._pos] in self._whitespace:
+				self._pos = self._pos + 1
+			if self._pos < len(self._buffer):
+				return self._buffer[self._pos]
+			if self._eof:
+				return ''
+			self._read_chunk()
+
+	def _next(self):
+		c = self._peek()
+		self._pos = self._pos + 1
+		return c
+
+	def _expect(self, c):
+		if self._next() != c:
+			self._unexpected(c)
+
+	def _unexpected(self, c):
+		raise ValueError("DremioFileStream: '" + c + "' expected at position " + str(self._offset + self._pos - 1))
+
+	def _read_chunk(self):
+		# Drop consumed text, grow reads with the pending text so that decoding large objects stays linear
+		self._buffer = self._buffer[self._pos:]
+		self._offset = self._offset + self._pos
+		self._pos = 0
+		chunk = self._f.read(max(self._chunk_size, len(self._buffer)))
+		if chunk == '':
+			self._eof = True
+		self._buffer = self._buffer + chunk
@@ -0,0 +1,60 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import collections
+import concurrent.futures
+import logging
+
+
+###
+# Reads the rows of a job result page by page and resolves every row with a pool of workers, see list_pds.
+# At most read_ahead pages are requested ahead of the page being resolved, so that memory use and the number
+# of outstanding requests stay bounded regardless of the size of the result.
+###
+class DremioJobResultPager:
+
+	def __init__(self, dremio_env, page_size, concurrency=1, read_ahead=4):
+		self._dremio_env = dremio_env
+		self._page_size = page_size
+		self._concurrency = max(concurrency, 1)
+		self._read_ahead = max(min(self._concurrency, read_ahead), 1)
+
+	# Yields (row, resolve_row(row)) for every row of the job result in the original row order
+	def get_resolved_rows(self, jobid, first_page, num_rows, resolve_row):
+		offsets = iter(range(self._page_size, num_rows, self._page_size))
+		pending_pages = collections.deque()
+		with concurrent.futures.ThreadPoolExecutor(max_workers=self._read_ahead) as page_executor, \
+				concurrent.futures.ThreadPoolExecutor(max_workers=self._concurrency) as row_executor:
+			page = first_page
+			page_number = 1
+			while True:
+				# Keep the window of outstanding page requests full
+				while len(pending_pages) < self._read_ahead:
+					offset = next(offsets, None)
+					if offset is None:
+						break
+					pending_pages.append(page_executor.submit(self._dremio_env.get_job_result, jobid, offset, self._page_size))
+				logging.info("list_pds: processing batch " + str(page_number))
+				if page is None:
+					logging.error("list_pds: error reading job result for jobId: " + jobid)
+				else:
+					futures = [row_executor.submit(resolve_row, row) for row in page['rows']]
+					for row, future in zip(page['rows'], futures):
+						yield row, future.result()
+				if len(pending_pages) == 0:
+					return
+				page = pending_pages.popleft().result()
+				page_number = page_number + 1
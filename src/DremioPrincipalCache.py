@@ -0,0 +1,67 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import copy
+import threading
+
+
+###
+# Per-run cache of users and roles retrieved from a Dremio environment.
+# Principals are cached by id and by name. Principals that do not exist (HTTP 404) are cached as well,
+# other failures are not cached so that the next lookup retries the API call.
+###
+class DremioPrincipalCache:
+
+	# Returned by the fetch function when the principal does not exist
+	NOT_FOUND = object()
+
+	# Lookup statistics
+	hits = 0
+	misses = 0
+
+	def __init__(self):
+		self._by_id = {'user': {}, 'role': {}}
+		self._by_name = {'user': {}, 'role': {}}
+		self._lock = threading.Lock()
+
+	def get_by_id(self, principal_type, principal_id, fetch):
+		return self._get(principal_type, self._by_id[principal_type], principal_id, fetch)
+
+	def get_by_name(self, principal_type, principal_name, fetch):
+		return self._get(principal_type, self._by_name[principal_type], principal_name, fetch)
+
+	def get_stats(self):
+		return "principal cache hits: " + str(self.hits) + ", misses: " + str(self.misses)
+
+	def _get(self, principal_type, cache, key, fetch):
+		with self._lock:
+			if key in cache:
+				self.hits = self.hits + 1
+				return copy.deepcopy(cache[key])
+			self.misses = self.misses + 1
+		principal = fetch()
+		if principal is None:
+			return None
+		with self._lock:
+			if principal is self.NOT_FOUND:
+				cache[key] = None
+				return None
+			cache[key] = principal
+			if 'id' in principal:
+				self._by_id[principal_type][principal['id']] = principal
+			if 'name' in principal:
+				self._by_name[principal_type][principal['name']] = principal
+		return copy.deepcopy(principal)
@@ -0,0 +1,83 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import threading
+import time
+
+
+###
+# Adaptive token bucket limiting the rate of API calls issued through DremioTransport.
+# The rate starts at max_rate requests per second and is adjusted once per second: it is halved when the server
+# throttled a request (429/503, connection errors, time-outs) or when the average latency of the last second
+# exceeded target_latency, otherwise it grows back towards max_rate by a twentieth of max_rate.
+###
+class DremioRateLimiter:
+
+	_adjust_interval = 1.0
+	_decrease_factor = 0.5
+	_increase_step = 0.05
+
+	def __init__(self, max_rate, target_latency=0, min_rate=1):
+		self._lock = threading.Lock()
+		self._max_rate = float(max_rate)
+		self._min_rate = min(float(min_rate), self._max_rate)
+		self._rate = self._max_rate
+		self._target_latency = target_latency
+		# Bucket holds up to one second worth of requests
+		self._tokens = self._rate
+		self._updated = time.monotonic()
+		# Responses since the last adjustment
+		self._adjusted = self._updated
+		self._latency_sum = 0.0
+		self._latency_count = 0
+		self._throttled = False
+
+	def acquire(self):
+		wait = self.reserve()
+		if wait > 0:
+			time.sleep(wait)
+
+	# Takes a token and returns the number of seconds to wait before sending the request, see AsyncDremio
+	def reserve(self):
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(self._rate, self._tokens + (now - self._updated) * self._rate)
+			self._updated = now
+			# Take the token now, waiting callers queue up behind it
+			self._tokens = self._tokens - 1
+			return -self._tokens / self._rate if self._tokens < 0 else 0
+
+	def on_response(self, latency, throttled=False):
+		with self._lock:
+			self._latency_sum = self._latency_sum + latency
+			self._latency_count = self._latency_count + 1
+			self._throttled = self._throttled or throttled
+			now = time.monotonic()
+			if now - self._adjusted < self._adjust_interval:
+				return
+			average_latency = self._latency_sum / self._latency_count
+			if self._throttled or (self._target_latency > 0 and average_latency > self._target_latency):
+				self._rate = max(self._min_rate, self._rate * self._decrease_factor)
+			else:
+				self._rate = min(self._max_rate, self._rate + self._max_rate * self._increase_step)
+			self._adjusted = now
+			self._latency_sum = 0.0
+			self._latency_count = 0
+			self._throttled = False
+
+	def get_rate(self):
+		with self._lock:
+			return self._rate
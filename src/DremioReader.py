@@ -20,8 +20,10 @@ from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
 from DremioClonerFilter import DremioClonerFilter
+from DremioRetryPolicy import DremioRetryPolicy
 import parse_sql
 import json
+import concurrent.futures
 
 
 class DremioReader:
@@ -36,29 +38,84 @@ class DremioReader:
 	_dremio_env = None
 
 	# DremioData object containing data from Dremio source environment 
-	_d = DremioData()
+	_d = None
 
 	# Current top-level hierarchy context: Home, Space, Source
 	_top_level_hierarchy_context = None
 
-	def __init__(self, source_dremio, config):
+	# Thread pool used for concurrent catalog reads when read.concurrency > 1
+	_executor = None
+	# Asyncio client used instead of the thread pool with read.concurrency.backend = asyncio
+	_async_env = None
+	# Pending catalog entity requests keyed by entity id, see _prefetch_children
+	_prefetched_entities = None
+	# Pending tags and wiki requests keyed by dataset id, see _prefetch_collaboration
+	_prefetched_tags = None
+	_prefetched_wikis = None
+
+	# Incremental read: DremioData and manifest of the previous export, see read.incremental
+	_previous_d = None
+	_previous_manifest = None
+	# Version tags of catalog entities as listed in their parent's children
+	_entity_tags = None
+	# Ids of datasets reused from the previous export
+	_unchanged_ids = None
+	# Tables referenced by the SQL of VDSs keyed by VDS id, parsed at once by _process_vds_dependencies
+	_vds_sql_tables = None
+
+	def __init__(self, source_dremio, config, previous_data=None, previous_manifest=None):
 		self._config = config
 		self._dremio_env = source_dremio
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
 		self._filter = DremioClonerFilter(config)
+		self._d = DremioData()
+		self._prefetched_entities = {}
+		self._prefetched_tags = {}
+		self._prefetched_wikis = {}
+		self._entity_tags = {}
+		self._unchanged_ids = set()
+		self._vds_sql_tables = {}
+		if self._config.read_incremental and previous_data is not None and previous_manifest is not None:
+			self._previous_d = previous_data
+			self._previous_manifest = previous_manifest
 
 	# Read all data from the source Dremio environemnt
 	# Return DremioData
 	def read_dremio_environment(self):
-		self._read_catalog()
-		if not self._config.pds_list_useapi and self._filter.is_pds_in_scope():
-			self._read_all_pds()
-		self._read_reflections()
-		self._read_rules()
-		self._read_queues()
-		# Make sure that all VDS dependencies included as per configuration
-		self._process_vds_dependencies()
+		if self._config.read_concurrency > 1:
+			if self._config.read_concurrency_backend == 'asyncio':
+				# Imported here as aiohttp is only required for this backend
+				from DremioAsync import AsyncDremio
+				retry_policy = DremioRetryPolicy(self._config.http_retry_max_retries, self._config.http_retry_backoff_ms / 1000.0, self._config.http_retry_backoff_max_ms / 1000.0)
+				self._async_env = AsyncDremio(self._dremio_env, self._config.read_concurrency, retry_policy)
+				self._async_env.start()
+			else:
+				self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._config.read_concurrency)
+		try:
+			self._read_catalog()
+			if not self._config.pds_list_useapi and self._filter.is_pds_in_scope():
+				self._read_all_pds()
+			self._read_reflections()
+			self._read_rules()
+			self._read_queues()
+			# Make sure that all VDS dependencies included as per configuration
+			self._process_vds_dependencies()
+			if self._previous_d is not None:
+				self._logger.info("read_dremio_environment: reused " + str(len(self._unchanged_ids)) + " unchanged datasets from the previous export.")
+		finally:
+			if self._executor is not None:
+				self._executor.shutdown(wait=True, cancel_futures=True)
+				self._executor = None
+			if self._async_env is not None:
+				for prefetched in [self._prefetched_entities, self._prefetched_tags, self._prefetched_wikis]:
+					for future in prefetched.values():
+						future.cancel()
+				self._async_env.close()
+				self._async_env = None
+			self._prefetched_entities.clear()
+			self._prefetched_tags.clear()
+			self._prefetched_wikis.clear()
 		return self._d
 
 	def _read_all_pds(self):
@@ -69,13 +126,14 @@ class DremioReader:
 												self._config.source_folder_filter_paths,
 												self._config.source_folder_exclude_filter,
 												self._config.pds_filter, self._config.pds_exclude_filter,
-												pds_error_list=self._d.pds_error_list)
+												pds_error_list=self._d.pds_error_list, concurrency=self._config.read_concurrency)
+			pds_list = [pds for pds in pds_list if self._filter.match_pds_filter(pds)]
+			self._prefetch_collaboration(pds_list)
 			for pds in pds_list:
-				if self._filter.match_pds_filter(pds):
-					self._d.pds_list.append(pds)
-					self._read_acl(pds)
-					self._read_wiki(pds)
-					self._read_tags(pds)
+				self._d.add('pds_list', pds)
+				self._read_acl(pds)
+				self._read_wiki(pds)
+				self._read_tags(pds)
 
 	# Read Dremio catalog from source environment recursively going to containers and their children objects 
 	def _read_catalog(self):
@@ -110,7 +168,7 @@ class DremioReader:
 		self._logger.debug("_read_home: processing container: " + self._utils.get_entity_desc(container))
 		if self._config.home_process_mode == 'process':
 			self._top_level_hierarchy_context = "HOME"
-			self._d.containers.append(container)
+			self._d.add('containers', container)
 			entity = self._get_entity_definition_by_id(container)
 			if entity is not None:
 				self._logger.info("_read_home: " + self._utils.get_entity_desc(entity))
@@ -118,7 +176,7 @@ class DremioReader:
 					entity.pop("createdAt")
 				if "tag" in entity:
 					entity.pop("tag")
-				self._d.homes.append(entity)
+				self._d.add('homes', entity)
 				self._read_acl(entity)
 				self._read_wiki(entity)
 				self._read_space_children(entity)
@@ -131,7 +189,7 @@ class DremioReader:
 		self._logger.debug("_read_space: processing container: " + self._utils.get_entity_desc(container))
 		self._top_level_hierarchy_context = "SPACE"
 		if self._filter.match_space_filter(container):
-			self._d.containers.append(container)
+			self._d.add('containers', container)
 			entity = self._get_entity_definition_by_id(container)
 			if entity is not None:
 				self._logger.debug("_read_space: " + self._utils.get_entity_desc(container))
@@ -139,7 +197,7 @@ class DremioReader:
 					entity.pop("createdAt")
 				if "tag" in entity:
 					entity.pop("tag")
-				self._d.spaces.append(entity)
+				self._d.add('spaces', entity)
 				self._read_acl(entity)
 				self._read_wiki(entity)
 				self._read_space_children(entity)
@@ -152,7 +210,7 @@ class DremioReader:
 		if self._config.source_process_mode == 'process' or (self._config.pds_process_mode == 'process' and self._config.pds_list_useapi):
 			self._top_level_hierarchy_context = "SOURCE"
 			if self._filter.match_source_filter(container):
-				self._d.containers.append(container)
+				self._d.add('containers', container)
 				entity = self._get_entity_definition_by_id(container)
 				if entity is not None:
 					# Re-validate the filter with entity since there is more details in entity
@@ -162,7 +220,7 @@ class DremioReader:
 						entity.pop("tag")
 					if self._filter.match_source_filter(entity):
 						self._logger.debug("_read_source: " + self._utils.get_entity_desc(entity))
-						self._d.sources.append(entity)
+						self._d.add('sources', entity)
 						self._read_acl(entity)
 						self._read_wiki(entity)
 						# Depending on the useapi flag, PDSs can be collected via INFORMATION_SCHEMA. See also DX16597
@@ -177,6 +235,13 @@ class DremioReader:
 		self._logger.debug("_read_space_folder: processing folder: " + self._utils.get_entity_desc(folder))
 		if self._top_level_hierarchy_context not in ["SPACE", "HOME"]:
 			return
+		if self._top_level_hierarchy_context == "HOME":
+			decision = DremioClonerFilter.FOLDER_INCLUDE
+		else:
+			decision = self._get_space_folder_decision(folder)
+		if decision == DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE:
+			self._logger.debug("_read_space_folder: skipping folder and its children as per job configuration: " + self._utils.get_entity_desc(folder))
+			return
 		entity = self._get_entity_definition_by_id(folder)
 		if entity is None:
 			self._logger.error("_read_space_folder: error reading entity for folder: " + self._utils.get_entity_desc(folder))
@@ -185,28 +250,41 @@ class DremioReader:
 			entity.pop("createdAt")
 		if "tag" in entity:
 			entity.pop("tag")
-		if self._top_level_hierarchy_context == "HOME" or self._filter.match_space_folder_filter(folder):
+		if decision == DremioClonerFilter.FOLDER_INCLUDE:
 			self._logger.debug("_read_space_folder: " + self._utils.get_entity_desc(folder))
-			self._d.folders.append(entity)
+			self._d.add('folders', entity)
 			self._read_acl(entity)
 			self._read_wiki(entity)
-			# Validate all parent folders in the path have been saved already
-			folder_path = entity['path']
-			for i in range(1, len(folder_path)-1):
-				folderSaved = False
-				for item in self._d.folders:
-					if item['path'][-1] == folder_path[i]:
-						folderSaved = True
-				if not folderSaved:
-					parent_entity = self._get_entity_definition_by_path(folder_path[0:i+1])
-					self._d.folders.append(parent_entity)
+			self._save_parent_folders(entity['path'])
 		self._read_space_children(entity)
 
+	# Save all parent folders in the path that have not been saved already, e.g. parents skipped by the folder filter.
+	# Saved folders are looked up by their full path, missing parents are fetched concurrently when possible.
+	def _save_parent_folders(self, folder_path):
+		missing_paths = []
+		for i in range(2, len(folder_path)):
+			if self._d.get_by_path('folders', folder_path[0:i]) is None:
+				missing_paths.append(folder_path[0:i])
+		if len(missing_paths) == 0:
+			return
+		if len(missing_paths) > 1 and (self._executor is not None or self._async_env is not None):
+			futures = [self._submit('get_catalog_entity_by_path', self._utils.normalize_path(path)) for path in missing_paths]
+			parent_entities = [future.result() for future in futures]
+		else:
+			parent_entities = [self._get_entity_definition_by_path(path) for path in missing_paths]
+		for path, parent_entity in zip(missing_paths, parent_entities):
+			if parent_entity is None:
+				self._logger.error("_save_parent_folders: cannot retrieve parent folder for path: " + str(path))
+			else:
+				self._d.add('folders', parent_entity)
+
 	def _read_space_children(self, parent_entity):
 		self._logger.debug("_read_space_children: processing parent_entity: " + self._utils.get_entity_desc(parent_entity))
 		if 'entityType' not in parent_entity:
 			self._logger.error("_read_space_children: bad data, skipping entity: " + self._utils.get_entity_desc(parent_entity))
 			return
+		self._save_entity_tags(parent_entity['children'])
+		self._prefetch_children(parent_entity['children'], self._is_space_child_read)
 		for child in parent_entity['children']:
 			if "createdAt" in child:
 				child.pop("createdAt")
@@ -223,6 +301,79 @@ class DremioReader:
 			else:
 				self._logger.error("_read_space_children: not supported entity of type " + child['type'] + " and container type " + child['containerType'])
 
+	# Submit catalog requests for all children that will be read by the serial processing below.
+	# Children are still processed one by one and in order, only the round-trips overlap.
+	def _prefetch_children(self, children, is_child_read):
+		if self._executor is None and self._async_env is None:
+			return
+		datasets = []
+		for child in children:
+			if 'id' in child and child['id'] not in self._prefetched_entities and is_child_read(child):
+				self._prefetched_entities[child['id']] = self._submit('get_catalog_entity_by_id', child['id'])
+				if child['type'] == "DATASET":
+					datasets.append(child)
+			elif child['type'] == "DATASET" and not self._config.read_incremental_reuse_collaboration and self._get_unchanged_dataset(child) is not None:
+				# Unchanged datasets are not read again but their wiki and tags are
+				datasets.append(child)
+		self._prefetch_collaboration(datasets)
+
+	# Submit tags and wiki requests of datasets along with their catalog requests, they are read for every dataset.
+	# Dremio has no bulk API, sys table or INFORMATION_SCHEMA view for tags and wikis, so these are still one
+	# request per dataset but they overlap with each other and with the catalog requests.
+	def _prefetch_collaboration(self, datasets):
+		if self._executor is None and self._async_env is None:
+			return
+		for dataset in datasets:
+			if self._config.tag_process_mode == 'process' and dataset['id'] not in self._prefetched_tags:
+				self._prefetched_tags[dataset['id']] = self._submit('get_catalog_tags', dataset['id'])
+			if self._config.wiki_process_mode == 'process' and dataset['id'] not in self._prefetched_wikis:
+				self._prefetched_wikis[dataset['id']] = self._submit('get_catalog_wiki', dataset['id'])
+
+	def _submit(self, method_name, argument):
+		if self._async_env is not None:
+			return self._async_env.submit(getattr(self._async_env, method_name)(argument))
+		return self._executor.submit(getattr(self._dremio_env, method_name), argument)
+
+	# Tags of a VDS are needed by the VDS filter and then by _read_tags, keep=True keeps them for the second call
+	def _get_catalog_tags(self, entity_id, keep=False):
+		if entity_id in self._prefetched_tags:
+			future = self._prefetched_tags[entity_id] if keep else self._prefetched_tags.pop(entity_id)
+			return future.result()
+		tags = self._dremio_env.get_catalog_tags(entity_id)
+		if keep:
+			future = concurrent.futures.Future()
+			future.set_result(tags)
+			self._prefetched_tags[entity_id] = future
+		return tags
+
+	def _get_catalog_wiki(self, entity_id):
+		if entity_id in self._prefetched_wikis:
+			return self._prefetched_wikis.pop(entity_id).result()
+		return self._dremio_env.get_catalog_wiki(entity_id)
+
+	def _is_space_child_read(self, child):
+		if child['type'] == "DATASET":
+			return self._get_unchanged_dataset(child) is None
+		elif child.get('containerType') == "FOLDER":
+			return self._top_level_hierarchy_context == "HOME" or self._get_space_folder_decision(child, False) != DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE
+		elif child.get('containerType') == "FUNCTION":
+			return self._config.udf_process_mode == 'process'
+		return False
+
+	# Folders are only excluded with their subtree when read.prune_excluded_folders is set
+	def _get_space_folder_decision(self, folder, loginfo=True):
+		decision = self._filter.get_space_folder_decision(folder, loginfo)
+		if decision == DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE and not self._config.read_prune_excluded_folders:
+			return DremioClonerFilter.FOLDER_DESCEND_ONLY
+		return decision
+
+	def _is_source_child_read(self, child):
+		if child['type'] == "DATASET":
+			return self._get_unchanged_dataset(child) is None
+		elif child.get('containerType') == "FOLDER":
+			return self._filter.match_source_folder_filter(child)
+		return False
+
 	def _read_source_folder(self, folder):
 		self._logger.debug("_read_source_folder: processing folder: " + self._utils.get_entity_desc(folder))
 		if self._top_level_hierarchy_context == "SOURCE" and self._filter.match_source_folder_filter(folder):
@@ -242,6 +393,8 @@ class DremioReader:
 		if 'entityType' not in parent_entity:
 			self._logger.error("_read_source_children: bad data, skipping entity: " + self._utils.get_entity_desc(parent_entity))
 			return
+		self._save_entity_tags(parent_entity['children'])
+		self._prefetch_children(parent_entity['children'], self._is_source_child_read)
 		for child in parent_entity['children']:
 			if "createdAt" in child:
 				child.pop("createdAt")
@@ -258,7 +411,15 @@ class DremioReader:
 
 	def _read_dataset(self, dataset):
 		self._logger.debug("_read_dataset: processing dataset: " + self._utils.get_entity_desc(dataset))
-		entity = self._get_entity_definition_by_id(dataset)
+		entity = self._get_unchanged_dataset(dataset)
+		unchanged = entity is not None
+		if unchanged:
+			self._logger.debug("_read_dataset: reusing unchanged dataset from the previous export: " + self._utils.get_entity_desc(dataset))
+			self._unchanged_ids.add(entity['id'])
+		else:
+			entity = self._get_entity_definition_by_id(dataset)
+		# Changes of wikis and tags do not change the version tag of the dataset, see read.incremental.reuse_collaboration
+		reuse_collaboration = unchanged and self._config.read_incremental_reuse_collaboration
 		if entity is not None:
 			if "createdAt" in entity:
 				entity.pop("createdAt")
@@ -267,19 +428,41 @@ class DremioReader:
 			self._logger.debug("_read_dataset: " + dataset['datasetType'] + " : " + self._utils.get_entity_desc(dataset))
 			if dataset['datasetType'] == "PROMOTED" or dataset['datasetType'] == "DIRECT":
 				if self._filter.match_pds_filter(dataset):
-					self._d.pds_list.append(entity)
+					self._d.add('pds_list', entity)
 			elif dataset['datasetType'] == "VIRTUAL":
 				if self._config.tag_process_mode == 'process':
-					tags = self._dremio_env.get_catalog_tags(entity['id'])
+					if reuse_collaboration and self._previous_manifest.get('tag_process_mode') == 'process':
+						tags = self._previous_d.get_by_id('tags', entity['id'])
+					else:
+						tags = self._get_catalog_tags(entity['id'], keep=True)
 				else:
 					tags = None
 				if self._filter.match_vds_filter(dataset, tags=tags):
-					self._d.vds_list.append(entity)
+					self._d.add('vds_list', entity)
 			else:
 				self._logger.error("_read_dataset: Unexpected dataset type " + dataset['datasetType'] + " for " + self._utils.get_entity_desc(dataset) + ".")
-			self._read_acl(entity)
-			self._read_wiki(entity)
-			self._read_tags(entity)
+			self._read_acl(entity, reuse_collaboration)
+			self._read_wiki(entity, reuse_collaboration)
+			self._read_tags(entity, reuse_collaboration)
+
+	def _save_entity_tags(self, children):
+		for child in children:
+			if 'id' in child and 'tag' in child:
+				self._entity_tags[child['id']] = child['tag']
+
+	# Returns the dataset entity from the previous export if the version tag of the dataset has not changed since
+	def _get_unchanged_dataset(self, dataset):
+		if self._previous_d is None or 'id' not in dataset:
+			return None
+		previous_tag = self._previous_manifest.get('entity_tags', {}).get(dataset['id'])
+		if previous_tag is None or previous_tag != self._entity_tags.get(dataset['id']):
+			return None
+		if dataset.get('datasetType') == "VIRTUAL":
+			return self._previous_d.get_by_id('vds_list', dataset['id'])
+		return self._previous_d.get_by_id('pds_list', dataset['id'])
+
+	def get_manifest(self):
+		return {'entity_tags': self._entity_tags, 'tag_process_mode': self._config.tag_process_mode, 'wiki_process_mode': self._config.wiki_process_mode}
 
 	def _read_file(self, file_name):
 		# do nothing
@@ -295,8 +478,7 @@ class DremioReader:
 				if "tag" in udf:
 					udf.pop("tag")
 				udf["entity_id"] = function['id']
-				if udf not in self._d.udfs:
-					self._d.udfs.append(udf)
+				self._d.add('udfs', udf)
 		else:
 			self._logger.debug("_read_function: skipping user defined function processing as per job configuration")
 
@@ -322,7 +504,7 @@ class DremioReader:
 					reflection_path = reflection_dataset['path']
 					self._logger.debug("_read_reflections: processing reflection " + reflection['id'] + " path: " + str(reflection_path))
 					reflection["path"] = reflection_path
-					self._d.reflections.append(reflection)
+					self._d.add('reflections', reflection)
 		elif self._config.reflection_process_mode == 'process' and self._config.source_ce:
 			# If processing reflections for CE, the reflections IDs must be specified in reflection_id_include_list
 			for reflection_id in self._config.reflection_id_include_list:
@@ -338,38 +520,40 @@ class DremioReader:
 					reflection_path = reflection_dataset['path']
 					self._logger.debug("_read_reflections: processing CE reflection " + reflection['id'] + " path: " + str(reflection_path))
 					reflection["path"] = reflection_path
-					self._d.reflections.append(reflection)
+					self._d.add('reflections', reflection)
 		else:
 			self._logger.debug("_read_reflections: skipping reflections processing as per job configuration")
 
 	def _is_reflection_in_vds_list(self, reflection):
 		if not self._config.reflection_only_matching_vds:
 			return True
-		for vds in self._d.vds_list:
-			if vds['id'] == reflection['datasetId']:
-				return True
-		return False
+		return self._d.get_by_id('vds_list', reflection['datasetId']) is not None
 
 	# Note, tags are only available for datasets
-	def _read_tags(self, entity):
+	def _read_tags(self, entity, reuse_previous=False):
 		self._logger.debug("_read_tags: for entity " + self._utils.get_entity_desc(entity))
 		if self._config.tag_process_mode == 'process':
-			tag = self._dremio_env.get_catalog_tags(entity['id'])
+			if reuse_previous and self._previous_manifest.get('tag_process_mode') == 'process':
+				tag = self._previous_d.get_by_id('tags', entity['id'])
+			else:
+				tag = self._get_catalog_tags(entity['id'])
 			if tag is not None:
 				tag['entity_id'] = entity['id']
 				if entity['entityType'] == 'space' or entity['entityType'] == 'source':
 					tag['path'] = [entity['name']]
 				else:
 					tag['path'] = entity['path']
-				if tag not in self._d.tags:
-					self._d.tags.append(tag)
+				self._d.add('tags', tag)
 		else:
 			self._logger.debug("_read_tags: skipping tags processing as per job configuration")
 
-	def _read_wiki(self, entity):
+	def _read_wiki(self, entity, reuse_previous=False):
 		self._logger.debug("_read_wiki: for entity " + self._utils.get_entity_desc(entity))
 		if self._config.wiki_process_mode == 'process':
-			wiki = self._dremio_env.get_catalog_wiki(entity['id'])
+			if reuse_previous and self._previous_manifest.get('wiki_process_mode') == 'process':
+				wiki = self._previous_d.get_by_id('wikis', entity['id'])
+			else:
+				wiki = self._get_catalog_wiki(entity['id'])
 			if wiki is not None:
 				if "createdAt" in wiki:
 					wiki.pop("createdAt")
@@ -380,39 +564,45 @@ class DremioReader:
 					wiki['path'] = [entity['name']]
 				else:
 					wiki['path'] = entity['path']
-				if wiki not in self._d.wikis:
-					self._d.wikis.append(wiki)
+				self._d.add('wikis', wiki)
 		else:
 			self._logger.debug("_read_wiki: skipping wiki processing as per job configuration")
 
-	def _read_acl(self, entity):
+	def _read_acl(self, entity, reuse_previous=False):
 		self._logger.debug("_read_acl: for entity " + self._utils.get_entity_desc(entity))
 		if 'accessControlList' in entity:
 			acl = entity['accessControlList']
 			if 'users' in acl:
 				for user in acl['users']:
-					user_entity = self._dremio_env.get_user(user['id'])
+					user_entity = self._previous_d.get_by_id('referenced_users', user['id']) if reuse_previous else None
+					if user_entity is None:
+						user_entity = self._dremio_env.get_user(user['id'])
 					if user_entity is not None:
 						if "createdAt" in user_entity:
 							user_entity.pop("createdAt")
 						if "tag" in user_entity:
 							user_entity.pop("tag")
-						if user_entity not in self._d.referenced_users:
-							self._d.referenced_users.append(user_entity)
+						self._d.add('referenced_users', user_entity)
 
 			if 'roles' in acl:
 				for role in acl['roles']:
-					role_entity = self._dremio_env.get_role(role['id'])
+					role_entity = self._previous_d.get_by_id('referenced_roles', role['id']) if reuse_previous else None
+					if role_entity is None:
+						role_entity = self._dremio_env.get_role(role['id'])
 					if role_entity is not None:
 						if "createdAt" in role_entity:
 							role_entity.pop("createdAt")
 						if "tag" in role_entity:
 							role_entity.pop("tag")
-						if role_entity not in self._d.referenced_roles:
-							self._d.referenced_roles.append(role_entity)
+						self._d.add('referenced_roles', role_entity)
 
 	def _process_vds_dependencies(self):
 		if self._config.vds_dependencies_process_mode == 'get':
+			if self._config.source_ce or not self._config.source_graph_support:
+				# Parse SQL of all known VDSs at once, VDSs discovered as dependencies are parsed one by one
+				vds_list = list(self._d.vds_list)
+				for vds, tables in zip(vds_list, parse_sql.tables_in_queries([vds['sql'] for vds in vds_list], self._config.sql_parse_processes)):
+					self._vds_sql_tables[vds['id']] = tables
 			for vds in self._d.vds_list:
 				self._discover_dependencies(vds)
 			for vds in self._d.vds_list:
@@ -426,12 +616,10 @@ class DremioReader:
 				self._logger.error("_discover_dependencies: Expected Dataset Entity but got: " + self._utils.get_entity_desc(dataset))
 				return
 			if dataset['type'] == 'PHYSICAL_DATASET':
-				if dataset not in self._d.pds_list:
-					self._d.pds_list.append(dataset)
+				self._d.add('pds_list', dataset)
 				return
 			elif dataset['type'] == 'VIRTUAL_DATASET':
-				if dataset not in self._d.vds_list:
-					self._d.vds_list.append(dataset)
+				self._d.add('vds_list', dataset)
 				# Process VDS dependencies
 				sql_dependency_paths = self._get_vds_dependency_paths(dataset)
 				for dependency_path in sql_dependency_paths:
@@ -456,13 +644,19 @@ class DremioReader:
 		vds_parent_list = self._get_vds_dependency_paths(vds)
 		vds_parent_json = {'id':vds['id'], 'path':vds['path'], 'parents':vds_parent_list }
 		if not self._config.source_ce and self._config.source_graph_support:
-			self._d.vds_parents.append(vds_parent_json)
+			self._d.add('vds_parents', vds_parent_json)
 
 	def _get_vds_dependency_paths(self, vds):
 		self._logger.debug("_get_vds_dependency_paths: processing vds: " + self._utils.get_entity_desc(vds))
 		if self._config.source_ce or not self._config.source_graph_support:
+			if vds['id'] in self._vds_sql_tables:
+				return self._vds_sql_tables[vds['id']]
 			return parse_sql.tables_in_query(vds['sql'])
 		else:
+			if vds['id'] in self._unchanged_ids:
+				previous_vds_parents = self._previous_d.get_by_id('vds_parents', vds['id'])
+				if previous_vds_parents is not None:
+					return previous_vds_parents['parents']
 			graph = self._dremio_env.get_catalog_entity_graph_by_id(vds['id'])
 			if graph is None:
 				self._logger.warn("Could not receive Graph via API. Try to set graph_api_support to False in the job configuration.")
@@ -474,12 +668,10 @@ class DremioReader:
 
 	def _find_entity(self, path):
 		self._logger.debug("_find_entity: processing path: " + str(path))
-		for vds in self._d.vds_list:
-			if 'path' in vds and self._utils.normalize_path(vds['path']) == path:
-				return vds
-		for pds in self._d.pds_list:
-			if 'path' in pds and self._utils.normalize_path(pds['path']) == path:
-				return pds
+		entity = self._d.get_by_path('vds_list', path)
+		if entity is None:
+			entity = self._d.get_by_path('pds_list', path)
+		return entity
 
 	# Helper method, used by most read* methods
 	def _get_entity_definition_by_id(self, src):
@@ -488,7 +680,10 @@ class DremioReader:
 			self._logger.error("_read_entity_definition: bad data, skipping entity: " + self._utils.get_entity_desc(src))
 			return None
 		else:
-			entity = self._dremio_env.get_catalog_entity_by_id(src['id'])
+			if src['id'] in self._prefetched_entities:
+				entity = self._prefetched_entities.pop(src['id']).result()
+			else:
+				entity = self._dremio_env.get_catalog_entity_by_id(src['id'])
 			if entity is None:
 				self._logger.error("_read_entity_definition: cannot retrieve entity for id: " + src['id'])
 			return entity
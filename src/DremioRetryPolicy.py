@@ -0,0 +1,64 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import email.utils
+import random
+import time
+
+
+###
+# Retry policy of the API calls issued through DremioTransport.
+# Requests are retried with exponential backoff and full jitter, or after the delay requested by the server with
+# a Retry-After header. GET, PUT and DELETE are idempotent and are retried after connection errors, time-outs and
+# 429/502/503/504 responses. POST requests create objects and are only retried after 429 Too Many Requests,
+# which guarantees that the request has not been processed.
+###
+class DremioRetryPolicy:
+
+	_idempotent_methods = ['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']
+	_retryable_status_codes = [429, 502, 503, 504]
+
+	def __init__(self, max_retries=3, backoff=0.5, backoff_max=30):
+		self.max_retries = max_retries
+		self._backoff = backoff
+		self._backoff_max = backoff_max
+
+	def is_retryable_status(self, method, status_code):
+		if status_code == 429:
+			return True
+		return status_code in self._retryable_status_codes and method.upper() in self._idempotent_methods
+
+	def is_retryable_error(self, method):
+		return method.upper() in self._idempotent_methods
+
+	# Returns the number of seconds to wait before retry number attempt + 1
+	def get_delay(self, attempt, retry_after=None):
+		if retry_after is not None:
+			delay = self._parse_retry_after(retry_after)
+			if delay is not None:
+				return min(delay, self._backoff_max)
+		return random.uniform(0, min(self._backoff_max, self._backoff * (2 ** attempt)))
+
+	def _parse_retry_after(self, retry_after):
+		# Either a number of seconds or an HTTP date
+		try:
+			return max(0.0, float(retry_after))
+		except ValueError:
+			pass
+		try:
+			return max(0.0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+		except (TypeError, ValueError):
+			return None
@@ -0,0 +1,94 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import gzip
+import json
+import logging
+import requests
+import requests.adapters
+import time
+
+_json_dumps = json.dumps
+
+
+###
+# HTTP transport used by the Dremio API wrappers.
+# Keeps a pool of persistent connections per host that is shared by all threads calling the API. A thread waits
+# for a free connection when max_connections_per_host connections are in use instead of opening an extra one.
+# Failed requests are retried as per the optional DremioRetryPolicy and the rate of requests is limited by the
+# optional DremioRateLimiter.
+# Another transport (e.g. an async one) can be used by the API wrappers as long as it implements request() with
+# the same signature, returning an object with the status_code, text, content and json() of the response.
+###
+class DremioTransport:
+
+	# Request bodies smaller than this are not worth compressing
+	_gzip_min_size = 1024
+
+	def __init__(self, pool_size=10, max_connections_per_host=10, keep_alive=True, gzip_requests=False, retry_policy=None, rate_limiter=None):
+		self._keep_alive = keep_alive
+		self._gzip_requests = gzip_requests
+		self._retry_policy = retry_policy
+		self._rate_limiter = rate_limiter
+		self._session = requests.Session()
+		# pool_size is the number of hosts with cached connections, max_connections_per_host the connections kept per host
+		adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=max_connections_per_host, pool_block=True)
+		self._session.mount('http://', adapter)
+		self._session.mount('https://', adapter)
+		# Responses are always requested compressed
+		self._session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+	def request(self, method, url, headers=None, json=None, data=None, timeout=None, verify=True):
+		headers = dict(headers) if headers is not None else {}
+		if not self._keep_alive:
+			headers['Connection'] = 'close'
+		if self._gzip_requests:
+			if json is not None:
+				data = _json_dumps(json).encode('utf-8')
+				json = None
+			if isinstance(data, str):
+				data = data.encode('utf-8')
+			if data is not None and len(data) >= self._gzip_min_size:
+				data = gzip.compress(data)
+				headers['Content-Encoding'] = 'gzip'
+		attempt = 0
+		while True:
+			if self._rate_limiter is not None:
+				self._rate_limiter.acquire()
+			start = time.monotonic()
+			try:
+				response = self._session.request(method, url, headers=headers, json=json, data=data, timeout=timeout, verify=verify)
+			except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+				if self._rate_limiter is not None:
+					self._rate_limiter.on_response(time.monotonic() - start, True)
+				if self._retry_policy is None or attempt >= self._retry_policy.max_retries or not self._retry_policy.is_retryable_error(method):
+					raise
+				delay = self._retry_policy.get_delay(attempt)
+				reason = type(e).__name__
+			else:
+				if self._rate_limiter is not None:
+					self._rate_limiter.on_response(time.monotonic() - start, response.status_code in (429, 503))
+				if self._retry_policy is None or attempt >= self._retry_policy.max_retries or not self._retry_policy.is_retryable_status(method, response.status_code):
+					return response
+				delay = self._retry_policy.get_delay(attempt, response.headers.get('Retry-After'))
+				reason = "HTTP " + str(response.status_code)
+				response.close()
+			attempt = attempt + 1
+			logging.info("DremioTransport: " + reason + " for " + method + " <" + url + ">, retry " + str(attempt) + " in " + str(round(delay, 2)) + " second(s)")
+			time.sleep(delay)
+
+	def close(self):
+		self._session.close()
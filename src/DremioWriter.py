@@ -20,9 +20,15 @@ from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
 from DremioClonerFilter import DremioClonerFilter
+from DremioClonerJournal import DremioClonerJournal
+from DremioDiff import DremioDiff
 import datetime
 import json
 import parse_sql
+import concurrent.futures
+import collections
+import copy
+import threading
 
 
 ###
@@ -53,16 +59,44 @@ class DremioWriter:
 	# Dremio target folders
 	# This is required for CI/CD use cases to compare folders from JSON with destination to be able replicate deletion
 	_target_folders = []
+	# Paths of _target_folders as tuples, used to save each folder once
+	_target_folder_paths = None
 	# Dremio target vds list
 	# This is required for CI/CD use cases to compare vds list from JSON with destination to be able replicate deletion
 	_target_vds_list = []
 	# Dremio target reflections
 	_target_reflections = []
 	_target_reflections_vds_filtered = []
-
-	# Dry run collections
+	# Target reflections keyed by (tuple of dataset path, reflection name), see _find_existing_reflection
+	_target_reflection_index = None
+	# Cache of target dataset paths keyed by dataset id, and whether it holds the datasets of _target_snapshot
+	_target_dataset_paths = None
+	_target_dataset_paths_seeded = False
+	# Locks of reflections being written keyed like _target_reflection_index
+	_target_reflection_locks = None
+	_target_reflection_locks_lock = None
+	# Thread pool for lookups in the target environment, shared by all calls during the run, see _get_lookup_executor
+	_lookup_executor = None
+
+	# Dry run collections, _dry_run_lock guards their updates from concurrent writes
 	_dry_run_processed_vds_list = []
 	_dry_run_processed_pds_list = []
+	_dry_run_lock = None
+
+	# Snapshot of the target catalog: entries keyed by lower case path, and lower case names of the root containers
+	# it covers completely, see write.prefetch_target
+	_target_snapshot = None
+	_target_snapshot_roots = None
+	# Guards _target_snapshot once concurrent writes have started, see _update_target_snapshot
+	_target_snapshot_lock = None
+
+	# Plan of create/update/delete/noop actions, see write.plan_mode
+	_diff = None
+
+	# Journal of completed writes, see write.journal
+	_journal = None
+	# Journal key and content hash of objects to write, keyed by (object type, id(object))
+	_journal_keys = None
 
 	def __init__(self, target_dremio, dremio_data, config):
 		self._config = config
@@ -71,8 +105,32 @@ class DremioWriter:
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._filter = DremioClonerFilter(config)
 		self._utils = DremioClonerUtils(config)
+		self._target_reflection_locks = {}
+		self._target_reflection_locks_lock = threading.Lock()
+		self._target_snapshot_lock = threading.Lock()
+		self._dry_run_lock = threading.Lock()
+		if self._config.write_plan_mode != 'off':
+			self._diff = DremioDiff()
 
 	def write_dremio_environment(self):
+		if self._config.write_journal is not None:
+			self._open_journal()
+		completed = False
+		try:
+			self._write_dremio_environment()
+			completed = True
+		finally:
+			if self._lookup_executor is not None:
+				self._lookup_executor.shutdown(wait=True, cancel_futures=True)
+				self._lookup_executor = None
+			if self._journal is not None:
+				# Start from scratch next time only if this run has fully succeeded
+				self._journal.close(remove = completed and self._logger.errors_encountered == 0 and not self._config.dry_run)
+		if self._diff is not None:
+			for line in self.get_plan_summary():
+				self._logger.info("write_dremio_environment: plan " + line)
+
+	def _write_dremio_environment(self):
 		self._retrieve_users_groups()
 		if self._config.acl_transformation != {} and self._d.referenced_users == [] and self._d.referenced_roles == []:
 			self._logger.warn("ACL Transformation has been defined while Referenced Users and Referenced Roles are not present in the Source Dremio Data.")
@@ -88,18 +146,27 @@ class DremioWriter:
 			unmatched_target_reflections = self._find_deletable_reflections()
 			for reflection in unmatched_target_reflections:
 				self._logger.info("write_dremio_environment: Deleting reflection " + "/".join(reflection['path']) + " -> " + reflection['name'])
+				self._plan(DremioDiff.DELETE, 'reflection', "/".join(reflection['path']) + " -> " + reflection['name'])
 				self._dremio_env.delete_reflection(reflection['id'], dry_run = self._config.dry_run, report_error=True)
 		if self._config.vds_process_mode == 'create_overwrite_delete':
 			unmatched_target_vds = self._find_deletable_vds()
 			for vds in unmatched_target_vds:
 				self._logger.info("write_dremio_environment: Deleting VDS " + "/".join(vds['path']))
+				self._plan(DremioDiff.DELETE, 'vds', "/".join(vds['path']))
 				self._dremio_env.delete_catalog_entity(vds['id'], dry_run = self._config.dry_run, report_error=True)
 		if self._config.folder_process_mode == 'create_overwrite_delete':
 			unmatched_target_folders = self._find_deletable_folders()
 			for folder in unmatched_target_folders:
 				self._logger.info("write_dremio_environment: Deleting folder " + "/".join(folder['path']))
+				self._plan(DremioDiff.DELETE, 'folder', "/".join(folder['path']))
 				self._dremio_env.delete_catalog_entity(folder['id'], dry_run = self._config.dry_run, report_error=True)
 
+		if self._config.write_prefetch_target:
+			if self._config.spaces_to_catalog:
+				self._logger.info("write_dremio_environment: write.prefetch_target is not supported with spaces_to_catalog, target entities will be looked up one by one.")
+			else:
+				self._prefetch_target()
+
 		if self._config.source_process_mode == 'skip':
 			# even though they are being skipped, we still need to map source names in case other objects depend on them
 			for source in self._d.sources:
@@ -134,6 +201,7 @@ class DremioWriter:
 					self._write_space(space, self._config.space_process_mode, self._config.space_ignore_missing_acl_user, self._config.space_ignore_missing_acl_group)
 			if self._config.spaces_to_catalog:
 				self._config.source_dremio_spaces = list(set(self._config.source_dremio_spaces))  # de-duplicate entries
+				self._d.reindex('spaces')
 		if self._config.folder_process_mode == 'skip':
 			self._logger.info("write_dremio_environment: Skipping folder processing due to configuration folder.process_mode=skip.")
 		else:
@@ -142,6 +210,8 @@ class DremioWriter:
 					folder["path"] = [self._config.target_catalog_name] + folder["path"]
 				self._write_folder(folder, self._config.folder_process_mode, self._config.folder_ignore_missing_acl_user, self._config.folder_ignore_missing_acl_group,
 									   self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None)
+			if self._config.spaces_to_catalog and self._config.target_dremio_cloud_v2 == False:
+				self._d.reindex('folders')
 		if self._config.vds_process_mode == 'skip':
 			self._logger.info("write_dremio_environment: Skipping VDS processing due to configuration vds.process_mode=skip.")
 		else:
@@ -150,40 +220,10 @@ class DremioWriter:
 				# TODO: implement VDS ordering for arctic target, if needed
 				pass
 			else:
-				self._order_vds(0)
+				self._order_vds()
 			self._write_vds_hierarchy()
 			self._write_remainder_vds()
-		if self._config.reflection_process_mode == 'skip':
-			self._logger.info("write_dremio_environment: Skipping reflection processing due to configuration reflection.process_mode=skip.")
-		else:
-			for reflection in self._d.reflections:
-				# if the reflection id include list is not empty, then skip reflection ids that are not in the list
-				if len(self._config.reflection_id_include_list) > 0:
-					if reflection['id'] not in self._config.reflection_id_include_list:
-						self._logger.debug(
-							"write_dremio_environment: skipping reflection id " + reflection['id'] + ", not in include list")
-						continue
-				self._write_reflection(reflection, self._config.reflection_process_mode)
-		if self._config.reflection_refresh_mode != 'refresh':
-			self._logger.info("write_dremio_environment: Skipping reflection refresh due to configuration pds.reflection_refresh_mode=skip.")
-		else:
-			for pds in self._d.pds_list:
-				self._dremio_env.refresh_reflections_by_pds_path(self._utils.normalize_path(pds['path']), self._config.dry_run)
-		if self._config.wiki_process_mode == 'skip':
-			self._logger.info("write_dremio_environment: Skipping wiki processing due to configuration wiki.process_mode=skip.")
-		else:
-			for wiki in self._d.wikis:
-				self._write_wiki(wiki, self._config.wiki_process_mode, self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None)
-		if self._config.tag_process_mode == 'skip':
-			self._logger.info("write_dremio_environment: Skipping tag processing due to configuration tag.process_mode=skip.")
-		else:
-			for tags in self._d.tags:
-				self._write_tags(tags, self._config.tag_process_mode, self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None)
-		if self._config.udf_process_mode == 'skip':
-			self._logger.info("write_dremio_environment: Skipping user defined function processing due to configuration udf.process_mode=skip.")
-		else:
-			for udf in self._d.udfs:
-				self._write_udf(udf, self._config.udf_process_mode)
+		self._write_metadata()
 		if self._config.wlm_queue_process_mode == 'skip':
 			self._logger.info("write_dremio_environment: Skipping wlm queue processing due to configuration wlm.queue.process_mode=skip.")
 		else:
@@ -194,16 +234,141 @@ class DremioWriter:
 		else:
 			self._write_wlm_rules(self._d.rules, self._config.wlm_queue_process_mode)
 
+	# Reads all Spaces of the target environment that are referenced by the data to write into _target_snapshot.
+	# Only children listings are read, which is one API call per Space and Folder instead of one per entity.
+	def _prefetch_target(self):
+		roots = set()
+		for space in self._d.spaces:
+			roots.add(space['name'].lower())
+		for collection in [self._d.folders, self._d.vds_list, self._d.wikis, self._d.tags, self._d.udfs, self._d.reflections]:
+			for item in collection:
+				if 'path' in item and len(item['path']) > 0:
+					roots.add(item['path'][0].lower())
+		catalog = self._dremio_env.list_catalog()
+		if catalog is None:
+			self._logger.error("_prefetch_target: unable to list target catalog, target entities will be looked up one by one.")
+			return
+		self._target_snapshot = {}
+		# Only roots confirmed as target Spaces are answered from the snapshot. Sources and homes might be too large
+		# to scan, and roots missing from the listing, e.g. a source created later in this run or the home of
+		# another user, are looked up one by one.
+		self._target_snapshot_roots = set()
+		level = []
+		for container in catalog['data']:
+			root = container['path'][0].lower()
+			if root in roots and container['type'] == 'CONTAINER' and container['containerType'] == 'SPACE':
+				self._target_snapshot[root] = self._get_target_snapshot_entry(container)
+				self._target_snapshot_roots.add(root)
+				level.append(container)
+		roots = self._target_snapshot_roots
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(self._config.write_concurrency, 1))
+		try:
+			while len(level) > 0:
+				next_level = []
+				for container, entity in zip(level, executor.map(lambda c: self._dremio_env.get_catalog_entity_by_id(c['id']), level)):
+					if entity is None:
+						self._logger.error("_prefetch_target: unable to read " + self._utils.get_entity_desc(container) + ", entities of " + container['path'][0] + " will be looked up one by one.")
+						roots.discard(container['path'][0].lower())
+						continue
+					for child in entity.get('children', []):
+						self._target_snapshot[self._get_target_snapshot_key(child['path'])] = self._get_target_snapshot_entry(child)
+						if child['type'] == 'CONTAINER' and child.get('containerType') == 'FOLDER':
+							next_level.append(child)
+				level = next_level
+		finally:
+			executor.shutdown(wait=True)
+		self._logger.info("_prefetch_target: read " + str(len(self._target_snapshot)) + " target entities.")
+
+	def _get_target_snapshot_key(self, path):
+		key = self._utils.normalize_path(path)
+		if key[:1] == '/':
+			key = key[1:]
+		return key.lower()
+
+	# Builds a snapshot entry from a catalog or children listing item. Entries carry what existence checks need,
+	# the full entity is read by id when required, see _get_target_entity_by_path
+	def _get_target_snapshot_entry(self, item):
+		entry = {'id': item['id'], 'path': item['path']}
+		if 'tag' in item:
+			entry['tag'] = item['tag']
+		if item['type'] == 'DATASET':
+			entry['entityType'] = 'dataset'
+			entry['type'] = 'VIRTUAL_DATASET' if item.get('datasetType') == 'VIRTUAL' else 'PHYSICAL_DATASET'
+		elif item['type'] == 'CONTAINER':
+			entry['entityType'] = item['containerType'].lower()
+		else:
+			entry['entityType'] = item['type'].lower()
+		return entry
+
+	# Keeps _target_snapshot up to date with an entity created or updated in the target environment
+	def _update_target_snapshot(self, entity):
+		if self._target_snapshot is None or entity is None:
+			return
+		entry = {}
+		for key in ['id', 'tag', 'entityType', 'type']:
+			if key in entity:
+				entry[key] = entity[key]
+		entry['path'] = entity['path'] if 'path' in entity else [entity['name']]
+		key = self._get_target_snapshot_key(entry['path'])
+		with self._target_snapshot_lock:
+			self._target_snapshot[key] = entry
+
+	# Looks up an entity in the target environment, from _target_snapshot if the path belongs to a prefetched Space.
+	# With full_entity False, the snapshot entry (id, path, tag, entityType, type) is good enough for the caller.
+	def _get_target_entity_by_path(self, path, full_entity=True):
+		if self._target_snapshot is not None:
+			key = self._get_target_snapshot_key(path)
+			if key.split('/')[0] in self._target_snapshot_roots:
+				entry = self._target_snapshot.get(key)
+				if entry is None:
+					return None
+				if full_entity:
+					return self._dremio_env.get_catalog_entity_by_id(entry['id'])
+				return copy.deepcopy(entry)
+		return self._dremio_env.get_catalog_entity_by_path(path)
+
+	def _plan(self, action, object_type, desc):
+		if self._diff is not None:
+			self._diff.add(action, object_type, desc)
+			self._logger.info("_plan: " + action + " " + object_type + " " + desc)
+
+	def _plan_entity(self, action, entity):
+		if self._diff is not None:
+			self._plan(action, self._diff.get_object_type(entity), self._utils.get_entity_desc(entity))
+
+	def get_plan_summary(self):
+		if self._diff is None:
+			return []
+		return self._diff.get_summary()
+
+	def _open_journal(self):
+		self._journal = DremioClonerJournal(self._config.write_journal, self._config.cloner_conf_json)
+		# Objects get modified while being written, compute journal keys and hashes of the original definitions upfront
+		self._journal_keys = {}
+		for object_type, collection in [('entity', self._d.sources), ('entity', self._d.pds_list), ('entity', self._d.spaces), ('entity', self._d.folders),
+										('entity', self._d.vds_list), ('reflection', self._d.reflections),
+										('wiki', self._d.wikis), ('tags', self._d.tags), ('udf', self._d.udfs)]:
+			for item in collection:
+				self._journal_keys[(object_type, id(item))] = (self._journal.get_key(object_type, item), self._journal.get_hash(item))
+
+	def _is_journaled(self, object_type, item):
+		if self._journal is None or (object_type, id(item)) not in self._journal_keys:
+			return False
+		key, content_hash = self._journal_keys[(object_type, id(item))]
+		if self._journal.contains(key, content_hash):
+			self._logger.debug("_is_journaled: skipping " + key + ", it has been written by a previous run as per journal.")
+			return True
+		return False
+
+	def _journal_write(self, object_type, item):
+		if self._journal is not None and not self._config.dry_run and (object_type, id(item)) in self._journal_keys:
+			self._journal.record(*self._journal_keys[(object_type, id(item))])
+
 	def _find_deletable_folders(self):
 		# Find unmatched reflections in target system
 		unmatched_folders = []
 		for target_folder in self._target_folders:
-			found = False
-			for applied_folder in self._d.folders:
-				if target_folder['path'] == applied_folder['path']:
-					found = True
-					break
-			if not found:
+			if self._d.get_by_path('folders', target_folder['path']) is None:
 				unmatched_folders.append(target_folder)
 		return unmatched_folders
 
@@ -212,12 +377,7 @@ class DremioWriter:
 		# Find unmatched reflections in target system
 		unmatched_vds = []
 		for target_vds in self._target_vds_list:
-			found = False
-			for applied_vds in self._d.vds_list:
-				if target_vds['path'] == applied_vds['path']:
-					found = True
-					break
-			if not found:
+			if self._d.get_by_path('vds_list', target_vds['path']) is None:
 				unmatched_vds.append(target_vds)
 		return unmatched_vds
 
@@ -235,11 +395,43 @@ class DremioWriter:
 				unmatched_reflections.append(target_reflection)
 		return unmatched_reflections
 
-	def _is_reflection_in_vds_list(self, reflection):
-		for vds in self._target_vds_list:
-			if vds['id'] == reflection['datasetId']:
-				return True
-		return False
+	# Returns the cache of target dataset paths keyed by id after resolving the given dataset ids.
+	# Datasets already known from the target snapshot are not looked up, the others are looked up concurrently.
+	def _get_target_dataset_paths(self, dataset_ids):
+		if self._target_dataset_paths is None:
+			self._target_dataset_paths = {}
+		if self._target_snapshot is not None and not self._target_dataset_paths_seeded:
+			# The snapshot may be read after the first call, see _read_target_folders_and_vds_list and _prefetch_target
+			with self._target_snapshot_lock:
+				entries = list(self._target_snapshot.values())
+			for entry in entries:
+				if entry.get('entityType') == 'dataset':
+					self._target_dataset_paths.setdefault(entry['id'], entry['path'])
+			self._target_dataset_paths_seeded = True
+		missing_ids = [dataset_id for dataset_id in dict.fromkeys(dataset_ids) if dataset_id not in self._target_dataset_paths]
+		if len(missing_ids) > 0:
+			for dataset_id, dataset in zip(missing_ids, self._get_lookup_executor().map(self._dremio_env.get_catalog_entity_by_id, missing_ids)):
+				if dataset is None:
+					self._logger.debug("_get_target_dataset_paths: cannot get path for dataset: " + dataset_id)
+					self._target_dataset_paths[dataset_id] = None
+				else:
+					self._target_dataset_paths[dataset_id] = dataset['path']
+		return self._target_dataset_paths
+
+	# Lookups only call the API, they never wait for other lookups, so that one pool can serve all of them
+	def _get_lookup_executor(self):
+		if self._lookup_executor is None:
+			self._lookup_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(self._config.write_concurrency, 1))
+		return self._lookup_executor
+
+	def _build_target_reflection_index(self):
+		dataset_paths = self._get_target_dataset_paths([reflection['datasetId'] for reflection in self._target_reflections])
+		self._target_reflection_index = {}
+		for existing_reflection in self._target_reflections:
+			dataset_path = dataset_paths.get(existing_reflection['datasetId'])
+			if dataset_path is not None:
+				# Keep the first match as the former linear search did
+				self._target_reflection_index.setdefault((tuple(dataset_path), existing_reflection['name']), existing_reflection)
 
 	def _read_target_reflections(self):
 		self._logger.debug("_read_target_reflections")
@@ -247,18 +439,17 @@ class DremioWriter:
 		self._target_reflections = reflections['data'] if reflections is not None else []
 
 	def _read_target_folders_and_vds_list(self):
+		self._target_folder_paths = set(tuple(folder['path']) for folder in self._target_folders)
 		containers = self._dremio_env.list_catalog()['data']
 		for container in containers:
 			self._logger.debug("_read_destination_folders_and_vds_list: processing container " + self._utils.get_entity_desc(container))
 			self._process_container(container)
+		# Paths of the target VDSs are known already, keep them for the reflection index
+		vds_paths = {vds['id']: vds['path'] for vds in self._target_vds_list}
+		self._get_target_dataset_paths([]).update(vds_paths)
 		for reflection in self._target_reflections:
-			if self._is_reflection_in_vds_list(reflection):
-				reflection_dataset = self._dremio_env.get_catalog_entity_by_id(reflection['datasetId'])
-				if reflection_dataset is None:
-					self._logger.debug("_read_reflections: error processing reflection, cannot get path for dataset: " + reflection['datasetId'])
-					continue
-				reflection_path = reflection_dataset['path']
-				reflection["path"] = reflection_path
+			if reflection['datasetId'] in vds_paths:
+				reflection["path"] = vds_paths[reflection['datasetId']]
 				self._target_reflections_vds_filtered.append(reflection)
 
 	# Identify a container and delegate processing
@@ -328,19 +519,29 @@ class DremioWriter:
 			return
 		if self._filter.match_space_folder_filter(folder):
 			self._logger.debug("_read_space_folder: " + self._utils.get_entity_desc(folder))
-			self._target_folders.append(entity)
-			# Validate all parent folders in the path have been saved already
-			folder_path = entity['path']
-			for i in range(1, len(folder_path)-1):
-				folderSaved = False
-				for item in self._target_folders:
-					if item['path'][-1] == folder_path[i]:
-						folderSaved = True
-				if not folderSaved:
-					parent_entity = self._get_entity_definition_by_path(folder_path[0:i+1])
-					self._target_folders.append(parent_entity)
+			self._add_target_folder(entity)
+			self._add_target_parent_folders(entity['path'])
 		self._read_space_children(entity)
 
+	def _add_target_folder(self, entity):
+		if tuple(entity['path']) not in self._target_folder_paths:
+			self._target_folder_paths.add(tuple(entity['path']))
+			self._target_folders.append(entity)
+
+	# Save all parent folders in the path that have not been saved already, e.g. parents skipped by the folder filter.
+	# Missing parents are fetched concurrently when write.concurrency allows it.
+	def _add_target_parent_folders(self, folder_path):
+		missing_paths = [folder_path[0:i] for i in range(2, len(folder_path)) if tuple(folder_path[0:i]) not in self._target_folder_paths]
+		if len(missing_paths) == 0:
+			return
+		if len(missing_paths) > 1 and self._config.write_concurrency > 1:
+			parent_entities = list(self._get_lookup_executor().map(self._get_entity_definition_by_path, missing_paths))
+		else:
+			parent_entities = [self._get_entity_definition_by_path(path) for path in missing_paths]
+		for parent_entity in parent_entities:
+			if parent_entity is not None:
+				self._add_target_folder(parent_entity)
+
 	def _get_entity_definition_by_path(self, path):
 		self._logger.debug("_get_entity_definition_by_path: processing path: " + str(path))
 		path = self._utils.normalize_path(path)
@@ -394,6 +595,7 @@ class DremioWriter:
 				entity['path'][0] = map['target-source-name']
 				if 'format' in entity and 'fullPath' in entity['format']:
 					entity['format']['fullPath'][0] = map['target-source-name']
+				self._d.reindex('pds_list')
 				break
 			if 'source-dataset-path' in map:
 				dataset_path = entity['path'][:len(map['source-dataset-path'])]
@@ -402,6 +604,7 @@ class DremioWriter:
 					entity['path'][:len(map['source-dataset-path'])] = map['target-dataset-path']
 					if 'format' in entity and 'fullPath' in entity['format']:
 						entity['format']['fullPath'][:len(map['source-dataset-path'])] = map['target-dataset-path']
+					self._d.reindex('pds_list')
 					break
 
 	def _map_vds_source(self):
@@ -436,6 +639,7 @@ class DremioWriter:
 						vds["sql"] = vds["sql"].replace(fully_qualified_source_path, fully_qualified_target_path)
 						self._logger.info("_map_vds_source: updating sql for " + self._utils.get_entity_desc(vds) + " with target dataset path: " + str(fully_qualified_target_path))
 
+	# Changes the path of the VDS in place, the caller reindexes vds_list when True is returned
 	def _map_vds_to_arctic(self, vds):
 		if vds["path"][0] != self._config.target_catalog_name:
 			vds["path"] = [self._config.target_catalog_name] + vds["path"]
@@ -444,6 +648,8 @@ class DremioWriter:
 					if space == vds["sqlContext"][0]:
 						vds["sqlContext"] = [self._config.target_catalog_name] + vds["sqlContext"]
 			vds["sql"] = self._map_sql_text(vds["sql"])
+			return True
+		return False
 
 	def _map_sql_text(self, sql):
 		# This step currently assumes consistently placed double quotes and correct capitalization
@@ -520,16 +726,141 @@ class DremioWriter:
 					self._logger.error("_retrieve_users_groups: Unable to resolve ACL_TRANSFORMATION role in target Dremio environment: " + str(item['target']['role']))
 
 	def _write_vds_hierarchy(self):
-		for level in range(0, self._hierarchy_depth + 1): # fix 20210319: need +1 here to ensure every element in the vds hierarchy gets processed
-			for item in self._vds_hierarchy:
-				if item[0] == level:
-					vds = item[1]
-					if self._filter.match_vds_filter(vds):
-						if self._config.spaces_to_catalog and self._config.target_dremio_cloud_v2 == False:
-							self._map_vds_to_arctic(vds)
-						self._logger.debug("_write_vds_hierarchy: writing vds: " + self._utils.get_entity_desc(vds))
-						self._write_entity(vds, self._config.vds_process_mode, self._config.vds_ignore_missing_acl_user, self._config.vds_ignore_missing_acl_group,
-											  self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None)
+		# Group VDSs by hierarchy level, keeping their order within a level
+		levels = {}
+		for item in self._vds_hierarchy:
+			levels.setdefault(item[0], []).append(item[1])
+		executor = None
+		if self._config.write_concurrency > 1:
+			executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._config.write_concurrency)
+		try:
+			for level in sorted(levels):
+				level_vds_list = [vds for vds in levels[level] if self._filter.match_vds_filter(vds)]
+				if self._config.spaces_to_catalog and self._config.target_dremio_cloud_v2 == False:
+					# Map the whole level before fanning out, vds_list is reindexed once and not while being written
+					mapped = False
+					for vds in level_vds_list:
+						if self._map_vds_to_arctic(vds):
+							mapped = True
+					if mapped:
+						self._d.reindex('vds_list')
+				self._logger.debug("_write_vds_hierarchy: writing " + str(len(level_vds_list)) + " vds at hierarchy level " + str(level))
+				if executor is not None and len(level_vds_list) > 1:
+					# VDSs of the same level do not depend on each other. Wait for the whole level before moving to the next one.
+					list(executor.map(self._write_hierarchy_vds, level_vds_list))
+				else:
+					for vds in level_vds_list:
+						self._write_hierarchy_vds(vds)
+		finally:
+			if executor is not None:
+				executor.shutdown(wait=True, cancel_futures=True)
+
+	# Writes reflections, wikis, tags and UDFs, they only depend on datasets written before and not on each other.
+	# With write.metadata.concurrency greater than 1 they are written by a shared pool of threads, each object type
+	# by at most its own number of lanes, and reflections are refreshed as soon as all reflections have been written.
+	def _write_metadata(self):
+		reflection_writes = []
+		if self._config.reflection_process_mode == 'skip':
+			self._logger.info("write_dremio_environment: Skipping reflection processing due to configuration reflection.process_mode=skip.")
+		else:
+			self._build_target_reflection_index()
+			reflections = []
+			for reflection in self._d.reflections:
+				# if the reflection id include list is not empty, then skip reflection ids that are not in the list
+				if len(self._config.reflection_id_include_list) > 0:
+					if reflection['id'] not in self._config.reflection_id_include_list:
+						self._logger.debug(
+							"write_dremio_environment: skipping reflection id " + reflection['id'] + ", not in include list")
+						continue
+				reflections.append(reflection)
+			reflection_writes.append(('reflection', lambda reflection: self._write_reflection(reflection, self._config.reflection_process_mode), reflections))
+		target_catalog_name = self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None
+		other_writes = []
+		if self._config.wiki_process_mode == 'skip':
+			self._logger.info("write_dremio_environment: Skipping wiki processing due to configuration wiki.process_mode=skip.")
+		else:
+			other_writes.append(('wiki', lambda wiki: self._write_wiki(wiki, self._config.wiki_process_mode, target_catalog_name), self._d.wikis))
+		if self._config.tag_process_mode == 'skip':
+			self._logger.info("write_dremio_environment: Skipping tag processing due to configuration tag.process_mode=skip.")
+		else:
+			other_writes.append(('tag', lambda tags: self._write_tags(tags, self._config.tag_process_mode, target_catalog_name), self._d.tags))
+		if self._config.udf_process_mode == 'skip':
+			self._logger.info("write_dremio_environment: Skipping user defined function processing due to configuration udf.process_mode=skip.")
+		else:
+			other_writes.append(('udf', lambda udf: self._write_udf(udf, self._config.udf_process_mode), self._d.udfs))
+		# Paths of reflections, wikis and tags are changed in place while being written, possibly by several lanes.
+		# Nothing looks them up meanwhile, their indexes are dropped once before and once after the whole stage.
+		for collection in ['reflections', 'wikis', 'tags']:
+			self._d.reindex(collection)
+		executor = None
+		if self._config.write_metadata_concurrency > 1:
+			executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._config.write_metadata_concurrency)
+		# Set on the first error, e.g. max_errors being reached, so that running lanes stop taking items
+		stop = threading.Event()
+		try:
+			reflection_lanes = self._start_metadata_lanes(executor, reflection_writes, stop)
+			# When written serially, wikis, tags and UDFs still follow the reflection refresh
+			other_lanes = self._start_metadata_lanes(executor, other_writes, stop) if executor is not None else []
+			for lane in reflection_lanes:
+				lane.result()
+			self._refresh_reflections()
+			if executor is None:
+				self._start_metadata_lanes(executor, other_writes, stop)
+			for lane in other_lanes:
+				lane.result()
+		finally:
+			stop.set()
+			if executor is not None:
+				executor.shutdown(wait=True, cancel_futures=True)
+			for collection in ['reflections', 'wikis', 'tags']:
+				self._d.reindex(collection)
+
+	# Writes the items of every (object type, write function, items) serially when executor is None. Otherwise submits
+	# lanes that take the items of their object type in order until none is left and returns the futures of the lanes.
+	def _start_metadata_lanes(self, executor, writes, stop):
+		if executor is None:
+			for object_type, write_function, items in writes:
+				for item in items:
+					write_function(item)
+			return []
+		lane_counts = []
+		for object_type, write_function, items in writes:
+			limit = getattr(self._config, 'write_metadata_' + object_type + '_concurrency')
+			if limit <= 0 or limit > self._config.write_metadata_concurrency:
+				limit = self._config.write_metadata_concurrency
+			lane_counts.append(min(limit, len(items)))
+		queues = [collections.deque(items) for object_type, write_function, items in writes]
+		lanes = []
+		# Interleave the lanes of all object types so that every type gets started early in the shared pool
+		for i in range(max(lane_counts, default=0)):
+			for (object_type, write_function, items), queue, lane_count in zip(writes, queues, lane_counts):
+				if i < lane_count:
+					lanes.append(executor.submit(self._run_metadata_lane, write_function, queue, stop))
+		return lanes
+
+	def _run_metadata_lane(self, write_function, queue, stop):
+		try:
+			while not stop.is_set():
+				try:
+					item = queue.popleft()
+				except IndexError:
+					return
+				write_function(item)
+		except BaseException:
+			stop.set()
+			raise
+
+	def _refresh_reflections(self):
+		if self._config.reflection_refresh_mode != 'refresh':
+			self._logger.info("write_dremio_environment: Skipping reflection refresh due to configuration pds.reflection_refresh_mode=skip.")
+		else:
+			for pds in self._d.pds_list:
+				self._dremio_env.refresh_reflections_by_pds_path(self._utils.normalize_path(pds['path']), self._config.dry_run)
+
+	def _write_hierarchy_vds(self, vds):
+		self._logger.debug("_write_vds_hierarchy: writing vds: " + self._utils.get_entity_desc(vds))
+		self._write_entity(vds, self._config.vds_process_mode, self._config.vds_ignore_missing_acl_user, self._config.vds_ignore_missing_acl_group,
+							  self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None)
 
 
 	def _write_remainder_vds(self):
@@ -545,13 +876,14 @@ class DremioWriter:
 				vds = self._d.vds_list[i]
 				if self._filter.match_vds_filter(vds):
 					if self._config.spaces_to_catalog and self._config.target_dremio_cloud_v2 == False:
-						self._map_vds_to_arctic(vds)
+						if self._map_vds_to_arctic(vds):
+							self._d.reindex('vds_list')
 					self._logger.debug("_write_remainder_vds: writing vds: " + self._utils.get_entity_desc(vds))
 					if self._write_entity(vds, self._config.vds_process_mode, self._config.vds_ignore_missing_acl_user, self._config.vds_ignore_missing_acl_group,
 										  self._config.target_catalog_name if self._config.target_dremio_cloud_v2 else None, False):
-						self._d.vds_list.remove(vds)
+						self._d.remove('vds_list', vds)
 				else:
-					self._d.vds_list.remove(vds)
+					self._d.remove('vds_list', vds)
 			# Iterate through the remainder of unresolved VDS in the list
 			# Go with decreasing index so we can remove VDS from the list
 			for i in range(len(self._unresolved_vds) - 1, -1, -1):
@@ -583,6 +915,8 @@ class DremioWriter:
 
 	def _write_entity(self, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag, target_catalog_name=None, report_error = True):
 		self._logger.debug("_write_entity: processing entity: " + self._utils.get_entity_desc(entity))
+		if self._is_journaled('entity', entity):
+			return True
 		# Clean up the definition
 		if 'id' in entity:
 			entity.pop("id")
@@ -607,6 +941,7 @@ class DremioWriter:
 			if process_mode == 'update_only':
 				self._logger.info("_write_entity: Skipping entity creation due to configuration process_mode=update_only. " + self._utils.get_entity_desc(entity))
 				return True
+			self._plan_entity(DremioDiff.CREATE, entity)
 			# Reset version for proper concurrency
 			if 'accessControlList' in entity:
 				entity['accessControlList']['version'] = "0"
@@ -614,7 +949,8 @@ class DremioWriter:
 				self._logger.warn("_write_entity: Dry Run, NOT Creating entity: " + self._utils.get_entity_desc(entity))
 				# For dry run, keep it in a seperate collection to suppress errors
 				if self._utils.is_vds(entity):
-					self._dry_run_processed_vds_list.append(entity)
+					with self._dry_run_lock:
+						self._dry_run_processed_vds_list.append(entity)
 				return False
 			# Note for the CE target env, the ACL should have been popped out by _process_acl
 			new_entity = self._dremio_env.create_catalog_entity(entity, self._config.dry_run)
@@ -624,10 +960,19 @@ class DremioWriter:
 				else:
 					self._logger.debug("_write_entity: could not create entity: " + self._utils.get_entity_desc(entity))
 				return False
+			self._update_target_snapshot(new_entity)
 		else:  # Entity already exists in the target environment
 			if process_mode == 'create_only':
 				self._logger.info("_write_entity: Found existing entity and process_mode is set to create_only. Skipping entity: " + self._utils.get_entity_desc(entity))
 				return True
+			if self._diff is not None:
+				# Updating an unchanged entity would still bump its version and might trigger reflection refreshes
+				if self._diff.is_entity_equal(entity, existing_entity):
+					self._plan_entity(DremioDiff.NOOP, entity)
+					self._logger.debug("_write_entity: No pending changes. Skipping entity: " + self._utils.get_entity_desc(entity))
+					self._journal_write('entity', entity)
+					return True
+				self._plan_entity(DremioDiff.UPDATE, entity)
 			self._logger.debug("_write_entity: Overwriting entity definition as per process_mode configuration : " + self._utils.get_entity_desc(entity))
 			# Update entity definition with data from entity existing in the target environment
 			entity['id'] = existing_entity['id']
@@ -655,12 +1000,17 @@ class DremioWriter:
 				else:
 					self._logger.debug("_write_entity: Error updating entity: " + self._utils.get_entity_desc(entity))
 				return False
+			self._update_target_snapshot(updated_entity)
+		self._journal_write('entity', entity)
 		return True
 
 	def _write_pds(self, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag):
 		self._logger.debug("_write_pds: processing entity: " + self._utils.get_entity_desc(entity))
 		if self._filter.match_pds_filter(entity):
+			# Map the source before checking the journal, VDS ordering and reflection refresh rely on the mapped path
 			self._map_pds_source(entity)
+			if self._is_journaled('entity', entity):
+				return True
 			existing_entity = self._read_entity_definition(entity)
 			if existing_entity is None:
 				self._logger.error("_write_pds: Cannot find existing entity for PDS Entity. Either Folder, File, or PDS must exist prior to promoting or updating PDS. Source PDS: " + self._utils.get_entity_desc(entity))
@@ -707,11 +1057,14 @@ class DremioWriter:
 		if new_pds_entity is None:
 			self._logger.error("_promote_pds: Error promoting PDS: " + self._utils.get_entity_desc(entity))
 			return False
+		self._update_target_snapshot(new_pds_entity)
 		return True
 
 
 	def _write_reflection(self, reflection, process_mode):
 		self._logger.debug("_write_reflection: processing reflection: " + ((reflection['id'] + " name: " + reflection['name'] + " path: ") if 'id' in reflection else (reflection['name'] + " path: ")) + self._utils.get_entity_desc(reflection))
+		if self._is_journaled('reflection', reflection):
+			return True
 		# Clean up the definition
 		if 'id' in reflection:
 			reflection.pop("id")
@@ -735,48 +1088,61 @@ class DremioWriter:
 		if self._config.spaces_to_catalog and self._config.target_dremio_cloud_v2 == False:
 			reflection["path"] = [self._config.target_catalog_name] + reflection["path"]
 		reflection_path = reflection['path']
+		# The reflection has neither id nor path from here on, describe it by dataset path and name
+		reflection_desc = "/".join(reflection_path) + " -> " + reflection['name']
 		# Write Reflection
 		reflection.pop("path")
-		reflected_dataset = self._dremio_env.get_catalog_entity_by_path(self._utils.normalize_path(reflection_path))
+		reflected_dataset = self._get_target_entity_by_path(self._utils.normalize_path(reflection_path), full_entity=False)
 		if reflected_dataset is None:
-			self._logger.error("_write_reflection: Could not resolve dataset for " + self._utils.get_entity_desc(reflection))
+			self._logger.error("_write_reflection: Could not resolve dataset for " + reflection_desc)
 			return None
 		# Match filters if requested
 		if self._config.reflection_filter_mode == "apply_vds_pds_filter":
 			if not self._filter.match_reflection_path(reflection_path, reflected_dataset):
 				return False
 		reflection['datasetId'] = reflected_dataset['id']
+		# Definitions of the same reflection are written one at a time, see write.metadata.concurrency
+		with self._get_target_reflection_lock(reflected_dataset, reflection):
+			return self._write_target_reflection(reflection, reflected_dataset, reflection_desc, process_mode)
+
+	def _write_target_reflection(self, reflection, reflected_dataset, reflection_desc, process_mode):
 		# Check if the reflection already exists
 		existing_reflection = self._find_existing_reflection(reflection, reflected_dataset)
 		if existing_reflection is None:  # Need to create new entity
 			if process_mode == 'update_only':
-				self._logger.info("_write_reflection: Skipping reflection creation due to configuration reflection_process_mode. " + self._utils.get_entity_desc(reflection))
+				self._logger.info("_write_reflection: Skipping reflection creation due to configuration reflection_process_mode. " + reflection_desc)
 				return None
+			self._plan(DremioDiff.CREATE, 'reflection', reflection_desc)
 			if self._config.dry_run:
-				self._logger.warn("_write_reflection: Dry Run, NOT Creating reflection: " + self._utils.get_entity_desc(reflection))
+				self._logger.warn("_write_reflection: Dry Run, NOT Creating reflection: " + reflection_desc)
 				return None
 			new_reflection = self._dremio_env.create_reflection(reflection, self._config.dry_run)
 			if new_reflection is None:
-				self._logger.error("_write_reflection: could not create " + self._utils.get_entity_desc(reflection))
+				self._logger.error("_write_reflection: could not create " + reflection_desc)
 				return None
+			self._index_target_reflection(reflected_dataset, new_reflection)
 		else:  # Reflection already exists in the target environment
 			if process_mode == 'create_only':
-				self._logger.info("_write_reflection: Found existing reflection and reflection_process_mode is set to create_only. Skipping " + self._utils.get_entity_desc(reflection))
+				self._logger.info("_write_reflection: Found existing reflection and reflection_process_mode is set to create_only. Skipping " + reflection_desc)
 				return None
 			# make sure there are changes to update as it will invalidate existing reflection data
 			if self._is_reflection_equal(existing_reflection, reflection):
 				# Nothing to do
-				self._logger.debug("_write_reflection: No pending changes. Skipping " + self._utils.get_entity_desc(reflection))
+				self._plan(DremioDiff.NOOP, 'reflection', reflection_desc)
+				self._logger.debug("_write_reflection: No pending changes. Skipping " + reflection_desc)
 				return None
+			self._plan(DremioDiff.UPDATE, 'reflection', reflection_desc)
 			if self._config.dry_run:
-				self._logger.warn("_write_entity: Dry Run, NOT Updating " + self._utils.get_entity_desc(reflection))
+				self._logger.warn("_write_entity: Dry Run, NOT Updating " + reflection_desc)
 				return False
-			self._logger.debug("_write_reflection: Overwriting " + self._utils.get_entity_desc(reflection))
+			self._logger.debug("_write_reflection: Overwriting " + reflection_desc)
 			reflection['tag'] = existing_reflection['tag']
 			updated_reflection = self._dremio_env.update_reflection(existing_reflection['id'], reflection, self._config.dry_run)
 			if updated_reflection is None:
-				self._logger.error("_write_reflection: Error updating " + self._utils.get_entity_desc(reflection))
+				self._logger.error("_write_reflection: Error updating " + reflection_desc)
 				return False
+			self._index_target_reflection(reflected_dataset, updated_reflection)
+		self._journal_write('reflection', reflection)
 		return True
 
 	def _is_reflection_equal(self, existing_reflection, reflection):
@@ -792,18 +1158,24 @@ class DremioWriter:
 			   (reflection.get('distributionFields') == existing_reflection.get('distributionFields'))
 
 	def _find_existing_reflection(self, reflection, dataset):
-		for existing_reflection in self._target_reflections:
-			# Match reflections by name
-			if reflection['name'] == existing_reflection['name']:
-				existing_dataset = self._dremio_env.get_catalog_entity_by_id(existing_reflection['datasetId'])
-				# Match reflections by respective dataset's path
-				if existing_dataset is not None and existing_dataset['path'] == dataset['path']:
-					return existing_reflection
-		return None
+		if self._target_reflection_index is None:
+			self._build_target_reflection_index()
+		# Match reflections by respective dataset's path and by name
+		return self._target_reflection_index.get((tuple(dataset['path']), reflection['name']))
+
+	# Keeps _target_reflection_index up to date with a reflection created or updated in the target environment,
+	# so that a repeated definition in the source updates it rather than creating another reflection
+	def _index_target_reflection(self, dataset, target_reflection):
+		if self._target_reflection_index is not None and isinstance(target_reflection, dict) and 'name' in target_reflection:
+			self._target_reflection_index[(tuple(dataset['path']), target_reflection['name'])] = target_reflection
+
+	def _get_target_reflection_lock(self, dataset, reflection):
+		with self._target_reflection_locks_lock:
+			return self._target_reflection_locks.setdefault((tuple(dataset['path']), reflection['name']), threading.Lock())
 
 
 	def _find_existing_dataset_by_path(self, path):
-		return self._dremio_env.get_catalog_entity_by_path(path)
+		return self._get_target_entity_by_path(path, full_entity=False)
 
 
 # Searches for Users from entity's ACL in the target environment and either:
@@ -884,23 +1256,23 @@ class DremioWriter:
 
 	def _find_matching_principal_for_userid(self, userid, permissions):
 		self._logger.debug("_find_matching_principal_for_userid: processing user_id: " + str(userid))
-		for user in self._d.referenced_users:
-			if user['id'] == userid:
-				transformed_principal = self._find_acl_transformation_by_username(user['name'], permissions)
-				if transformed_principal == "REMOVE":
-					self._logger.info("_find_matching_principal_for_userid: Source User " + user['name'] + " [" + user['id'] + "] is mapped as NONE.")
-					return "REMOVE"
-				# If no tranformation is defined for this user
-				elif transformed_principal is None:
-					for target_user in self._target_dremio_users:
-						if target_user['name'] == user['name']:
-							return {"user":target_user['id']}
-				elif "error" in transformed_principal:
-					# Something went wrong
-					self._logger.error("_find_matching_principal_for_userid: error " + transformed_principal['error'])
-					return None
-				else:
-					return transformed_principal
+		user = self._d.get_by_id('referenced_users', userid)
+		if user is not None:
+			transformed_principal = self._find_acl_transformation_by_username(user['name'], permissions)
+			if transformed_principal == "REMOVE":
+				self._logger.info("_find_matching_principal_for_userid: Source User " + user['name'] + " [" + user['id'] + "] is mapped as NONE.")
+				return "REMOVE"
+			# If no tranformation is defined for this user
+			elif transformed_principal is None:
+				for target_user in self._target_dremio_users:
+					if target_user['name'] == user['name']:
+						return {"user":target_user['id']}
+			elif "error" in transformed_principal:
+				# Something went wrong
+				self._logger.error("_find_matching_principal_for_userid: error " + transformed_principal['error'])
+				return None
+			else:
+				return transformed_principal
 		# If the username is already in the target list (i.e. the mapping already happened
 		# but the write_entity failed because parent objects were not yet created) then take username straight from target
 		for user in self._target_dremio_users:
@@ -950,24 +1322,24 @@ class DremioWriter:
 
 	def _find_matching_principal_for_roleid(self, roleid, permissions):
 		self._logger.debug("_find_matching_roleid: processing: " + str(roleid))
-		for role in self._d.referenced_roles:
-			if role['id'] == roleid:
-				self._logger.debug("_find_matching_roleid: roleid " + str(roleid) + " has role name " + role['name'])
-				transformed_principal = self._find_acl_transformation_by_rolename(role['name'], permissions)
-				if transformed_principal == "REMOVE":
-					self._logger.info("_find_matching_principal_for_roleid: Source Role " + role['name'] + " [" + role['id'] + "] is mapped as NONE.")
-					return "REMOVE"
-				# If no transformation is defined for this role
-				elif transformed_principal is None:
-					for target_role in self._target_dremio_roles:
-						if target_role['name'] == role['name']:
-							return {"role":target_role['id']}
-				elif "error" in transformed_principal:
-					# Something went wrong
-					self._logger.error("_find_matching_principal_for_roleid: error " + transformed_principal['error'])
-					return None
-				else:
-					return transformed_principal
+		role = self._d.get_by_id('referenced_roles', roleid)
+		if role is not None:
+			self._logger.debug("_find_matching_roleid: roleid " + str(roleid) + " has role name " + role['name'])
+			transformed_principal = self._find_acl_transformation_by_rolename(role['name'], permissions)
+			if transformed_principal == "REMOVE":
+				self._logger.info("_find_matching_principal_for_roleid: Source Role " + role['name'] + " [" + role['id'] + "] is mapped as NONE.")
+				return "REMOVE"
+			# If no transformation is defined for this role
+			elif transformed_principal is None:
+				for target_role in self._target_dremio_roles:
+					if target_role['name'] == role['name']:
+						return {"role":target_role['id']}
+			elif "error" in transformed_principal:
+				# Something went wrong
+				self._logger.error("_find_matching_principal_for_roleid: error " + transformed_principal['error'])
+				return None
+			else:
+				return transformed_principal
 		# If the role name is already in the target list (i.e. the mapping already happened
 		# but the write_entity failed because parent objects were not yet created) then take role name straight from target
 		for role in self._target_dremio_roles:
@@ -1019,86 +1391,171 @@ class DremioWriter:
 	def _read_entity_definition(self, entity, target_catalog_name=None):
 		self._logger.debug("_read_entity_definition: processing entity: " + self._utils.get_entity_desc(entity))
 		if 'path' in entity:
-			return self._dremio_env.get_catalog_entity_by_path(self._utils.normalize_path([self._config.target_catalog_name] + entity["path"] if target_catalog_name else entity["path"]))
+			return self._get_target_entity_by_path(self._utils.normalize_path([self._config.target_catalog_name] + entity["path"] if target_catalog_name else entity["path"]))
 		elif 'name' in entity:
-			return self._dremio_env.get_catalog_entity_by_path([self._config.target_catalog_name] + entity["name"] if target_catalog_name else entity["name"])
+			return self._get_target_entity_by_path([self._config.target_catalog_name] + entity["name"] if target_catalog_name else entity["name"])
 		else:
 			self._logger.error("_read_entity_definition: bad data: " + self._utils.get_entity_desc(entity))
 			return None
 
-	# Process vds_list and save ordered list of VDSs into _vds_hierarchy. Recursive method.
-	def _order_vds(self, processing_level=0):
-		# Verify for the Max Hierarchy Depth
-		if processing_level >= self._config.vds_max_hierarchy_depth:
-			self._logger.debug("_order_vds: Finished processing with VDSs left to process:" + str(self._d.vds_list))
-			return
-		any_vds_leveled = False
-		# Iterate through the remainder VDS in the list
-		# Go with decreasing index so we can remove VDS from the list
-		for i in range(len(self._d.vds_list) - 1, -1, -1):
-			vds = self._d.vds_list[i]
+	# Process vds_list and save ordered list of VDSs into _vds_hierarchy.
+	# Topological sort (Kahn) over a path index of vds_list. The level of a VDS is one above the highest level
+	# of the VDSs it depends on. Dependencies outside of vds_list must exist as PDS/VDS in the target environment.
+	# Ordered VDSs are removed from vds_list, VDSs with unresolved dependencies are moved into _unresolved_vds,
+	# VDSs that are part of a cycle or exceed vds_max_hierarchy_depth are left in vds_list for _write_remainder_vds,
+	# so are duplicate definitions of a VDS path.
+	def _order_vds(self):
+		vds_list = self._d.vds_list
+		vds_index = {}
+		duplicates = set()
+		for i, vds in enumerate(vds_list):
+			path = self._utils.normalize_path(vds['path'])
+			if path in vds_index:
+				self._logger.warn("_order_vds: duplicate VDS definition for '" + path + "'. Only the first definition will be ordered, the others will be processed without ordering.")
+				duplicates.add(i)
+			else:
+				vds_index[path] = i
+		# Tables referenced by the SQL of every VDS, by index in vds_list, when dependencies are not taken from vds_parents
+		sql_tables = None
+		if self._is_source_ce() or not self._d.vds_parents:
+			# Parse SQL of all VDSs at once
+			sql_tables = parse_sql.tables_in_queries([vds['sql'] for vds in vds_list], self._config.sql_parse_processes)
+		# Lookups of dependencies in the target environment, by path
+		target_datasets = {}
+		dependents = [[] for i in range(len(vds_list))]
+		in_degree = [0] * len(vds_list)
+		unresolved = set()
+		for i, vds in enumerate(vds_list):
+			if i in duplicates:
+				continue
 			self._logger.debug("_order_vds: processing vds " + self._utils.get_entity_desc(vds))
-			vds_hierarchy_level = processing_level
-			any_dependency_unresolved = False
-			sql_dependency_paths = self._get_vds_dependency_paths(vds)
-			# Iterate through SQL dependencies to determine level of hierarchy for each dependency and the VDS
-			if sql_dependency_paths:
-				for path in sql_dependency_paths:
-					self._logger.debug("_order_vds: processing sql dependency " + path)
-					# Validate the dependency against VDS and PDS
-					sql_context = self._utils.get_sql_context(vds)
-					dependency_vds = self._find_vds_by_path(self._utils.get_absolute_path(path, sql_context))
-					if dependency_vds is None:
-						dependency_pds = self._find_pds_by_path(self._utils.get_absolute_path(path, sql_context))
-						if dependency_pds is None:
-							# Dependency could not be resolved.
-							self._logger.warn("_order_vds: giving up on ordering VDS '" + self._utils.normalize_path(vds['path']) + "'. Could not resolve dependency '" + self._utils.get_absolute_path(path, sql_context) + "' Will try to process without ordering.")
-							# Move VDS into unresolved list
-							self._unresolved_vds.append(vds)
-							self._d.vds_list.remove(vds)
-							# Mark as do-not-process
-							any_dependency_unresolved = True
-							break
-						else:
-							# The dependency has been resolved as PDS, continue to the next dependency
-							continue
-					else:
-						# Dependency was found as VDS
-						dependency_hierarchy_level = self._find_vds_level_in_hierarchy(dependency_vds['id'])
-						if dependency_hierarchy_level is None:
-							# Dependency has not been processed yet, push this VDS to the next processing level
-							vds_hierarchy_level = None
-							break
-						# Find the highest level of hierarchy among dependencies
-						elif vds_hierarchy_level < dependency_hierarchy_level + 1:
-							vds_hierarchy_level = dependency_hierarchy_level + 1
-			if any_dependency_unresolved or vds_hierarchy_level is None:
-				# Do not process this VDS at this recursion
-				self._logger.debug("_order_vds: some dependencies cannot be validated for entity " + vds['id'] + " at processing level " + str(processing_level))
+			sql_context = self._utils.get_sql_context(vds)
+			dependency_indexes = set()
+			dependency_paths = sql_tables[i] if sql_tables is not None else self._get_vds_dependency_paths(vds)
+			for path in dependency_paths or []:
+				dependency_path = self._utils.get_absolute_path(path, sql_context)
+				self._logger.debug("_order_vds: processing sql dependency " + dependency_path)
+				if dependency_path in vds_index:
+					dependency_indexes.add(vds_index[dependency_path])
+				elif self._d.get_by_path('pds_list', dependency_path) is not None:
+					continue
+				else:
+					if dependency_path not in target_datasets:
+						entity = self._get_target_entity_by_path(dependency_path, full_entity=False)
+						target_datasets[dependency_path] = entity is not None and (self._utils.is_vds(entity) or self._utils.is_pds(entity))
+					if not target_datasets[dependency_path]:
+						self._logger.warn("_order_vds: giving up on ordering VDS '" + self._utils.normalize_path(vds['path']) + "'. Could not resolve dependency '" + dependency_path + "' Will try to process without ordering.")
+						unresolved.add(i)
+						break
+			if i not in unresolved:
+				for dependency_index in dependency_indexes:
+					dependents[dependency_index].append(i)
+				in_degree[i] = len(dependency_indexes)
+		# Process VDSs level by level starting with VDSs that do not depend on other VDSs in vds_list
+		levels = [None] * len(vds_list)
+		current_level = [i for i in range(len(vds_list)) if in_degree[i] == 0 and i not in unresolved and i not in duplicates]
+		level = 0
+		while current_level and level < self._config.vds_max_hierarchy_depth:
+			next_level = []
+			for i in current_level:
+				levels[i] = level
+				for dependent in dependents[i]:
+					in_degree[dependent] -= 1
+					if in_degree[dependent] == 0 and dependent not in unresolved:
+						next_level.append(dependent)
+			current_level = sorted(next_level)
+			level = level + 1
+		self._hierarchy_depth = level
+		self._vds_hierarchy = []
+		remainder_vds_list = []
+		self._unresolved_vds = []
+		for i in sorted(range(len(vds_list)), key=lambda i: (levels[i] is None, levels[i] or 0, i)):
+			if levels[i] is not None:
+				self._vds_hierarchy.append([levels[i], vds_list[i]])
+			elif i in unresolved:
+				self._unresolved_vds.append(vds_list[i])
 			else:
-				# Add the current VDS to the vds_hierarchy_level
-				self._vds_hierarchy.append([vds_hierarchy_level, vds])
-				# Remove the current VDS from further processing
-				self._d.vds_list.remove(vds)
-				# Mark this hierarchy level as successful
-				any_vds_leveled = True
-				self._logger.debug("_order_vds: dependencies have been validated for entity " + vds['id'] + " for hierarchy level " + str(vds_hierarchy_level))
-		# Are we done yet with recursion
-		if not any_vds_leveled or len(self._d.vds_list) == 0:
-			self._hierarchy_depth = processing_level + 1
-			self._logger.debug("_order_vds: finished processing all VDS with hierarchy depth of :" + str(self._hierarchy_depth + 1))
-			return
-		# Process the next Hierarchy Level recursively
-		self._order_vds(processing_level + 1)
+				remainder_vds_list.append(vds_list[i])
+		if current_level:
+			self._logger.warn("_order_vds: reached vds.max_hierarchy_depth of " + str(self._config.vds_max_hierarchy_depth) + ". Remaining VDSs will be processed without ordering.")
+		# Report VDSs that could not be ordered because they are part of a cycle, and VDSs that depend on them.
+		# VDSs that depend on an unresolved or too deep VDS have been reported already.
+		blocked = set(unresolved)
+		pending = list(unresolved) + [i for i in current_level]
+		blocked.update(current_level)
+		while pending:
+			for dependent in dependents[pending.pop()]:
+				if dependent not in blocked:
+					blocked.add(dependent)
+					pending.append(dependent)
+		unordered = [i for i in range(len(vds_list)) if levels[i] is None and i not in unresolved and i not in duplicates]
+		cycles = self._find_vds_cycles(unordered, dependents)
+		for i in unordered:
+			if i in cycles:
+				self._logger.warn("_order_vds: circular dependency detected for VDS '" + self._utils.normalize_path(vds_list[i]['path']) + "'. Will try to process without ordering.")
+			elif i not in blocked:
+				self._logger.warn("_order_vds: VDS '" + self._utils.normalize_path(vds_list[i]['path']) + "' depends on a VDS with a circular dependency. Will try to process without ordering.")
+		self._d.vds_list = remainder_vds_list
+		self._logger.debug("_order_vds: finished processing all VDS with hierarchy depth of :" + str(self._hierarchy_depth))
+
+	# Returns the nodes that belong to a cycle of the graph of the given nodes, i.e. to a strongly connected component
+	# of more than one node or with an edge to itself. Iterative Tarjan's algorithm, edges are given by dependents.
+	def _find_vds_cycles(self, nodes, dependents):
+		node_set = set(nodes)
+		index = {}
+		lowlink = {}
+		stack = []
+		on_stack = set()
+		cycles = set()
+		for root in nodes:
+			if root in index:
+				continue
+			work = [(root, 0)]
+			while work:
+				node, edge = work.pop()
+				if edge == 0:
+					index[node] = lowlink[node] = len(index)
+					stack.append(node)
+					on_stack.add(node)
+				recurse = False
+				edges = dependents[node]
+				while edge < len(edges):
+					successor = edges[edge]
+					edge = edge + 1
+					if successor not in node_set:
+						continue
+					if successor not in index:
+						work.append((node, edge))
+						work.append((successor, 0))
+						recurse = True
+						break
+					if successor in on_stack:
+						lowlink[node] = min(lowlink[node], index[successor])
+				if recurse:
+					continue
+				if lowlink[node] == index[node]:
+					component = []
+					while True:
+						member = stack.pop()
+						on_stack.discard(member)
+						component.append(member)
+						if member == node:
+							break
+					if len(component) > 1 or node in dependents[node]:
+						cycles.update(component)
+				if work:
+					parent = work[-1][0]
+					lowlink[parent] = min(lowlink[parent], lowlink[node])
+		return cycles
 
 	def _get_vds_dependency_paths(self, vds):
 		if self._is_source_ce() or not self._d.vds_parents:
 			# CE does not support graph
 			return parse_sql.tables_in_query(vds['sql'])
 		else:
-			for vds_entry in self._d.vds_parents:
-				if vds_entry['path'] == vds['path']:
-					return vds_entry['parents']
+			vds_entry = self._d.get_by_path('vds_parents', vds['path'])
+			if vds_entry is not None:
+				return vds_entry['parents']
 
 	def _is_source_ce(self):
 		for item in self._d.dremio_get_config:
@@ -1108,52 +1565,14 @@ class DremioWriter:
 						return eval(param['is_community_edition'])
 		return False
 
-	def _find_vds_by_path(self, path):
-		# First, try finding in the VDS list from the source file
-		for vds in self._d.vds_list:
-			if path == self._utils.normalize_path(vds['path']):
-				return vds
-		# For dry run, check processed vds
-		if self._config.dry_run:
-			for vds in self._dry_run_processed_vds_list:
-				if path == self._utils.normalize_path(vds['path']):
-					return vds
-		# Finally, try finding in the target environment
-		entity = self._dremio_env.get_catalog_entity_by_path(path)
-		# Make sure we get VDS and not folder/file
-		if entity is not None and self._utils.is_vds(entity):
-			return entity
-		return None
-
-	def _find_pds_by_path(self, path):
-		# First, try finding in the PDS list from the source file
-		for pds in self._d.pds_list:
-			if "path" in pds and path == self._utils.normalize_path(pds['path']):
-				return pds
-		# For dry run, check processed pds
-		if self._config.dry_run:
-			for pds in self._dry_run_processed_pds_list:
-				if "path" in pds and path == self._utils.normalize_path(pds['path']):
-					return pds
-		# Finally, try finding in the target environment
-		entity = self._dremio_env.get_catalog_entity_by_path(path)
-		# Make sure we get promoted PDS and not folder/file
-		if entity is not None and self._utils.is_pds(entity):
-			return entity
-		return None
-
-	def _find_vds_level_in_hierarchy(self, vds_id):
-		for item in self._vds_hierarchy:
-			if item[1]['id'] == vds_id:
-				return item[0]
-		return None
-
 	def get_errors_count(self):
 		return self._logger.errors_encountered
 
 
 	def _write_wiki(self, wiki, process_mode, target_catalog_name=None):
 		self._logger.debug("_write_wiki: processing wiki: " + str(wiki))
+		if self._is_journaled('wiki', wiki):
+			return True
 		self._map_wiki_source(wiki)
 		new_wiki_text = wiki['text']
 		wiki_path = wiki['path']
@@ -1167,6 +1586,7 @@ class DremioWriter:
 			if process_mode == 'update_only':
 				self._logger.info("_write_wiki: Skipping wiki creation due to configuration wiki_process_mode. " + str(wiki))
 				return None
+			self._plan(DremioDiff.CREATE, 'wiki', "/".join(wiki_path))
 			if self._config.dry_run:
 				self._logger.warn("_write_wiki: Dry Run, NOT Creating wiki: " + str(wiki))
 				return None
@@ -1182,8 +1602,10 @@ class DremioWriter:
 			# make sure there are changes to update as it will invalidate existing wiki data
 			if new_wiki_text == existing_wiki['text']:
 				# Nothing to do
+				self._plan(DremioDiff.NOOP, 'wiki', "/".join(wiki_path))
 				self._logger.debug("_write_wiki: No pending changes. Skipping " + str(wiki))
 				return None
+			self._plan(DremioDiff.UPDATE, 'wiki', "/".join(wiki_path))
 			if self._config.dry_run:
 				self._logger.warn("_write_wiki: Dry Run, NOT Updating " + str(wiki))
 				return False
@@ -1193,11 +1615,14 @@ class DremioWriter:
 			if updated_wiki is None:
 				self._logger.error("_write_wiki: Error updating " + str(wiki))
 				return False
+		self._journal_write('wiki', wiki)
 		return True
 
 
 	def _write_tags(self, tags, process_mode, target_catalog_name=None):
 		self._logger.debug("_write_tag: processing tags: " + str(tags))
+		if self._is_journaled('tags', tags):
+			return True
 		self._map_tag_source(tags)
 		new_tags = tags['tags']
 		tags_path = tags['path']
@@ -1211,6 +1636,7 @@ class DremioWriter:
 			if process_mode == 'update_only':
 				self._logger.info("_write_tags: Skipping tags creation due to configuration tag_process_mode. " + str(tags))
 				return None
+			self._plan(DremioDiff.CREATE, 'tags', "/".join(tags_path))
 			if self._config.dry_run:
 				self._logger.warn("_write_tags: Dry Run, NOT Creating tags: " + str(tags))
 				return None
@@ -1226,8 +1652,10 @@ class DremioWriter:
 			# make sure there are changes to update as it will invalidate existing tags data
 			if new_tags == existing_tags['tags']:
 				# Nothing to do
+				self._plan(DremioDiff.NOOP, 'tags', "/".join(tags_path))
 				self._logger.debug("_write_tags: No pending changes. Skipping " + str(tags))
 				return None
+			self._plan(DremioDiff.UPDATE, 'tags', "/".join(tags_path))
 			if self._config.dry_run:
 				self._logger.warn("tags: Dry Run, NOT Updating " + str(tags))
 				return False
@@ -1237,11 +1665,14 @@ class DremioWriter:
 			if updated_tags is None:
 				self._logger.error("_write_tags: Error updating " + str(tags))
 				return False
+		self._journal_write('tags', tags)
 		return True
 
 
 	def _write_udf(self, udf, process_mode):
 		self._logger.debug("_write_udf: processing udf: " + self._utils.get_entity_desc(udf))
+		if self._is_journaled('udf', udf):
+			return True
 		# clean up the object
 		if 'id' in udf:
 			udf.pop("id")
@@ -1258,6 +1689,7 @@ class DremioWriter:
 			if process_mode == 'update_only':
 				self._logger.info("_write_udf: Skipping user defined function creation due to configuration udf_process_mode. " + self._utils.get_entity_desc(udf))
 				return None
+			self._plan(DremioDiff.CREATE, 'udf', self._utils.get_entity_desc(udf))
 			if self._config.dry_run:
 				self._logger.warn("_write_udf: Dry Run, NOT Creating user defined function: " + self._utils.get_entity_desc(udf))
 				return None
@@ -1266,6 +1698,7 @@ class DremioWriter:
 			if new_udf is None:
 				self._logger.error("_write_udf: could not create " + self._utils.get_entity_desc(udf))
 				return None
+			self._update_target_snapshot(new_udf)
 		else:  # udf already exists in the target environment
 			existing_udf = self._dremio_env.get_catalog_entity_by_id(existing_udf_entity['id'])
 			if process_mode == 'create_only':
@@ -1274,8 +1707,10 @@ class DremioWriter:
 			# make sure there are changes to update as it will invalidate existing udf data
 			if new_function_body == existing_udf['functionBody']:
 				# Nothing to do
+				self._plan(DremioDiff.NOOP, 'udf', self._utils.get_entity_desc(udf))
 				self._logger.debug("_write_udf: No pending changes. Skipping " + self._utils.get_entity_desc(udf))
 				return None
+			self._plan(DremioDiff.UPDATE, 'udf', self._utils.get_entity_desc(udf))
 			if self._config.dry_run:
 				self._logger.warn("_write_udf: Dry Run, NOT Updating " + self._utils.get_entity_desc(udf))
 				return False
@@ -1288,6 +1723,7 @@ class DremioWriter:
 			if updated_udf is None:
 				self._logger.error("_write_udf: Error updating " + self._utils.get_entity_desc(udf))
 				return False
+		self._journal_write('udf', udf)
 		return True
 
 
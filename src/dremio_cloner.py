@@ -22,7 +22,11 @@ from DremioFile import DremioFile
 from DremioReader import DremioReader
 from DremioWriter import DremioWriter
 from DremioDelete import DremioDelete
+from DremioTransport import DremioTransport
+from DremioRetryPolicy import DremioRetryPolicy
+from DremioRateLimiter import DremioRateLimiter
 from DremioClonerConfig import DremioClonerConfig
+import parse_sql
 import logging
 import sys
 import getpass
@@ -36,15 +40,19 @@ def main():
 	else:
 		config = DremioClonerConfig(sys.argv[1])
 		obtain_password(config, sys.argv)
+		parse_sql.configure_dependency_cache(config.sql_dependency_cache_size, config.sql_dependency_cache_filename)
 		# Execute command
-		if config.command == DremioClonerConfig.CMD_GET:
-			get_dremio_environment(config)
-		elif config.command == DremioClonerConfig.CMD_PUT:
-			put_dremio_environment(config)
-		elif config.command == DremioClonerConfig.CMD_DELETE:
-			delete_objects(config)
-		else:
-			print_usage()
+		try:
+			if config.command == DremioClonerConfig.CMD_GET:
+				get_dremio_environment(config)
+			elif config.command == DremioClonerConfig.CMD_PUT:
+				put_dremio_environment(config)
+			elif config.command == DremioClonerConfig.CMD_DELETE:
+				delete_objects(config)
+			else:
+				print_usage()
+		finally:
+			parse_sql.save_dependency_cache()
 
 
 def print_usage():
@@ -52,24 +60,42 @@ def print_usage():
 Make sure the config file is correct. """)
 
 
+def get_transport(config):
+	max_connections_per_host = config.http_max_connections_per_host
+	if max_connections_per_host <= 0:
+		max_connections_per_host = max(10, config.read_concurrency, config.write_concurrency)
+	retry_policy = DremioRetryPolicy(config.http_retry_max_retries, config.http_retry_backoff_ms / 1000.0, config.http_retry_backoff_max_ms / 1000.0)
+	rate_limiter = None
+	if config.http_rate_limit > 0:
+		rate_limiter = DremioRateLimiter(config.http_rate_limit, config.http_rate_limit_target_latency_ms / 1000.0)
+	return DremioTransport(config.http_pool_size, max_connections_per_host, config.http_keep_alive, config.http_gzip, retry_policy, rate_limiter)
+
+
 def get_dremio_environment(config):
 	logging.info("Executing command 'get'.")
 	# Use DremioCloudV2 for Cloud V2 (serverless), DremioCloud for Cloud V1 (standard)
 	if config.source_dremio_cloud:
 		if config.source_dremio_cloud_v2:
 			dremio = DremioCloudV2(config.source_endpoint, config.source_username, config.source_password, config.source_dremio_cloud_org_id, config.source_dremio_cloud_project_id,
-							   config.http_timeout, verify_ssl=config.source_verify_ssl)
+							   config.http_timeout, verify_ssl=config.source_verify_ssl, transport=get_transport(config))
 			logging.info("Source is configured as Dremio Cloud V2 (serverless) - API Version: %s, Serverless: %s", dremio.get_api_version(), dremio.is_serverless())
 		else:
 			dremio = DremioCloud(config.source_endpoint, config.source_username, config.source_password, config.source_dremio_cloud_org_id, config.source_dremio_cloud_project_id,
-							   config.http_timeout, verify_ssl=config.source_verify_ssl)
+							   config.http_timeout, verify_ssl=config.source_verify_ssl, transport=get_transport(config))
 			logging.info("Source is configured as Dremio Cloud V1 (standard)")
 	else:
-		dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl)
-	reader = DremioReader(dremio, config)
-	dremio_data = reader.read_dremio_environment()
+		dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl, transport=get_transport(config))
 	file = DremioFile(config)
+	if config.read_incremental:
+		previous_data, previous_manifest = file.read_previous_dremio_environment()
+		reader = DremioReader(dremio, config, previous_data, previous_manifest)
+	else:
+		reader = DremioReader(dremio, config)
+	dremio_data = reader.read_dremio_environment()
 	file.save_dremio_environment(dremio_data)
+	if config.read_incremental:
+		file.save_manifest(reader.get_manifest())
+	logging.info("Command 'get' " + dremio.get_principal_cache_stats())
 	logging.info("Command 'get' finished with " + str(reader.get_errors_count()) + " error(s).")
 	print("Done with " + str(reader.get_errors_count()) + " error(s). Please review log file for details.")
 
@@ -82,23 +108,25 @@ def put_dremio_environment(config):
 	if config.target_dremio_cloud:
 		if config.target_dremio_cloud_v2:
 			dremio = DremioCloudV2(config.target_endpoint, config.target_username, config.target_password, config.target_dremio_cloud_org_id, config.target_dremio_cloud_project_id,
-							   config.http_timeout, verify_ssl=config.target_verify_ssl)
+							   config.http_timeout, verify_ssl=config.target_verify_ssl, transport=get_transport(config))
 			logging.info("Target is configured as Dremio Cloud V2 (serverless) - API Version: %s, Serverless: %s", dremio.get_api_version(), dremio.is_serverless())
 		else:
 			dremio = DremioCloud(config.target_endpoint, config.target_username, config.target_password, config.target_dremio_cloud_org_id, config.target_dremio_cloud_project_id,
-							   config.http_timeout, verify_ssl=config.target_verify_ssl)
+							   config.http_timeout, verify_ssl=config.target_verify_ssl, transport=get_transport(config))
 			logging.info("Target is configured as Dremio Cloud V1 (standard)")
 	else:
-		dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, config.target_accept_eula, config.http_timeout, verify_ssl=config.target_verify_ssl)
+		dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, config.target_accept_eula, config.http_timeout, verify_ssl=config.target_verify_ssl, transport=get_transport(config))
 	writer = DremioWriter(dremio, dremio_data, config)
 	writer.write_dremio_environment()
 	logging.info("Command 'put' finished with " + str(writer.get_errors_count()) + " error(s).")
+	if config.write_plan_mode != 'off':
+		print("\n".join(writer.get_plan_summary()))
 	print("Done with " + str(writer.get_errors_count()) + " error(s). Please review log file for details.")
 
 
 def delete_objects(config):
 	logging.info("Executing command '" + DremioClonerConfig.CMD_DELETE + "'.")
-	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, verify_ssl=config.target_verify_ssl)
+	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, verify_ssl=config.target_verify_ssl, transport=get_transport(config))
 	deleter = DremioDelete(dremio, config)
 	deleter.delete()
 	logging.info("Command '" + DremioClonerConfig.CMD_DELETE + "' finished with " + str(deleter.get_errors_count()) + " error(s).")
@@ -404,11 +404,7 @@ def main():
                 parent_folder_path = unreferenced_folder['path'][:-1]
                 if len(parent_folder_path) == 1:
                     # space should be there
-                    parent_space = None
-                    for space in dremio_data.spaces:
-                        if space['name'] == parent_folder_path[0]:
-                            parent_space = space
-                            break
+                    parent_space = dremio_data.get_by_path('spaces', parent_folder_path)
                     if parent_space == None:
                         print("ERROR - Space not found: " + parent_folder_path[0])
                         exit(1)
@@ -421,11 +417,7 @@ def main():
                             'path': unreferenced_folder['path']
                         })
                 else:
-                    parent_folder = None
-                    for folder in dremio_data.folders:
-                        if folder['path'] == parent_folder_path:
-                            parent_folder = folder
-                            break
+                    parent_folder = dremio_data.get_by_path('folders', parent_folder_path)
                     if parent_folder == None:
                         print("No existing parent folder found, creating one: " + ('.'.join(parent_folder_path)))
                         parent_folder = {
@@ -436,7 +428,7 @@ def main():
                             'children': []
                         }
                         # needs to go to first position otherwise dependency creation could fail
-                        dremio_data.folders.insert(0, parent_folder)
+                        dremio_data.add('folders', parent_folder, first=True)
                     print("Appending folder " + ('.'.join(unreferenced_folder['path'])) + " to folder " + ('.'.join(parent_folder['path'])))
                     parent_folder['children'].append({
                         'id': unreferenced_folder['id'],
@@ -495,6 +487,10 @@ def main():
                         child['path'] = rebuild_path(migration, oldpath)
                         print("Space/Folder Migration - Folder child reference: " + '.'.join(oldpath) + " -> " + '.'.join(child['path']))
 
+        # Paths have been changed in place, lookups by path must not use the previous paths
+        for collection in ['spaces', 'folders', 'vds_list']:
+            dremio_data.reindex(collection)
+
     # NEW APPROACH: Use string replacement instead of parsing/regenerating SQL
     # This preserves ALL original formatting including \r\n, comments, etc.
     print("Migrating VDS SQL using string replacement (preserves formatting)...")
@@ -570,6 +566,7 @@ def main():
                         else:
                             parents.append(parent)
                     vds_parent['parents'] = parents
+        dremio_data.reindex('vds_parents')
 
     new_pds_list = []
     for pds in dremio_data.pds_list:
@@ -617,37 +614,20 @@ def main():
         print(f"Saved migrated data to: {source_file}")
 
 
+def find_referenced_paths(dremio_data):
+    referenced_paths = set()
+    for container in dremio_data.spaces + dremio_data.folders:
+        for child in container['children']:
+            referenced_paths.add(tuple(child['path']))
+    return referenced_paths
+
 def find_unreferenced_folders(dremio_data):
-    unreferenced_folders = []
-    for folder in dremio_data.folders:
-        found = False
-        for space in dremio_data.spaces:
-            for child in space['children']:
-                if child['path'] == folder['path']:
-                    found = True
-        for folder2 in dremio_data.folders:
-            for child in folder2['children']:
-                if child['path'] == folder['path']:
-                    found = True
-        if not found:
-            unreferenced_folders.append(folder)
-    return unreferenced_folders
+    referenced_paths = find_referenced_paths(dremio_data)
+    return [folder for folder in dremio_data.folders if tuple(folder['path']) not in referenced_paths]
 
 def find_unreferenced_vds(dremio_data):
-    unreferenced_vds = []
-    for vds in dremio_data.vds_list:
-        found = False
-        for space in dremio_data.spaces:
-            for child in space['children']:
-                if child['path'] == vds['path']:
-                    found = True
-        for folder2 in dremio_data.folders:
-            for child in folder2['children']:
-                if child['path'] == vds['path']:
-                    found = True
-        if not found:
-            unreferenced_vds.append(vds)
-    return unreferenced_vds
+    referenced_paths = find_referenced_paths(dremio_data)
+    return [vds for vds in dremio_data.vds_list if tuple(vds['path']) not in referenced_paths]
 
 
 if __name__ == "__main__":
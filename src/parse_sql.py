@@ -17,13 +17,31 @@
 import sqlglot
 from sqlglot import exp
 import json, re
-
-tablist = []
-def traverse(node, prefix=''):
+import collections, hashlib, logging, os, threading
+import concurrent.futures
+
+# Cache of tables referenced by SQL statements keyed by SQL hash, see tables_in_query
+# Bump the version whenever the table extraction changes so that persisted results are discarded
+_dependency_cache_version = 2
+_dependency_cache = collections.OrderedDict()
+_dependency_cache_lock = threading.Lock()
+_dependency_cache_size = 10000
+_dependency_cache_filename = None
+_dependency_cache_changed = False
+
+# Single pass SQL pre-cleaner, matches either a quoted literal or identifier (kept as is), a trim(), right() or left()
+# call (replaced by trim()), or a /* */, -- or # comment (removed)
+_sql_cleaner = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|((?:trim|right|left)\(.*?\))|/\*[^*]*\*+(?:[^*/][^*]*\*+)*/|(?:--|#)[^\r\n]*""", re.DOTALL | re.I)
+_sql_token_separator = re.compile(r"[\s)(,;]+")
+_path_separator = re.compile(""""([^"]*)"|'([^']*)'|[\.]+""")
+
+def traverse(node, prefix='', tablist=None):
     """
     Traverse sqlglot AST to find table references.
     This replaces the original dict/list traversal logic.
     """
+    if tablist is None:
+        tablist = []
     if isinstance(node, exp.Table):
         # Extract table name, handling quoted identifiers and multi-part names
         table_name = node.sql(dialect='postgres')  # Use postgres dialect for better compatibility
@@ -37,28 +55,30 @@ def traverse(node, prefix=''):
             if isinstance(value, list):
                 for item in value:
                     if isinstance(item, exp.Expression):
-                        traverse(item, prefix)
+                        traverse(item, prefix, tablist)
             elif isinstance(value, exp.Expression):
-                traverse(value, prefix)
+                traverse(value, prefix, tablist)
     
     return tablist
 
-def tables_in_query_b(sql_str):
+def clean_sql(sql):
+	# remove comments and function calls that confuse the parsers in one scan
+	return _sql_cleaner.sub(_replace_sql_match, sql)
+
+def _replace_sql_match(match):
+	if match.group(1) is not None:
+		return match.group(1)
+	if match.group(2) is not None:
+		return 'trim()'
+	return ''
 
-	# remove the /* */ comments
-	q = re.sub(r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/", "", sql_str)
-	q = re.sub("trim\(.*?\)",'trim()',sql_str, flags=re.DOTALL|re.I)
-	q = re.sub("right\(.*?\)",'trim()',sql_str, flags=re.DOTALL|re.I)
-	q = re.sub("ltrim\(.*?\)",'trim()',sql_str, flags=re.DOTALL|re.I)
-	# remove whole line -- and # comments
-	lines = [line for line in q.splitlines() if not re.match("^\s*(--|#)", line)]
+def tables_in_query_b(sql_str):
 
-	# remove trailing -- and # comments
-	q = " ".join([re.split("--|#", line)[0] for line in lines])
+	q = clean_sql(sql_str)
 
 	# split on blanks, parens and semicolons 
 	# Added ',' to support list of tables in FROM clause
-	tokens = re.split(r"[\s)(,;]+", q)
+	tokens = _sql_token_separator.split(q)
 
 	# scan the tokens. if we see a FROM or JOIN, we set the get_next
 	# flag, and grab the next one (unless it's SELECT).
@@ -82,8 +102,7 @@ def tables_in_query_b(sql_str):
 
 def normalize_path(token):
 	# [S3."asd"."ss.txt"] -> S3/asd/ss.txt
-	p = """"([^"]*)"|'([^']*)'|[\.]+"""
-	path_list = re.split(p, token)
+	path_list = _path_separator.split(token)
 	path = ""
 	for item in path_list:
 		if item != None and item != '':
@@ -91,20 +110,7 @@ def normalize_path(token):
 	return path[:-1]
 
 def tables_in_query_a(sql):
-    global tablist
-    tablist = []  # Reset the global list
-
-    # remove the /* */ comments
-    sql = re.sub(r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/", "", sql)
-    sql = re.sub("trim\(.*?\)",'trim()',sql, flags=re.DOTALL|re.I)
-    sql = re.sub("right\(.*?\)",'trim()',sql, flags=re.DOTALL|re.I)
-    sql = re.sub("left\(.*?\)",'trim()',sql, flags=re.DOTALL|re.I)
-
-	# remove whole line -- and # comments
-    lines = [line for line in sql.splitlines() if not re.match("^\s*(--|#)", line)]
-
-	# remove trailing -- and # comments
-    sql = " ".join([re.split("--|#", line)[0] for line in lines])
+    sql = clean_sql(sql)
 
     # Parse SQL using sqlglot
     try:
@@ -118,7 +124,90 @@ def tables_in_query_a(sql):
     return tables
 
 def tables_in_query(sql):
+    key = _get_dependency_cache_key(sql)
+    tables = _get_cached_tables(key)
+    if tables is None:
+        tables = _parse_tables(sql)
+        _cache_tables(key, list(tables))
+    return tables
+
+def tables_in_queries(sql_list, processes=1):
+    # Same as tables_in_query for a list of SQL statements, statements that are not cached yet are parsed by a pool of processes
+    keys = [_get_dependency_cache_key(sql) for sql in sql_list]
+    results = {}
+    missing = {}
+    for key, sql in zip(keys, sql_list):
+        if key not in results and key not in missing:
+            tables = _get_cached_tables(key)
+            if tables is None:
+                missing[key] = sql
+            else:
+                results[key] = tables
+    if processes > 1 and len(missing) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            parsed = list(executor.map(_parse_tables, missing.values(), chunksize=max(1, len(missing) // (processes * 4))))
+    else:
+        parsed = [_parse_tables(sql) for sql in missing.values()]
+    for key, tables in zip(missing, parsed):
+        _cache_tables(key, list(tables))
+        results[key] = tables
+    return [list(results[key]) for key in keys]
+
+def _parse_tables(sql):
     try:
         return tables_in_query_a(sql)
     except:
         return tables_in_query_b(sql)
+
+def _get_dependency_cache_key(sql):
+    return hashlib.sha256(sql.encode('utf-8')).hexdigest()
+
+def _get_cached_tables(key):
+    with _dependency_cache_lock:
+        if key in _dependency_cache:
+            _dependency_cache.move_to_end(key)
+            return list(_dependency_cache[key])
+    return None
+
+def _cache_tables(key, tables):
+    global _dependency_cache_changed
+    with _dependency_cache_lock:
+        _dependency_cache[key] = tables
+        _dependency_cache.move_to_end(key)
+        while len(_dependency_cache) > _dependency_cache_size:
+            _dependency_cache.popitem(last=False)
+        _dependency_cache_changed = True
+
+def _get_dependency_cache_id():
+    return {'version': _dependency_cache_version, 'sqlglot': sqlglot.__version__}
+
+def configure_dependency_cache(size, filename=None):
+    # Optionally load results of previous runs from filename, they are saved back by save_dependency_cache
+    global _dependency_cache_size, _dependency_cache_filename
+    _dependency_cache_size = size
+    _dependency_cache_filename = filename
+    if filename is None or not os.path.isfile(filename):
+        return
+    try:
+        f = open(filename, "r", encoding="utf-8")
+        data = json.load(f)
+        f.close()
+    except ValueError as e:
+        logging.warning("configure_dependency_cache: ignoring unreadable SQL dependency cache " + filename + ": " + str(e))
+        return
+    if data.get('id') != _get_dependency_cache_id():
+        logging.info("configure_dependency_cache: ignoring SQL dependency cache " + filename + " created by a different version.")
+        return
+    for key, tables in data['tables']:
+        _cache_tables(key, tables)
+
+def save_dependency_cache():
+    global _dependency_cache_changed
+    if _dependency_cache_filename is None or not _dependency_cache_changed:
+        return
+    with _dependency_cache_lock:
+        data = {'id': _get_dependency_cache_id(), 'tables': list(_dependency_cache.items())}
+        _dependency_cache_changed = False
+    f = open(_dependency_cache_filename, "w", encoding="utf-8")
+    json.dump(data, f)
+    f.close()
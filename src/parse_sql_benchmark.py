@@ -0,0 +1,90 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# Micro-benchmark of the SQL pre-cleaner and table extraction in parse_sql over the VDS definitions of an export
+# usage: python parse_sql_benchmark.py <dremio cloner json file or directory> [repeat]
+
+from DremioFileStream import DremioFileStream
+import parse_sql
+import json
+import os
+import re
+import sys
+import time
+
+
+def read_vds_sql(source):
+	sql_list = []
+	if os.path.isdir(source):
+		for (dirpath, dirnames, filenames) in os.walk(os.path.join(source, 'spaces')):
+			for filename in filenames:
+				f = open(os.path.join(dirpath, filename), "r", encoding="utf-8")
+				if filename.endswith('.sql'):
+					sql_list.append(f.read())
+				elif filename.endswith('.json'):
+					data = json.load(f)
+					if 'sql' in data:
+						sql_list.append(data['sql'])
+				f.close()
+	else:
+		f = open(source, "r", encoding="utf-8")
+		for name, value in DremioFileStream(f).read_sections():
+			if name == 'vds':
+				sql_list = [vds['sql'] for vds in value if 'sql' in vds]
+		f.close()
+	return sql_list
+
+
+# Pre-cleaning as done by tables_in_query_a before the single pass cleaner, for comparison
+def legacy_clean_sql(sql):
+	sql = re.sub(r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/", "", sql)
+	sql = re.sub(r"trim\(.*?\)", 'trim()', sql, flags=re.DOTALL|re.I)
+	sql = re.sub(r"right\(.*?\)", 'trim()', sql, flags=re.DOTALL|re.I)
+	sql = re.sub(r"left\(.*?\)", 'trim()', sql, flags=re.DOTALL|re.I)
+	lines = [line for line in sql.splitlines() if not re.match(r"^\s*(--|#)", line)]
+	return " ".join([re.split("--|#", line)[0] for line in lines])
+
+
+def measure(name, function, sql_list, repeat):
+	start = time.perf_counter()
+	for i in range(repeat):
+		for sql in sql_list:
+			function(sql)
+	elapsed = time.perf_counter() - start
+	print("%-28s %10.1f us/statement" % (name, elapsed * 1000000 / (repeat * len(sql_list))))
+
+
+def main():
+	if len(sys.argv) < 2:
+		print("usage: python parse_sql_benchmark.py <dremio cloner json file or directory> [repeat]")
+		exit(1)
+	repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+	sql_list = read_vds_sql(sys.argv[1])
+	if len(sql_list) == 0:
+		print("No VDS definitions found in " + sys.argv[1])
+		exit(1)
+	print("%d VDS definitions, %d characters on average" % (len(sql_list), sum(len(sql) for sql in sql_list) // len(sql_list)))
+	measure("legacy pre-cleaner", legacy_clean_sql, sql_list, repeat)
+	measure("clean_sql", parse_sql.clean_sql, sql_list, repeat)
+	measure("tables_in_query_b", parse_sql.tables_in_query_b, sql_list, repeat)
+	# Parsing is much slower than cleaning, run it once
+	measure("parse (sqlglot, fallback b)", parse_sql._parse_tables, sql_list, 1)
+	changed = len([sql for sql in sql_list if legacy_clean_sql(sql).split() != parse_sql.clean_sql(sql).split()])
+	print("%d statement(s) cleaned differently than by the legacy pre-cleaner" % changed)
+
+
+if __name__ == "__main__":
+	main()
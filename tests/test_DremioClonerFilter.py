@@ -0,0 +1,90 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioClonerConfig import DremioClonerConfig
+from DremioClonerFilter import DremioClonerFilter
+
+
+def make_filter(options):
+	options = [{"logging.filename": os.devnull}, {"space.filter": "*"}, {"space.exclude.filter": ""},
+			   {"space.folder.exclude.filter": ""}] + options
+	conf = {"dremio_cloner": [{"command": "get"}, {"source": [{"endpoint": "http://localhost:9047/"}, {"username": "u"}, {"password": "p"}]},
+							  {"target": [{"directory": "unused"}]}, {"options": options}]}
+	with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+		json.dump(conf, f)
+	try:
+		return DremioClonerFilter(DremioClonerConfig(f.name))
+	finally:
+		os.remove(f.name)
+
+
+def folder(path):
+	return {'entityType': 'folder', 'path': path.split('/')}
+
+
+class TestSpaceFolderDecision(unittest.TestCase):
+
+	def decision(self, path):
+		return self.filter.get_space_folder_decision(folder(path), False)
+
+	def test_folder_filter(self):
+		self.filter = make_filter([{"space.folder.filter": "A/B*"}])
+		self.assertEqual(self.decision('S/A'), DremioClonerFilter.FOLDER_DESCEND_ONLY)
+		self.assertEqual(self.decision('S/A/B'), DremioClonerFilter.FOLDER_INCLUDE)
+		self.assertEqual(self.decision('S/A/B/C'), DremioClonerFilter.FOLDER_INCLUDE)
+		self.assertEqual(self.decision('S/A/C'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+		self.assertEqual(self.decision('S/C'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+
+	def test_folder_exclude_filter(self):
+		self.filter = make_filter([{"space.folder.filter": "*"}, {"space.folder.exclude.filter": "A/X*"}])
+		self.assertEqual(self.decision('S/A'), DremioClonerFilter.FOLDER_INCLUDE)
+		self.assertEqual(self.decision('S/A/X'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+		self.assertEqual(self.decision('S/A/X/Y'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+		self.assertEqual(self.decision('S/A/Y'), DremioClonerFilter.FOLDER_INCLUDE)
+
+	def test_folder_filter_paths(self):
+		self.filter = make_filter([{"space.folder.filter": "*"}, {"space.folder.filter.paths": ["A/B"]}])
+		self.assertEqual(self.decision('S/A'), DremioClonerFilter.FOLDER_DESCEND_ONLY)
+		self.assertEqual(self.decision('S/A/B'), DremioClonerFilter.FOLDER_INCLUDE)
+		self.assertEqual(self.decision('S/D'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+
+	def test_space_filter(self):
+		self.filter = make_filter([{"space.filter": "S"}, {"space.folder.filter": "*"}])
+		self.assertEqual(self.decision('S/A'), DremioClonerFilter.FOLDER_INCLUDE)
+		self.assertEqual(self.decision('T/A'), DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE)
+
+	def test_prefix_verdicts_bounded(self):
+		self.filter = make_filter([{"space.folder.filter": "*"}, {"space.folder.exclude.filter": "A/X*"}])
+		self.filter._prefix_verdicts_size = 3
+		paths = ['S/A/X/Y', 'S/A/Y/Z', 'S/B/C/D', 'S/A/X/Y']
+		decisions = [self.decision(path) for path in paths]
+		self.assertLessEqual(len(self.filter._prefix_verdicts), 3)
+		self.assertEqual(decisions, [DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE, DremioClonerFilter.FOLDER_INCLUDE,
+									 DremioClonerFilter.FOLDER_INCLUDE, DremioClonerFilter.FOLDER_EXCLUDE_SUBTREE])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,96 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioClonerJournal import DremioClonerJournal
+
+
+class TestDremioClonerJournal(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.filename = os.path.join(self.directory.name, 'journal.json')
+		self.config = [{'command': 'put'}, {'options': [{'vds.process_mode': 'create_overwrite'}]}]
+
+	def tearDown(self):
+		self.directory.cleanup()
+
+	def test_resume(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		key = journal.get_key('vds', {'path': ['s', 'v']})
+		content_hash = journal.get_hash({'sql': 'select 1'})
+		journal.record(key, content_hash)
+		journal.close()
+		journal = DremioClonerJournal(self.filename, self.config)
+		self.assertTrue(journal.contains(key, content_hash))
+		# A changed definition is written again
+		self.assertFalse(journal.contains(key, journal.get_hash({'sql': 'select 2'})))
+		journal.close()
+
+	def test_changed_config(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		journal.record('vds:s/v', 'h')
+		journal.close()
+		journal = DremioClonerJournal(self.filename, self.config + [{'options': [{'dry_run': 'True'}]}])
+		self.assertFalse(journal.contains('vds:s/v', 'h'))
+		journal.close()
+		# The journal of the former configuration has been replaced
+		journal = DremioClonerJournal(self.filename, self.config)
+		self.assertFalse(journal.contains('vds:s/v', 'h'))
+		journal.close()
+
+	def test_incomplete_entry(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		journal.record('vds:s/a', 'h')
+		journal.close()
+		with open(self.filename, 'a', encoding='utf-8') as f:
+			f.write('{"hash": "h", "key": "vds:s/')
+		journal = DremioClonerJournal(self.filename, self.config)
+		self.assertTrue(journal.contains('vds:s/a', 'h'))
+		self.assertFalse(journal.contains('vds:s/b', 'h'))
+		journal.close()
+
+	def test_record_once(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		journal.record('wiki:s/v', 'h')
+		journal.record('wiki:s/v', 'h')
+		journal.close()
+		with open(self.filename, encoding='utf-8') as f:
+			self.assertEqual(len(f.read().splitlines()), 2)
+
+	def test_remove(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		journal.close(remove=True)
+		self.assertFalse(os.path.exists(self.filename))
+
+	def test_key(self):
+		journal = DremioClonerJournal(self.filename, self.config)
+		self.assertEqual(journal.get_key('vds', {'path': ['s', 'f', 'v']}), 'vds:s/f/v')
+		self.assertEqual(journal.get_key('space', {'name': 's'}), 'space:s')
+		self.assertEqual(journal.get_hash({'a': 1, 'b': 2}), journal.get_hash({'b': 2, 'a': 1}))
+		journal.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
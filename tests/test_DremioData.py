@@ -0,0 +1,112 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioData import DremioData
+
+
+class TestDremioData(unittest.TestCase):
+
+	def setUp(self):
+		self.d = DremioData()
+		self.a = {'id': '1', 'path': ['s', 'a']}
+		self.b = {'id': '2', 'path': ['s', 'b']}
+
+	def test_add_and_lookup(self):
+		self.assertTrue(self.d.add('vds_list', self.a))
+		self.assertTrue(self.d.add('vds_list', self.b))
+		self.assertIs(self.d.get_by_id('vds_list', '2'), self.b)
+		self.assertIs(self.d.get_by_path('vds_list', ['s', 'a']), self.a)
+		self.assertIs(self.d.get_by_path('vds_list', 's/b'), self.b)
+		self.assertIsNone(self.d.get_by_path('vds_list', 's/c'))
+		self.assertEqual(self.d.vds_list, [self.a, self.b])
+
+	def test_add_keeps_index_without_rebuild(self):
+		self.d.add('vds_list', self.a)
+		index = self.d._get_index('vds_list')
+		self.d.add('vds_list', self.b)
+		self.assertIs(self.d._get_index('vds_list'), index)
+
+	def test_contains_by_id(self):
+		self.d.add('vds_list', self.a)
+		# Entities with an id are the same entity when their ids are equal, whatever their other attributes
+		self.assertTrue(self.d.contains('vds_list', {'id': '1', 'path': ['other']}))
+		self.assertFalse(self.d.add('vds_list', {'id': '1', 'path': ['other']}))
+		self.assertEqual(len(self.d.vds_list), 1)
+
+	def test_contains_by_entity_id(self):
+		tags = {'entity_id': '1', 'path': ['s', 'a'], 'tags': ['x']}
+		self.d.add('tags', tags)
+		self.assertTrue(self.d.contains('tags', {'entity_id': '1', 'tags': ['y']}))
+		self.assertIs(self.d.get_by_id('tags', '1'), tags)
+
+	def test_contains_without_id(self):
+		self.d.add('rules', {'name': 'r', 'action': 'x'})
+		self.assertTrue(self.d.contains('rules', {'name': 'r', 'action': 'x'}))
+		self.assertFalse(self.d.contains('rules', {'name': 'r', 'action': 'y'}))
+
+	def test_remove(self):
+		self.d.add('vds_list', self.a)
+		self.d.add('vds_list', self.b)
+		self.d.remove('vds_list', self.a)
+		self.assertEqual(self.d.vds_list, [self.b])
+		self.assertIsNone(self.d.get_by_id('vds_list', '1'))
+		self.assertIsNone(self.d.get_by_path('vds_list', 's/a'))
+		self.assertTrue(self.d.add('vds_list', self.a))
+
+	def test_duplicate_path(self):
+		c = {'id': '3', 'path': ['s', 'a']}
+		self.d.add('vds_list', self.a)
+		self.d.add('vds_list', c)
+		self.assertIs(self.d.get_by_path('vds_list', 's/a'), self.a)
+		self.d.remove('vds_list', self.a)
+		self.assertIs(self.d.get_by_path('vds_list', 's/a'), c)
+
+	def test_add_first(self):
+		c = {'id': '3', 'path': ['s', 'a']}
+		self.d.add('folders', self.a)
+		self.d.add('folders', c, first=True)
+		self.assertEqual(self.d.folders, [c, self.a])
+		self.assertIs(self.d.get_by_path('folders', 's/a'), c)
+
+	def test_replaced_collection(self):
+		self.d.add('vds_list', self.a)
+		self.d.vds_list = [self.b]
+		self.assertIsNone(self.d.get_by_id('vds_list', '1'))
+		self.assertIs(self.d.get_by_id('vds_list', '2'), self.b)
+
+	def test_reindex(self):
+		self.d.add('pds_list', self.a)
+		self.a['path'][0] = 't'
+		self.d.reindex('pds_list')
+		self.assertIsNone(self.d.get_by_path('pds_list', 's/a'))
+		self.assertIs(self.d.get_by_path('pds_list', 't/a'), self.a)
+
+	def test_name_as_path(self):
+		space = {'id': '9', 'name': 'S'}
+		self.d.add('spaces', space)
+		self.assertIs(self.d.get_by_path('spaces', ['S']), space)
+
+
+if __name__ == '__main__':
+	unittest.main()
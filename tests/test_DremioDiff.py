@@ -0,0 +1,88 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioDiff import DremioDiff
+
+
+class TestDremioDiff(unittest.TestCase):
+
+	def setUp(self):
+		self.diff = DremioDiff()
+		self.vds = {'entityType': 'dataset', 'type': 'VIRTUAL_DATASET', 'path': ['s', 'v'], 'sql': 'select 1', 'sqlContext': ['s'],
+					'accessControlList': {'users': [{'id': 'u1', 'permissions': ['SELECT', 'ALTER']}, {'id': 'u2', 'permissions': ['SELECT']}]}}
+
+	def test_equal(self):
+		self.assertTrue(self.diff.is_entity_equal(self.vds, dict(self.vds)))
+
+	def test_ignored_attributes(self):
+		existing = dict(self.vds, id='x', tag='t', createdAt='now', children=[], fields=[], owner={'ownerId': 'o'}, permissions=['READ'])
+		self.assertTrue(self.diff.is_entity_equal(self.vds, existing))
+
+	def test_acl_order_and_version(self):
+		existing = dict(self.vds, accessControlList={'version': '7', 'users': [{'id': 'u2', 'permissions': ['SELECT']}, {'id': 'u1', 'permissions': ['ALTER', 'SELECT']}]})
+		self.assertTrue(self.diff.is_entity_equal(self.vds, existing))
+
+	def test_acl_changed(self):
+		existing = dict(self.vds, accessControlList={'users': [{'id': 'u1', 'permissions': ['SELECT']}, {'id': 'u2', 'permissions': ['SELECT']}]})
+		self.assertFalse(self.diff.is_entity_equal(self.vds, existing))
+
+	def test_empty_acl(self):
+		entity = dict(self.vds, accessControlList={'users': [], 'groups': []})
+		existing = dict(self.vds)
+		existing.pop('accessControlList')
+		self.assertTrue(self.diff.is_entity_equal(entity, existing))
+
+	def test_empty_context(self):
+		entity = dict(self.vds, sqlContext=[])
+		existing = dict(self.vds)
+		existing.pop('sqlContext')
+		self.assertTrue(self.diff.is_entity_equal(entity, existing))
+		self.assertTrue(self.diff.is_entity_equal(existing, entity))
+
+	def test_cleared_context(self):
+		entity = dict(self.vds, sqlContext=[])
+		self.assertFalse(self.diff.is_entity_equal(entity, self.vds))
+		entity.pop('sqlContext')
+		self.assertFalse(self.diff.is_entity_equal(entity, self.vds))
+
+	def test_attribute_only_in_existing_entity(self):
+		existing = dict(self.vds, format={'type': 'Parquet'})
+		self.assertFalse(self.diff.is_entity_equal(self.vds, existing))
+
+	def test_changed_sql(self):
+		self.assertFalse(self.diff.is_entity_equal(dict(self.vds, sql='select 2'), self.vds))
+
+	def test_counts(self):
+		self.diff.add(DremioDiff.CREATE, 'vds', 's/v')
+		self.diff.add(DremioDiff.NOOP, 'vds', 's/w')
+		self.diff.add(DremioDiff.UPDATE, 'folder', 's/f')
+		counts = self.diff.get_counts()
+		self.assertEqual(counts['vds'][DremioDiff.CREATE], 1)
+		self.assertEqual(counts['vds'][DremioDiff.NOOP], 1)
+		self.assertEqual(counts['folder'][DremioDiff.UPDATE], 1)
+		self.assertEqual(self.diff.get_summary()[-1].split(), ['total', '1', '1', '0', '1'])
+
+
+if __name__ == '__main__':
+	unittest.main()
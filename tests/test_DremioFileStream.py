@@ -0,0 +1,75 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioFileStream import DremioFileStream
+
+
+class TestDremioFileStream(unittest.TestCase):
+
+	document = {'data': [
+		{'dremio_get_config': [{'command': 'get'}]},
+		{'spaces': [{'name': 'S', 'id': 'a-b'}, {'name': 'T "quoted" \\ {', 'id': 'c'}]},
+		{'vds_list': [], 'counts': [12345, -6.5e3, 0, 1.25], 'flag': True, 'none': None},
+		{},
+		{'number': 987654321},
+		{'wikis': [{'text': '[not, a, list]', 'path': ['S', 'ü']}]}
+	]}
+
+	def read(self, text, chunk_size):
+		stream = DremioFileStream(io.StringIO(text))
+		stream._chunk_size = chunk_size
+		return list(stream.read_sections())
+
+	def expected(self):
+		return [(name, value) for section in self.document['data'] for name, value in section.items()]
+
+	def test_chunk_boundaries(self):
+		# Every chunk size splits tokens, numbers and strings at a different position
+		for indent in [None, 2]:
+			text = json.dumps(self.document, indent=indent, ensure_ascii=False)
+			for chunk_size in range(1, 40):
+				self.assertEqual(self.read(text, chunk_size), self.expected(), "indent " + str(indent) + ", chunk size " + str(chunk_size))
+
+	def test_number_at_end_of_chunk(self):
+		text = '{"data": [{"n": 12345}, {"m": [678, 9]}]}'
+		for chunk_size in range(1, len(text) + 1):
+			self.assertEqual(self.read(text, chunk_size), [('n', 12345), ('m', [678, 9])])
+
+	def test_empty(self):
+		self.assertEqual(self.read('{"data": []}', 3), [])
+		self.assertEqual(self.read(' { "data" : [ { } ] } ', 3), [])
+
+	def test_invalid(self):
+		with self.assertRaises(ValueError):
+			self.read('{"other": []}', 4)
+		with self.assertRaises(ValueError):
+			self.read('{"data": [{"a": 1} {"b": 2}]}', 4)
+		with self.assertRaises(ValueError):
+			self.read('{"data": [{"a": [1, 2', 4)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,66 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioRateLimiter import DremioRateLimiter
+
+
+class TestDremioRateLimiter(unittest.TestCase):
+
+	def test_burst(self):
+		limiter = DremioRateLimiter(10)
+		# The bucket holds one second worth of requests, later requests wait for their token
+		waits = [limiter.reserve() for i in range(12)]
+		self.assertTrue(all(wait == 0 for wait in waits[:10]))
+		self.assertAlmostEqual(waits[10], 0.1, delta=0.02)
+		self.assertAlmostEqual(waits[11], 0.2, delta=0.02)
+
+	def test_throttled(self):
+		limiter = DremioRateLimiter(100, min_rate=20)
+		limiter._adjust_interval = 0
+		limiter.on_response(0.01, True)
+		self.assertEqual(limiter.get_rate(), 50)
+		limiter.on_response(0.01, True)
+		limiter.on_response(0.01, True)
+		self.assertEqual(limiter.get_rate(), 20)
+		limiter.on_response(0.01)
+		self.assertEqual(limiter.get_rate(), 25)
+
+	def test_target_latency(self):
+		limiter = DremioRateLimiter(100, target_latency=0.5)
+		limiter._adjust_interval = 0
+		limiter.on_response(1.0)
+		self.assertEqual(limiter.get_rate(), 50)
+		for i in range(20):
+			limiter.on_response(0.1)
+		self.assertEqual(limiter.get_rate(), 100)
+
+	def test_adjust_interval(self):
+		limiter = DremioRateLimiter(100)
+		limiter._adjust_interval = 3600
+		limiter.on_response(0.01, True)
+		self.assertEqual(limiter.get_rate(), 100)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,68 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import email.utils
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioRetryPolicy import DremioRetryPolicy
+
+
+class TestDremioRetryPolicy(unittest.TestCase):
+
+	def setUp(self):
+		self.policy = DremioRetryPolicy(max_retries=3, backoff=0.5, backoff_max=4)
+
+	def test_retryable_status(self):
+		for method in ['GET', 'put', 'DELETE']:
+			for status_code in [429, 502, 503, 504]:
+				self.assertTrue(self.policy.is_retryable_status(method, status_code))
+			for status_code in [400, 401, 404, 409, 500]:
+				self.assertFalse(self.policy.is_retryable_status(method, status_code))
+
+	def test_post(self):
+		# A POST might have been processed unless it was rejected with 429
+		self.assertTrue(self.policy.is_retryable_status('POST', 429))
+		self.assertFalse(self.policy.is_retryable_status('POST', 503))
+		self.assertFalse(self.policy.is_retryable_error('POST'))
+		self.assertTrue(self.policy.is_retryable_error('GET'))
+
+	def test_backoff(self):
+		for attempt in range(6):
+			for i in range(20):
+				delay = self.policy.get_delay(attempt)
+				self.assertGreaterEqual(delay, 0)
+				self.assertLessEqual(delay, min(4, 0.5 * (2 ** attempt)))
+
+	def test_retry_after(self):
+		self.assertEqual(self.policy.get_delay(0, '2'), 2)
+		self.assertEqual(self.policy.get_delay(0, '60'), 4)
+		self.assertEqual(self.policy.get_delay(0, '-1'), 0)
+		delay = self.policy.get_delay(0, email.utils.formatdate(time.time() + 3, usegmt=True))
+		self.assertGreater(delay, 1)
+		self.assertLessEqual(delay, 3)
+		# An invalid header falls back to backoff
+		self.assertLessEqual(self.policy.get_delay(0, 'soon'), 0.5)
+
+
+if __name__ == '__main__':
+	unittest.main()
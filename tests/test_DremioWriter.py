@@ -0,0 +1,135 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# usage: python -m unittest discover tests
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioClonerConfig import DremioClonerConfig
+from DremioData import DremioData
+from DremioWriter import DremioWriter
+
+
+def make_config(options):
+	options = [{"logging.filename": os.devnull}, {"space.process_mode": "skip"}, {"source.process_mode": "skip"},
+			   {"pds.process_mode": "skip"}, {"vds.process_mode": "create_overwrite"}] + options
+	conf = {"dremio_cloner": [{"command": "put"}, {"source": [{"directory": "unused"}]},
+							  {"target": [{"endpoint": "http://localhost:9047/"}, {"username": "u"}, {"password": "p"}]},
+							  {"options": options}]}
+	with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+		json.dump(conf, f)
+	try:
+		return DremioClonerConfig(f.name)
+	finally:
+		os.remove(f.name)
+
+
+class LogRecords(logging.Handler):
+
+	def __init__(self):
+		logging.Handler.__init__(self, logging.WARNING)
+		self.messages = []
+
+	def emit(self, record):
+		self.messages.append(record.getMessage())
+
+
+class TargetDremio:
+
+	def __init__(self, paths):
+		self._paths = paths
+
+	def get_catalog_entity_by_path(self, path, report_error=True):
+		if path in self._paths:
+			return {'entityType': 'dataset', 'type': 'PHYSICAL_DATASET', 'path': path.split('/')}
+		return None
+
+
+class TestOrderVds(unittest.TestCase):
+
+	def setUp(self):
+		self.config = make_config([])
+		self.d = DremioData()
+		self.d.pds_list = [{'entityType': 'dataset', 'type': 'PHYSICAL_DATASET', 'path': ['src', 't']}]
+
+	def order(self, parents, vds_paths=None):
+		if vds_paths is None:
+			vds_paths = list(parents)
+		self.d.vds_list = [{'entityType': 'dataset', 'type': 'VIRTUAL_DATASET', 'id': path + str(i), 'path': path.split('/'), 'sql': ''} for i, path in enumerate(vds_paths)]
+		self.d.vds_parents = [{'path': path.split('/'), 'parents': dependencies} for path, dependencies in parents.items()]
+		self.writer = DremioWriter(TargetDremio(['ext/x']), self.d, self.config)
+		self.logs = LogRecords()
+		logging.getLogger().addHandler(self.logs)
+		try:
+			self.writer._order_vds()
+		finally:
+			logging.getLogger().removeHandler(self.logs)
+		return [(level, '/'.join(vds['path'])) for level, vds in self.writer._vds_hierarchy]
+
+	def remainder(self):
+		return ['/'.join(vds['path']) for vds in self.d.vds_list]
+
+	def warnings(self, text):
+		return [message for message in self.logs.messages if text in message]
+
+	def test_levels(self):
+		hierarchy = self.order({'s/a': ['src/t'], 's/b': ['s/a', 'ext/x'], 's/c': ['s/b', 's/a'], 's/d': []})
+		self.assertEqual(hierarchy, [(0, 's/a'), (0, 's/d'), (1, 's/b'), (2, 's/c')])
+		self.assertEqual(self.writer._hierarchy_depth, 3)
+		self.assertEqual(self.remainder(), [])
+		self.assertEqual(self.logs.messages, [])
+
+	def test_unresolved_dependency(self):
+		hierarchy = self.order({'s/a': ['missing/y'], 's/b': ['s/a']})
+		self.assertEqual(hierarchy, [])
+		self.assertEqual(['/'.join(vds['path']) for vds in self.writer._unresolved_vds], ['s/a'])
+		self.assertEqual(self.remainder(), ['s/b'])
+		self.assertEqual(self.warnings('circular'), [])
+
+	def test_cycle(self):
+		hierarchy = self.order({'s/a': [], 's/c': ['s/d'], 's/d': ['s/c'], 's/e': ['s/c', 's/a'], 's/x': ['s/x']})
+		self.assertEqual(hierarchy, [(0, 's/a')])
+		self.assertEqual(self.remainder(), ['s/c', 's/d', 's/e', 's/x'])
+		circular = self.warnings('circular dependency detected')
+		self.assertEqual(len(circular), 3)
+		self.assertTrue(any("'s/x'" in line for line in circular))
+		self.assertFalse(any("'s/e'" in line for line in circular))
+		self.assertEqual(len(self.warnings("'s/e' depends on a VDS with a circular dependency")), 1)
+
+	def test_duplicate(self):
+		hierarchy = self.order({'s/a': [], 's/b': ['s/a']}, ['s/a', 's/b', 's/a'])
+		self.assertEqual(hierarchy, [(0, 's/a'), (1, 's/b')])
+		self.assertEqual(self.remainder(), ['s/a'])
+		self.assertEqual(len(self.warnings('duplicate VDS definition')), 1)
+		self.assertEqual(self.warnings('circular'), [])
+
+	def test_max_hierarchy_depth(self):
+		self.config.vds_max_hierarchy_depth = 2
+		hierarchy = self.order({'s/a': [], 's/b': ['s/a'], 's/c': ['s/b']})
+		self.assertEqual(hierarchy, [(0, 's/a'), (1, 's/b')])
+		self.assertEqual(self.remainder(), ['s/c'])
+		self.assertEqual(self.warnings('circular'), [])
+
+
+if __name__ == '__main__':
+	unittest.main()